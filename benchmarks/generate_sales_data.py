@@ -0,0 +1,192 @@
+"""
+Seeded generator of synthetic sales files in the format of
+data/sales_data.txt, for benchmarking at any size:
+
+    python benchmarks/generate_sales_data.py benchmarks/data/sales_1m.txt --rows 1000000
+
+The same seed and row count always give the same file. About
+dirty_rate of the rows carry one of the problems the parser and
+validator handle (DIRTY_CASES).
+"""
+
+import argparse
+import os
+import random
+import sys
+
+HEADER = "TransactionID|Date|ProductID|ProductName|Quantity|UnitPrice|CustomerID|Region\n"
+
+REGIONS = ["North", "South", "East", "West"]
+
+# (name, variant with a comma, typical unit price)
+PRODUCTS = [
+    ("Laptop", "Laptop,Premium", 65000),
+    ("Mouse", "Mouse,Wireless", 600),
+    ("Keyboard", "Keyboard,Mechanical", 2000),
+    ("Monitor", "Monitor,LED", 15000),
+    ("Webcam", "Webcam,HD", 3200),
+    ("Headphones", "Headphones,Wireless", 2800),
+    ("USB Cable", "USB Cable,Braided", 250),
+    ("External Hard Drive", "External Hard Drive,1TB", 5500),
+    ("Wireless Mouse", "Wireless Mouse,Ergonomic", 900),
+    ("Laptop Charger", "Laptop Charger,65W", 1800),
+    ("Phone Case", "Phone Case,Silicone", 400),
+    ("Smartwatch", "Smartwatch,GPS", 12000),
+    ("Bluetooth Speaker", "Bluetooth Speaker,Portable", 3500),
+    ("Tablet", "Tablet,10 inch", 25000),
+    ("Power Bank", "Power Bank,20000mAh", 1500),
+    ("Router", "Router,Dual Band", 3000),
+    ("SSD", "SSD,512GB", 4500),
+    ("Graphics Card", "Graphics Card,8GB", 40000),
+    ("Microphone", "Microphone,USB", 2500),
+    ("Printer", "Printer,Laser", 11000),
+]
+
+# Kinds of dirty rows, in the proportions they are picked
+DIRTY_CASES = [
+    "comma_in_name",        # Laptop,Premium
+    "thousands_separator",  # 1,916
+    "zero_quantity",        # invalid
+    "bad_transaction_id",   # X611 (invalid)
+    "bad_product_id",       # Q105 (invalid)
+    "blank_customer_id",    # invalid
+    "blank_region",         # invalid
+    "blank_line",           # skipped by the reader
+]
+
+DAYS_IN_MONTH = [31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]  # 2024
+
+BATCH_ROWS = 100000
+
+
+def product_catalog():
+    """
+    API-style product list (as fetch_product_catalog returns) for the
+    generated ProductIDs: P101 -> id 1, ... The last quarter of the
+    products is left out, so enrichment also sees misses.
+    """
+
+    return [
+        {
+            "id": i + 1,
+            "title": name,
+            "category": "electronics",
+            "brand": f"Brand{i % 5 + 1}",
+            "rating": round(3.5 + (i % 15) / 10, 1)
+        }
+        for i, (name, _, _) in enumerate(PRODUCTS[:len(PRODUCTS) * 3 // 4])
+    ]
+
+
+def generate_lines(rows, seed=42, dirty_rate=0.05, customers=None):
+    """
+    Yields the data lines (without header, each ending in '\\n') of a
+    synthetic sales file with `rows` transactions.
+
+    customers: number of distinct CustomerIDs (default: scales with rows)
+    """
+
+    rng = random.Random(seed)
+    random_value = rng.random
+    randrange = rng.randrange
+    choice = rng.choice
+
+    customers = customers or max(30, min(rows // 20, 999999))
+    id_width = max(3, len(str(customers)))
+    tid_width = max(3, len(str(rows)))
+
+    dates = [
+        f"2024-{month + 1:02d}-{day + 1:02d}"
+        for month, days in enumerate(DAYS_IN_MONTH) for day in range(days)
+    ]
+
+    for n in range(1, rows + 1):
+        index = randrange(len(PRODUCTS))
+        name, comma_name, price = PRODUCTS[index]
+
+        transaction_id = f"T{n:0{tid_width}d}"
+        product_id = f"P{101 + index}"
+        quantity = str(randrange(1, 11))
+        unit_price = str(int(price * (0.7 + 0.6 * random_value())))
+        customer_id = f"C{randrange(1, customers + 1):0{id_width}d}"
+        region = choice(REGIONS)
+
+        if random_value() < dirty_rate:
+            case = choice(DIRTY_CASES)
+
+            if case == "comma_in_name":
+                name = comma_name
+            elif case == "thousands_separator":
+                unit_price = f"{int(unit_price):,}"
+            elif case == "zero_quantity":
+                quantity = "0"
+            elif case == "bad_transaction_id":
+                transaction_id = "X" + transaction_id[1:]
+            elif case == "bad_product_id":
+                product_id = "Q" + product_id[1:]
+            elif case == "blank_customer_id":
+                customer_id = ""
+            elif case == "blank_region":
+                region = ""
+            else:
+                yield "\n"
+
+        yield (f"{transaction_id}|{choice(dates)}|{product_id}|{name}|{quantity}|"
+               f"{unit_price}|{customer_id}|{region}\n")
+
+
+def generate_sales_file(filename, rows, seed=42, dirty_rate=0.05, customers=None):
+    """
+    Writes a synthetic sales file (header + rows) in batches, so any
+    size can be generated in constant memory.
+
+    Returns: filename
+    """
+
+    directory = os.path.dirname(filename)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    lines = generate_lines(rows, seed, dirty_rate, customers)
+    temp_file = f"{filename}.tmp.{os.getpid()}"
+
+    try:
+        with open(temp_file, "w", encoding="utf-8") as file:
+            file.write(HEADER)
+
+            batch = []
+            for line in lines:
+                batch.append(line)
+                if len(batch) == BATCH_ROWS:
+                    file.writelines(batch)
+                    batch = []
+
+            file.writelines(batch)
+
+        os.replace(temp_file, filename)
+
+    finally:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+
+    return filename
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic sales data file.")
+    parser.add_argument("output", help="file to write")
+    parser.add_argument("--rows", type=int, default=1000000, help="transactions (default: 1000000)")
+    parser.add_argument("--seed", type=int, default=42, help="random seed (default: 42)")
+    parser.add_argument("--dirty-rate", type=float, default=0.05,
+                        help="share of rows with a data problem (default: 0.05)")
+    parser.add_argument("--customers", type=int, help="distinct customers (default: rows / 20)")
+    args = parser.parse_args(argv)
+
+    generate_sales_file(args.output, args.rows, args.seed, args.dirty_rate, args.customers)
+    print(f"Wrote {args.rows} transactions to {args.output}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
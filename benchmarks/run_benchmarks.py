@@ -0,0 +1,250 @@
+"""
+Benchmarks of the pipeline stages on a generated sales file:
+
+    python benchmarks/run_benchmarks.py                    # compare with baseline.json
+    python benchmarks/run_benchmarks.py --rows 1000000     # bigger data
+    python benchmarks/run_benchmarks.py --update-baseline  # record a new baseline
+
+Each stage is timed `--repeat` times (best run kept) and then run once
+more with tracemalloc for its peak memory. Rows per second and peak
+memory are compared with the stored baseline; the exit code is 1 if any
+stage is slower or bigger than the tolerance allows.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from generate_sales_data import generate_sales_file, product_catalog
+
+from utils.api_handler import create_product_mapping, enrich_sales_data, save_enriched_data
+from utils.data_processor import (SalesAggregator, calculate_total_revenue, customer_analysis,
+                                  daily_sales_trend, low_performing_products, region_wise_sales,
+                                  top_selling_products)
+from utils.file_handler import (parse_transactions, read_sales_data, tokenize_sales_file,
+                                validate_and_filter)
+from utils.instrumentation import RunRecorder
+from utils.transaction_table import new_symbols
+
+from report_generator import generate_sales_report
+
+BASELINE_FILE = os.path.join(ROOT, "benchmarks", "baseline.json")
+DATA_DIR = os.path.join(ROOT, "benchmarks", "data")
+
+# Stages faster than this are too noisy for the throughput check
+MIN_COMPARE_SECONDS = 0.005
+# Memory growth smaller than this is never a regression
+MIN_COMPARE_BYTES = 1 << 20
+
+
+def run_data_processor_functions(transactions):
+    """
+    The separate data_processor analyses (one pass each).
+    """
+
+    calculate_total_revenue(transactions)
+    region_wise_sales(transactions)
+    top_selling_products(transactions)
+    customer_analysis(transactions)
+    daily_sales_trend(transactions)
+    low_performing_products(transactions)
+
+
+def enrich_rows(transactions, product_mapping):
+    """
+    enrich_sales_data is lazy: build every enriched row so the stage
+    measures the enrichment itself.
+    """
+
+    return list(enrich_sales_data(transactions, product_mapping))
+
+
+def run_stages(recorder, filename, work_dir):
+    """
+    Runs every benchmarked stage once, each on the previous stages'
+    output, measured by recorder.
+    """
+
+    product_mapping = create_product_mapping(product_catalog())
+
+    lines = recorder.call("read", read_sales_data, filename, rows_out=len)
+    transactions = recorder.call("parse", parse_transactions, lines, rows_in=len(lines), rows_out=len)
+    recorder.call("parse (interned)", parse_transactions, lines, symbols=new_symbols(),
+                  rows_in=len(lines), rows_out=len)
+    table = recorder.call("parse (table)", parse_transactions, lines, as_table=True,
+                          rows_in=len(lines), rows_out=len)
+    recorder.call("tokenize", tokenize_sales_file, filename, rows_out=lambda result: len(result[0]))
+
+    valid, _, _ = recorder.call("validate", validate_and_filter, transactions,
+                                rows_in=len(transactions), rows_out=lambda result: len(result[0]))
+    valid_table, _, _ = recorder.call("validate (table)", validate_and_filter, table,
+                                      rows_in=len(table), rows_out=lambda result: len(result[0]))
+
+    recorder.call("analyze (functions)", run_data_processor_functions, valid, rows_in=len(valid))
+    analytics = recorder.call("analyze", SalesAggregator, valid_table, rows_in=len(valid_table))
+
+    recorder.call("enrich", enrich_rows, valid_table, product_mapping,
+                  rows_in=len(valid_table), rows_out=len)
+
+    enriched = enrich_sales_data(valid_table, product_mapping)
+    recorder.call("save", save_enriched_data, enriched, os.path.join(work_dir, "enriched.txt"),
+                  rows_in=len(enriched))
+    recorder.call("report", generate_sales_report, valid_table, enriched,
+                  os.path.join(work_dir, "sales_report.txt"), analytics=analytics,
+                  rows_in=len(valid_table))
+
+
+def measure(filename, repeat):
+    """
+    Returns {stage: {'rows', 'seconds', 'rows_per_second', 'peak_bytes'}}
+    with the best time of `repeat` runs and the tracemalloc peak of one
+    traced run.
+    """
+
+    results = {}
+
+    with tempfile.TemporaryDirectory() as work_dir, contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            recorder = RunRecorder()
+            run_stages(recorder, filename, work_dir)
+
+            for stats in recorder.stages:
+                rows = stats.rows_in if stats.rows_in is not None else stats.rows_out
+                best = results.get(stats.name)
+                if best is None or stats.wall_seconds < best["seconds"]:
+                    results[stats.name] = {
+                        "rows": rows,
+                        "seconds": round(stats.wall_seconds, 6),
+                        "rows_per_second": round(rows / stats.wall_seconds, 1)
+                    }
+
+        recorder = RunRecorder(trace_memory=True)
+        run_stages(recorder, filename, work_dir)
+
+        for stats in recorder.stages:
+            results[stats.name]["peak_bytes"] = stats.tracemalloc_peak_bytes
+
+    return results
+
+
+def compare(results, rows, baseline, tolerance):
+    """
+    Returns the list of regressions: stages whose rows per second fell
+    below (1 - tolerance) x baseline (if they take MIN_COMPARE_SECONDS
+    or more), or whose peak memory grew above (1 + tolerance) x baseline
+    by MIN_COMPARE_BYTES or more (only checked for the same row count).
+    Stages missing from either side are skipped.
+    """
+
+    regressions = []
+
+    for stage, base in baseline["stages"].items():
+        result = results.get(stage)
+        if result is None:
+            continue
+
+        if (result["seconds"] >= MIN_COMPARE_SECONDS and
+                result["rows_per_second"] < base["rows_per_second"] * (1 - tolerance)):
+            regressions.append(
+                f"{stage}: {result['rows_per_second']:,.0f} rows/s "
+                f"(baseline {base['rows_per_second']:,.0f})"
+            )
+        if (rows == baseline["rows"] and
+                result["peak_bytes"] - base["peak_bytes"] >= MIN_COMPARE_BYTES and
+                result["peak_bytes"] > base["peak_bytes"] * (1 + tolerance)):
+            regressions.append(
+                f"{stage}: peak {result['peak_bytes'] / 1e6:.1f} MB "
+                f"(baseline {base['peak_bytes'] / 1e6:.1f} MB)"
+            )
+
+    return regressions
+
+
+def print_results(results, baseline=None):
+    print(f"{'Stage':<20} {'Rows':>10} {'Seconds':>9} {'Rows/s':>12} {'Peak MB':>8} {'vs base':>8}")
+
+    for stage, result in results.items():
+        line = (f"{stage:<20} {result['rows']:>10} {result['seconds']:>9.3f} "
+                f"{result['rows_per_second']:>12,.0f} {result['peak_bytes'] / 1e6:>8.1f}")
+
+        base = baseline["stages"].get(stage) if baseline else None
+        if base:
+            line += f" {result['rows_per_second'] / base['rows_per_second']:>7.2f}x"
+
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the sales pipeline stages.")
+    parser.add_argument("--rows", type=int, default=100000, help="transactions (default: 100000)")
+    parser.add_argument("--seed", type=int, default=42, help="generator seed (default: 42)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per stage (default: 3)")
+    parser.add_argument("--baseline", default=BASELINE_FILE, help="baseline JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown / memory growth (default: 0.25 = 25%%)")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="store these results as the new baseline")
+    parser.add_argument("--output", help="also write the results to this JSON file")
+    args = parser.parse_args(argv)
+
+    filename = os.path.join(DATA_DIR, f"sales_{args.rows}_{args.seed}.txt")
+    if not os.path.exists(filename):
+        print(f"Generating {filename}...")
+        generate_sales_file(filename, args.rows, args.seed)
+
+    results = measure(filename, max(1, args.repeat))
+
+    record = {
+        "rows": args.rows,
+        "seed": args.seed,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "stages": results
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(record, file, indent=2)
+
+    if args.update_baseline:
+        print_results(results)
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(record, file, indent=2)
+            file.write("\n")
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    try:
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            baseline = json.load(file)
+    except FileNotFoundError:
+        print_results(results)
+        print(f"No baseline at {args.baseline} (run with --update-baseline)")
+        return 0
+
+    print_results(results, baseline)
+
+    if baseline["rows"] != args.rows:
+        print(f"Note: baseline was measured with {baseline['rows']} rows (peak memory not compared)")
+
+    regressions = compare(results, args.rows, baseline, args.tolerance)
+    if regressions:
+        print("\nRegressions:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+
+    print("\nNo regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
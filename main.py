@@ -1,58 +1,284 @@
-from utils.file_handler import read_sales_data, parse_transactions
 from utils.file_handler import validate_and_filter
-from utils.data_processor import ( calculate_total_revenue, 
-    region_wise_sales, 
-    top_selling_products, 
-    customer_analysis, 
-    daily_sales_trend,
-    low_performing_products
-)
-from utils.api_handler import (fetch_all_products, 
+from utils.parsed_cache import parse_sales_file
+from utils.data_processor import SalesAggregator
+from utils.api_handler import (fetch_product_catalog,
+    format_catalog_status,
     create_product_mapping, 
+    lazy_product_mapping,
     enrich_sales_data, 
-    save_enriched_data)
+    save_enriched_data,
+    enrichment_summary,
+    merge_enrichment_summaries)
+from utils.incremental import incremental_analysis, save_snapshot
 
 from report_generator import generate_sales_report
 
+from utils.batch import expand_inputs, run_batch
+from utils.instrumentation import RunRecorder
+
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+import argparse
+import os
 import sys
 
+DEFAULT_SALES_FILE = "data/sales_data.txt"
+DEFAULT_RUN_RECORD = "output/run_record.json"
+
+# Exit codes
+EXIT_OK = 0
+EXIT_FAILED = 1         # the run (or every file of a batch) failed
+EXIT_USAGE = 2          # bad arguments / no input files (argparse also uses 2)
+EXIT_PARTIAL = 3        # some files of a batch failed
+
 
-def main():
+def parse_args(argv=None):
+    """
+    Command-line options.
+
+    Without input files, data/sales_data.txt is processed and the filters
+    are asked for interactively (unless given as options). With input
+    files (paths, glob patterns or directories) the batch mode runs: no
+    prompts, files processed in a worker pool, per-file and combined
+    outputs.
+    """
+
+    parser = argparse.ArgumentParser(
+        description="Parse, validate, analyze and enrich sales data files and write reports."
+    )
+    parser.add_argument("inputs", nargs="*",
+                        help="sales files, glob patterns (quote them) or directories "
+                             "(batch mode)")
+
+    filters = parser.add_argument_group("filters")
+    filters.add_argument("--region", help="keep only this region")
+    filters.add_argument("--min-amount", type=float, help="minimum transaction amount")
+    filters.add_argument("--max-amount", type=float, help="maximum transaction amount")
+
+    batch = parser.add_argument_group("batch mode")
+    batch.add_argument("--output-dir", default="output",
+                       help="directory for per-file and combined outputs (default: output)")
+    batch.add_argument("--workers", type=int,
+                       help="worker processes (default: number of CPUs)")
+    batch.add_argument("--pattern", default="*.txt",
+                       help="files to pick from input directories (default: *.txt)")
+
+    parser.add_argument("--incremental", action="store_true",
+                        help=f"only process lines appended since the last run "
+                             f"(one file, default {DEFAULT_SALES_FILE})")
+    parser.add_argument("--offline", action="store_true",
+                        help="use only the cached product catalog")
+    parser.add_argument("--lazy-products", action="store_true",
+                        help="look up only the products the transactions use")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="always parse the text file (ignore the parsed cache)")
+    parser.add_argument("--numpy", action="store_true",
+                        help="use the NumPy tokenizer (requires NumPy)")
+    parser.add_argument("--rollups", action="store_true",
+                        help="keep day / week / month rollups and add a date-range "
+                             "section to the report (slower analysis)")
+
+    instrumentation = parser.add_argument_group("instrumentation")
+    instrumentation.add_argument("--run-record", default=DEFAULT_RUN_RECORD,
+                                 help=f"JSON file for the per-stage timings, memory and "
+                                      f"throughput of the run (default: {DEFAULT_RUN_RECORD}); "
+                                      f"each record is also appended to run_history.jsonl "
+                                      f"next to it")
+    instrumentation.add_argument("--trace-memory", action="store_true",
+                                 help="record the tracemalloc peak of each stage (slower)")
+    instrumentation.add_argument("--profile", metavar="STAGE",
+                                 help="run this stage under cProfile and write "
+                                      "profile_<STAGE>.prof next to the run record")
+
+    args = parser.parse_args(argv)
+
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.incremental and len(args.inputs) > 1:
+        parser.error("--incremental takes a single input file")
+
+    return args
+
+
+def main(argv=None):
     """
     Main execution function
+
+    Returns: exit code (EXIT_*)
+    """
+
+    args = parse_args(argv)
+
+    recorder = RunRecorder(trace_memory=args.trace_memory, profile_stage=args.profile,
+                           profile_dir=os.path.dirname(args.run_record) or ".")
+
+    if args.incremental:
+        mode = "incremental"
+        exit_code = run_incremental(args.inputs[0] if args.inputs else DEFAULT_SALES_FILE,
+                                    offline=args.offline, recorder=recorder, region=args.region,
+                                    min_amount=args.min_amount, max_amount=args.max_amount,
+                                    rollup=args.rollups)
+    elif args.inputs:
+        mode = "batch"
+        exit_code = run_batch_cli(args, recorder)
+    else:
+        mode = "interactive"
+        exit_code = run_interactive(args, recorder)
+
+    recorder.metadata.update({
+        "mode": mode,
+        "exit_code": exit_code,
+        "argv": sys.argv[1:] if argv is None else list(argv)
+    })
+    write_run_record(recorder, args.run_record, exit_code)
+
+    return exit_code
+
+
+def write_run_record(recorder, filename, exit_code):
+    """
+    Writes the run record and appends it to run_history.jsonl in the
+    same directory. A failure here never changes the exit code.
+    """
+
+    status = {EXIT_OK: "ok", EXIT_PARTIAL: "partial"}.get(exit_code, "failed")
+    history_file = os.path.join(os.path.dirname(filename), "run_history.jsonl")
+
+    try:
+        recorder.write(filename, status, history_file)
+        print(f"Run record: {filename}")
+    except OSError as e:
+        print(f"Warning: Could not write run record {filename}: {e}")
+
+
+def run_batch_cli(args, recorder):
+    """
+    Batch mode (python main.py FILE|GLOB|DIR ... [options]).
+    The whole batch is one "batch" stage of the run record; per-file
+    counts are in batch_summary.json.
+    """
+
+    files = expand_inputs(args.inputs, args.pattern)
+    if not files:
+        print("Error: No input files found.")
+        return EXIT_USAGE
+
+    print("=" * 40)
+    print(f"SALES ANALYTICS SYSTEM (batch: {len(files)} files)")
+    print("=" * 40)
+
+    try:
+        results = recorder.call(
+            "batch", run_batch,
+            files, args.output_dir, args.region, args.min_amount, args.max_amount,
+            workers=args.workers, offline=args.offline, lazy_products=args.lazy_products,
+            use_cache=not args.no_cache, backend="numpy" if args.numpy else "python",
+            rollup=args.rollups,
+            rows_out=lambda results: sum(result["lines"] for result in results if "error" not in result)
+        )
+    except Exception as e:
+        print("\n Something went wrong!")
+        print("Error:", str(e))
+        return EXIT_FAILED
+
+    failed = sum(1 for result in results if "error" in result)
+
+    print("=" * 40)
+    print(f"Processed {len(results) - failed}/{len(results)} files")
+    print(f"Outputs: {args.output_dir}/")
+    print("=" * 40)
+    recorder.print_summary()
+
+    if failed == len(results):
+        return EXIT_FAILED
+    if failed:
+        return EXIT_PARTIAL
+
+    return EXIT_OK
+
+
+def run_interactive(args, recorder):
+    """
+    Single-file run on data/sales_data.txt, asking for the filters
+    unless they were given as options. Each stage is measured by
+    recorder.
     """
 
+    lazy_products = args.lazy_products
+
+    # The API fetch runs in the background while the file is parsed and
+    # analyzed; enrichment waits for it only when it needs the products
+    background = ThreadPoolExecutor(max_workers=1)
+
     try:
         # 1. Print welcome message
         print("=" * 40)
         print("SALES ANALYTICS SYSTEM")
         print("=" * 40)
 
+        if not lazy_products:
+            catalog_future = background.submit(
+                recorder.call, "fetch (bg)", fetch_product_catalog,
+                offline=args.offline, rows_out=lambda result: len(result[0])
+            )
+
         # 2. Read sales data file (handle encoding)
+        # 3. Parse and clean transactions
+        # Columnar store: typed arrays + dictionary-encoded categories,
+        # memory-mapped from data/sales_data.txt.parsed when it is current
         print("\n[1/10] Reading sales data...")
-        raw_data = read_sales_data("data/sales_data.txt")
-        print(f"✓ Successfully read {len(raw_data)} transactions")
+        transactions, parse_status = recorder.call(
+            "read+parse", parse_sales_file, DEFAULT_SALES_FILE,
+            use_cache=not args.no_cache,
+            backend="numpy" if args.numpy else "python",
+            rows_out=lambda result: len(result[0])
+        )
+        recorder.metadata.update({"input": DEFAULT_SALES_FILE, "parse_cache": parse_status["cache"],
+                                  "lines": parse_status["lines"]})
+        print(f"✓ Successfully read {parse_status['lines']} transactions")
 
-        # 3. Parse and clean transactions
         print("\n[2/10] Parsing and cleaning data...")
-        transactions = parse_transactions(raw_data)
-        print(f"✓ Parsed {len(transactions)} records")
+        if parse_status["cache"] == "hit":
+            print(f"✓ Loaded {len(transactions)} parsed records from cache")
+        else:
+            print(f"✓ Parsed {len(transactions)} records")
+
+        if lazy_products:
+            # Product IDs are known once parsed: look them up in the background
+            mapping_future = background.submit(
+                recorder.call, "lookup (bg)", lazy_product_mapping, transactions,
+                rows_in=len(transactions), rows_out=len
+            )
 
         # 4. Display filter options to user
         print("\n[3/10] Filter Options Available:")
-        regions = sorted(set(list({t["Region"] for t in transactions if t["Region"].strip()})))
-        amounts = [ t["Quantity"] * t["UnitPrice"] for t in transactions if t["Quantity"] > 0 and t["UnitPrice"] > 0]
+        regions = sorted(r for r in transactions.symbols["Region"].values if r.strip())
+        amounts = [
+            amount for quantity, price, amount in zip(
+                transactions.quantity, transactions.unit_price, transactions.amount
+            )
+            if quantity > 0 and price > 0
+        ]
 
         #amounts = [t["Quantity"] * t["UnitPrice"] for t in transactions]
 
         print("Regions:", ", ".join(regions))
         print(f"Amount Range: ₹{min(amounts)} - ₹{max(amounts)}")
 
-        choice = input("\nDo you want to filter data? (y/n): ").strip().lower()
+        filter_options = (args.region, args.min_amount, args.max_amount)
+
+        if any(option is not None for option in filter_options):
+            choice = "options"
+        else:
+            choice = input("\nDo you want to filter data? (y/n): ").strip().lower()
 
         # 5. If yes, ask for filter criteria and apply
-        if choice == "y":
+        if choice == "options":
+            valid_transactions, invalid_count, filter_summary = recorder.call(
+                "validate", validate_and_filter, transactions, *filter_options,
+                rows_in=len(transactions), rows_out=lambda result: len(result[0])
+            )
+        elif choice == "y":
             region_filter = input("Enter region (or press Enter to skip): ").strip()
             min_amount = input("Enter minimum amount (or press Enter to skip): ").strip()
             max_amount = input("Enter maximum amount (or press Enter to skip): ").strip()
@@ -61,11 +287,16 @@ def main():
             min_amount = float(min_amount) if min_amount else None
             max_amount = float(max_amount) if max_amount else None
 
-            valid_transactions, invalid_count, filter_summary = validate_and_filter(
-                transactions, region_filter, min_amount, max_amount
+            valid_transactions, invalid_count, filter_summary = recorder.call(
+                "validate", validate_and_filter,
+                transactions, region_filter, min_amount, max_amount,
+                rows_in=len(transactions), rows_out=lambda result: len(result[0])
             )
         else:
-            valid_transactions, invalid_count, filter_summary = validate_and_filter(transactions)
+            valid_transactions, invalid_count, filter_summary = recorder.call(
+                "validate", validate_and_filter, transactions,
+                rows_in=len(transactions), rows_out=lambda result: len(result[0])
+            )
 
         # 6. Validate transactions
         # (Validation already handled inside validate_and_filter)
@@ -74,41 +305,59 @@ def main():
         # 7. Display validation summary
         print("\n[4/10] Validating transactions...")
         print(f"✓ Valid: {len(valid_transactions)} | Invalid: {invalid_count}")
+        if invalid_count:
+            rejected = ", ".join(f"{rule}: {count}" for rule, count in
+                                 filter_summary["invalid_by_rule"].items() if count)
+            print(f"  Rejected by rule - {rejected}")
     
 
         # 8. Perform all data analyses (call all functions from Part 2)
         print("\n[5/10] Analyzing sales data...")
-        total_revenue = calculate_total_revenue(valid_transactions)
-        region_perf = region_wise_sales(valid_transactions)
-        top_products = top_selling_products(valid_transactions)
-        top_cust = customer_analysis(valid_transactions)
-        daily_trend = daily_sales_trend(valid_transactions)
-        prod_perf = low_performing_products(valid_transactions)
+        # Single pass over the transactions feeds every analysis
+        analytics = recorder.call("analyze", SalesAggregator, valid_transactions,
+                                  rollup=args.rollups, rows_in=len(valid_transactions))
+        total_revenue = analytics.calculate_total_revenue()
+        region_perf = analytics.region_wise_sales()
+        top_products = analytics.top_selling_products()
+        top_cust = analytics.customer_analysis(n=5)
+        daily_trend = analytics.daily_sales_trend()
+        prod_perf = analytics.low_performing_products()
         print("✓ Analysis complete")
 
         # 9. Fetch products from API
         print("\n[6/10] Fetching product data from API...")
-        api_products = fetch_all_products()
-        print(f"✓ Fetched {len(api_products)} products")
+        with recorder.stage("fetch wait"):
+            if lazy_products:
+                # Only the products these transactions actually use
+                product_mapping = mapping_future.result()
+                catalog_status = None
+                print(f"✓ Looked up {len(product_mapping)} products on demand")
+            else:
+                api_products, catalog_status = catalog_future.result()
+                product_mapping = create_product_mapping(api_products)
+                print(f"✓ Fetched {len(api_products)} products ({format_catalog_status(catalog_status)})")
 
         # 10. Enrich sales data with API info
         print("\n[7/10] Enriching sales data...")
-        product_mapping = create_product_mapping(api_products)
-        enriched_transactions = enrich_sales_data(valid_transactions, product_mapping)
+        enriched_transactions = recorder.call("enrich", enrich_sales_data, valid_transactions, product_mapping,
+                                              rows_in=len(valid_transactions), rows_out=len)
 
-        enriched_success = sum(1 for t in enriched_transactions if t["API_Match"])
+        enrichment = enrichment_summary(enriched_transactions)
+        enriched_success = enrichment["enriched"]
         total_valid = len(valid_transactions)
         success_rate = (enriched_success / total_valid) * 100 if total_valid else 0
         print(f"✓ Enriched {enriched_success}/{total_valid} transactions ({success_rate:.1f}%)")
 
         # 11. Save enriched data to file
         print("\n[8/10] Saving enriched data...")
-        save_enriched_data(enriched_transactions)
-        print("✓ Saved to: data/enriched_sales_data.txt")
+        if recorder.call("save", save_enriched_data, enriched_transactions,
+                         rows_in=len(enriched_transactions)):
+            print("✓ Saved to: data/enriched_sales_data.txt")
 
         # 12. Generate comprehensive report
         print("\n[9/10] Generating comprehensive report...")
-        generate_sales_report(valid_transactions, enriched_transactions)
+        recorder.call("report", generate_sales_report, valid_transactions, enriched_transactions,
+                      analytics=analytics, enrichment=enrichment, rows_in=len(valid_transactions))
         print("✓ Report saved to: output/sales_report.txt")
 
         # 13. Print success message with file locations
@@ -116,15 +365,98 @@ def main():
         print("=" * 40)
         print("Enriched Data File: data/enriched_sales_data.txt")
         print("Sales Report File: output/sales_report.txt")
+        if catalog_status:
+            print(f"Product Catalog: {format_catalog_status(catalog_status)}")
         print("=" * 40)
+        recorder.print_summary()
 
     except Exception as e:
         print("\n Something went wrong!")
         print("Error:", str(e))
         print("Please check input files and function definitions.")
-        sys.exit(1)
+        return EXIT_FAILED
+
+    finally:
+        background.shutdown(wait=False, cancel_futures=True)
+
+    return EXIT_OK
+
+
+def run_incremental(filename=DEFAULT_SALES_FILE, offline=False, recorder=None,
+                    region=None, min_amount=None, max_amount=None, rollup=False):
+    """
+    Incremental run (python main.py --incremental [FILE]).
+
+    Only the lines appended since the last run are parsed, validated,
+    enriched and added to the persisted aggregates; the enriched file is
+    appended to and the report is rewritten from the updated totals.
+    A changed file prefix (or changed filters) triggers a full rebuild.
+    The --region / --min-amount / --max-amount filters apply; no prompts.
+    """
+
+    recorder = recorder or RunRecorder()
+
+    try:
+        print("=" * 40)
+        print("SALES ANALYTICS SYSTEM (incremental)")
+        print("=" * 40)
+
+        print("\n[1/5] Reading new sales data...")
+        analytics, new_transactions, filter_summary, snapshot = recorder.call(
+            "read+analyze", incremental_analysis, filename, region=region,
+            min_amount=min_amount, max_amount=max_amount, rollup=rollup,
+            rows_out=lambda result: len(result[1])
+        )
+        recorder.metadata["input"] = filename
+        print(f"✓ New valid transactions: {len(new_transactions)} "
+              f"(total: {analytics.transaction_count}, invalid: {filter_summary['invalid']})")
+
+        print("\n[2/5] Enriching new transactions...")
+        if len(new_transactions):
+            api_products, catalog_status = recorder.call("fetch", fetch_product_catalog, offline=offline)
+            print(f"  Product catalog: {format_catalog_status(catalog_status)}")
+            product_mapping = create_product_mapping(api_products)
+            enriched_transactions = recorder.call(
+                "enrich", enrich_sales_data, new_transactions, product_mapping,
+                rows_in=len(new_transactions), rows_out=len
+            )
+        else:
+            enriched_transactions = []
+
+        enrichment = merge_enrichment_summaries(
+            snapshot["enrichment"], enrichment_summary(enriched_transactions)
+        )
+        snapshot["enrichment"] = enrichment
+        print(f"✓ Enriched {enrichment['enriched']}/{enrichment['total']} transactions")
+
+        print("\n[3/5] Saving enriched data...")
+        saved = recorder.call("save", save_enriched_data, enriched_transactions,
+                              append=not snapshot["rebuilt"], rows_in=len(enriched_transactions))
+        if not saved:
+            # Keep the old snapshot, so these rows are processed again next run
+            print("\n Enriched data could not be saved; snapshot not updated.")
+            return EXIT_FAILED
+
+        print("\n[4/5] Generating report...")
+        recorder.call("report", generate_sales_report, new_transactions, enriched_transactions,
+                      analytics=analytics, enrichment=enrichment)
+
+        # Only persist once every output is written
+        save_snapshot(snapshot)
+
+        print("\n[5/5] Process Complete!")
+        print("=" * 40)
+        recorder.print_summary()
+
+    except Exception as e:
+        print("\n Something went wrong!")
+        print("Error:", str(e))
+        print("Please check input files and function definitions.")
+        return EXIT_FAILED
+
+    return EXIT_OK
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
 
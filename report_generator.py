@@ -1,82 +1,78 @@
 from datetime import datetime
-from collections import defaultdict
 
-def generate_sales_report(transactions, enriched_transactions, output_file='output/sales_report.txt'):
+from utils.api_handler import enrichment_summary
+from utils.data_processor import SalesAggregator
+
+def generate_sales_report(transactions, enriched_transactions, output_file='output/sales_report.txt',
+                          analytics=None, low_threshold=10, enrichment=None):
     """
     Generates a comprehensive formatted text report
+
+    analytics: a SalesAggregator already built from the transactions
+    (as main.py does). If None, one is built here. All figures come from
+    it, so the report is pure formatting and matches the analysis step.
+    If it keeps rollups (rollup=True) the report gets a date-range
+    section answered from them.
+
+    enrichment: an api_handler.enrichment_summary() result. If None, it
+    is computed from enriched_transactions.
     """
 
+    if analytics is None:
+        analytics = SalesAggregator(transactions)
+
     # ---------- BASIC METRICS ----------
-    total_transactions = len(transactions)
-    total_revenue = sum(tx["Quantity"] * tx["UnitPrice"] for tx in transactions)
+    total_transactions = analytics.transaction_count
+    total_revenue = analytics.calculate_total_revenue()
     avg_order_value = total_revenue / total_transactions if total_transactions else 0
 
-    dates = [tx["Date"] for tx in transactions]
-    date_range = f"{min(dates)} to {max(dates)}" if dates else "N/A"
+    daily_trend = analytics.daily_sales_trend()
+    dates = list(daily_trend)
+    date_range = f"{dates[0]} to {dates[-1]}" if dates else "N/A"
 
     # ---------- REGION-WISE ----------
-    region_sales = defaultdict(lambda: {"revenue": 0, "count": 0})
-
-    for tx in transactions:
-        region = tx["Region"]
-        revenue = tx["Quantity"] * tx["UnitPrice"]
-        region_sales[region]["revenue"] += revenue
-        region_sales[region]["count"] += 1
-
-    # Sort by revenue descending
-    region_sorted = sorted(region_sales.items(), key=lambda x: x[1]["revenue"], reverse=True)
+    # Already sorted by revenue descending
+    region_perf = analytics.region_wise_sales()
 
     # ---------- TOP 5 PRODUCTS ----------
-    product_stats = defaultdict(lambda: {"qty": 0, "revenue": 0})
-
-    for tx in transactions:
-        name = tx["ProductName"]
-        qty = tx["Quantity"]
-        revenue = qty * tx["UnitPrice"]
-        product_stats[name]["qty"] += qty
-        product_stats[name]["revenue"] += revenue
-
-    top_products = sorted(product_stats.items(), key=lambda x: x[1]["qty"], reverse=True)[:5]
+    top_products = analytics.top_selling_products(5)
 
     # ---------- TOP 5 CUSTOMERS ----------
-    customer_stats = defaultdict(lambda: {"spent": 0, "orders": 0})
-
-    for tx in transactions:
-        cid = tx["CustomerID"]
-        revenue = tx["Quantity"] * tx["UnitPrice"]
-        customer_stats[cid]["spent"] += revenue
-        customer_stats[cid]["orders"] += 1
-
-    top_customers = sorted(customer_stats.items(), key=lambda x: x[1]["spent"], reverse=True)[:5]
-
-    # ---------- DAILY TREND ----------
-    daily_stats = defaultdict(lambda: {"revenue": 0, "transactions": 0, "customers": set()})
-
-    for tx in transactions:
-        date = tx["Date"]
-        revenue = tx["Quantity"] * tx["UnitPrice"]
-        daily_stats[date]["revenue"] += revenue
-        daily_stats[date]["transactions"] += 1
-        daily_stats[date]["customers"].add(tx["CustomerID"])
-
-    daily_sorted = sorted(daily_stats.items())
+    top_customers = analytics.top_customers(5)
 
     # ---------- PRODUCT PERFORMANCE ----------
-    best_selling_day = max(daily_stats.items(), key=lambda x: x[1]["revenue"])[0] if daily_stats else "N/A"
+    best_selling_day = analytics.find_peak_sales_day()[0] if daily_trend else "N/A"
 
-    low_products = [name for name, stats in product_stats.items() if stats["qty"] < 2]
+    low_products = [name for name, _, _ in analytics.low_performing_products(low_threshold)]
 
     avg_txn_region = {
-        region: data["revenue"] / data["count"]
-        for region, data in region_sales.items()
+        region: data["total_sales"] / data["transaction_count"]
+        for region, data in region_perf.items()
     }
 
+    # ---------- DATE RANGES ----------
+    rollup = analytics.rollup
+    if rollup is not None:
+        last_week = rollup.last_days(7)
+        peak_week = rollup.peak("week")
+        peak_month = rollup.peak("month")
+        month_over_month = rollup.period_over_period("month")
+        # Latest month of each region (regions with only unparsable dates have none)
+        region_months = {}
+        for region in region_perf:
+            months = list(rollup.period_over_period("month", region=region).items())
+            if months:
+                region_months[region] = months[-1]
+
     # ---------- API ENRICHMENT ----------
-    total_products = len(enriched_transactions)
-    enriched_count = sum(1 for tx in enriched_transactions if tx["API_Match"])
+    if enrichment is None:
+        enrichment = enrichment_summary(enriched_transactions)
+
+    total_products = enrichment["total"]
+    enriched_count = enrichment["enriched"]
     success_rate = (enriched_count / total_products * 100) if total_products else 0
 
-    failed_products = list({tx["ProductName"] for tx in enriched_transactions if not tx["API_Match"]})
+    failed_products = enrichment["failed_products"]
 
     # ---------- WRITE REPORT ----------
     now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -102,9 +98,8 @@ def generate_sales_report(transactions, enriched_transactions, output_file='outp
         f.write("-"*50 + "\n")
         f.write("Region      Sales        % of Total   Transactions\n")
 
-        for region, data in region_sorted:
-            percent = (data["revenue"] / total_revenue * 100) if total_revenue else 0
-            f.write(f"{region:<12} ₹{data['revenue']:>10,.0f}   {percent:>6.2f}%        {data['count']}\n")
+        for region, data in region_perf.items():
+            f.write(f"{region:<12} ₹{data['total_sales']:>10,.0f}   {data['percentage']:>6.2f}%        {data['transaction_count']}\n")
 
         f.write("\n")
 
@@ -113,8 +108,8 @@ def generate_sales_report(transactions, enriched_transactions, output_file='outp
         f.write("-"*50 + "\n")
         f.write("Rank  Product         Quantity   Revenue\n")
 
-        for i, (name, stats) in enumerate(top_products, start=1):
-            f.write(f"{i:<5} {name:<15} {stats['qty']:<10} ₹{stats['revenue']:,.0f}\n")
+        for i, (name, qty, revenue) in enumerate(top_products, start=1):
+            f.write(f"{i:<5} {name:<15} {qty:<10} ₹{revenue:,.0f}\n")
 
         f.write("\n")
 
@@ -123,8 +118,8 @@ def generate_sales_report(transactions, enriched_transactions, output_file='outp
         f.write("-"*50 + "\n")
         f.write("Rank  CustomerID   Total Spent   Orders\n")
 
-        for i, (cid, stats) in enumerate(top_customers, start=1):
-            f.write(f"{i:<5} {cid:<12} ₹{stats['spent']:,.0f}     {stats['orders']}\n")
+        for i, (cid, spent, orders) in enumerate(top_customers, start=1):
+            f.write(f"{i:<5} {cid:<12} ₹{spent:,.0f}     {orders}\n")
 
         f.write("\n")
 
@@ -133,11 +128,34 @@ def generate_sales_report(transactions, enriched_transactions, output_file='outp
         f.write("-"*50 + "\n")
         f.write("Date         Revenue     Transactions   Unique Customers\n")
 
-        for date, data in daily_sorted:
-            f.write(f"{date}   ₹{data['revenue']:>8,.0f}        {data['transactions']:<5}           {len(data['customers'])}\n")
+        for date, data in daily_trend.items():
+            f.write(f"{date}   ₹{data['revenue']:>8,.0f}        {data['transaction_count']:<5}           {data['unique_customers']}\n")
 
         f.write("\n")
 
+        # DATE RANGES
+        if rollup is not None:
+            f.write("DATE-RANGE HIGHLIGHTS\n")
+            f.write("-"*50 + "\n")
+            f.write(f"Last 7 Days:  ₹{last_week['revenue']:,.0f} ({last_week['transaction_count']} transactions, "
+                    f"~{last_week['unique_customers']} customers)\n")
+            if peak_week:
+                f.write(f"Peak Week:    {peak_week[0]} (₹{peak_week[1]:,.0f})\n")
+            if peak_month:
+                f.write(f"Peak Month:   {peak_month[0]} (₹{peak_month[1]:,.0f})\n")
+
+            f.write("Month over Month:\n")
+            for month, data in month_over_month.items():
+                change = f"{data['change_pct']:+.2f}%" if data["change_pct"] is not None else "N/A"
+                f.write(f"  {month}   ₹{data['revenue']:>10,.0f}   {change}\n")
+
+            f.write("Latest Month by Region:\n")
+            for region, (month, data) in region_months.items():
+                change = f"{data['change_pct']:+.2f}%" if data["change_pct"] is not None else "N/A"
+                f.write(f"  {region:<12} {month}   ₹{data['revenue']:>10,.0f}   {change}\n")
+
+            f.write("\n")
+
         # PRODUCT PERFORMANCE
         f.write("PRODUCT PERFORMANCE ANALYSIS\n")
         f.write("-"*50 + "\n")
@@ -0,0 +1,31 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from generate_sales_data import generate_sales_file
+
+SAMPLE_FILE = os.path.join(ROOT, "data", "sales_data.txt")
+
+
+@pytest.fixture(scope="session")
+def sample_file():
+    """
+    The sales file shipped with the repo (80 rows, some invalid).
+    """
+
+    return SAMPLE_FILE
+
+
+@pytest.fixture(scope="session")
+def generated_file(tmp_path_factory):
+    """
+    A 20,000 row synthetic sales file with ~5% dirty rows.
+    """
+
+    filename = tmp_path_factory.mktemp("data") / "sales_20000.txt"
+    return str(generate_sales_file(str(filename), 20000, seed=7, customers=500))
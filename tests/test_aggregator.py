@@ -0,0 +1,95 @@
+import pytest
+
+from utils import data_processor
+from utils.data_processor import SalesAggregator
+from utils.file_handler import parse_transactions, read_sales_data, validate_and_filter
+from utils.transaction_table import TransactionTable
+
+
+def per_key_totals(transactions, key):
+    """
+    Straightforward per-key [quantity, revenue, count] scan, as the
+    analytics functions did before the single-pass aggregator.
+    """
+
+    totals = {}
+    for tx in transactions:
+        acc = totals.setdefault(tx[key], [0, 0.0, 0, set()])
+        acc[0] += tx["Quantity"]
+        acc[1] += tx["Quantity"] * tx["UnitPrice"]
+        acc[2] += 1
+        acc[3].add(tx["CustomerID"] if key == "Date" else tx["ProductName"])
+    return totals
+
+
+@pytest.fixture(scope="module", params=["sample_file", "generated_file"])
+def valid(request):
+    lines = read_sales_data(request.getfixturevalue(request.param))
+    return validate_and_filter(parse_transactions(lines))[0]
+
+
+def test_revenue_regions_and_products(valid):
+    revenue = sum(tx["Quantity"] * tx["UnitPrice"] for tx in valid)
+    regions = per_key_totals(valid, "Region")
+    products = per_key_totals(valid, "ProductName")
+
+    assert data_processor.calculate_total_revenue(valid) == pytest.approx(revenue)
+    assert data_processor.region_wise_sales(valid) == {
+        region: {"total_sales": sales, "transaction_count": count,
+                 "percentage": round(sales / revenue * 100, 2)}
+        for region, (_, sales, count, _) in sorted(regions.items(), key=lambda item: -item[1][1])
+    }
+
+    totals = [(name, quantity, sales) for name, (quantity, sales, _, _) in products.items()]
+    assert data_processor.top_selling_products(valid, 5) == sorted(totals, key=lambda item: -item[1])[:5]
+
+    threshold = sorted(quantity for _, quantity, _ in totals)[len(totals) // 2]
+    lowest = sorted((item for item in totals if item[1] < threshold), key=lambda item: item[1])
+    assert data_processor.low_performing_products(valid, threshold) == lowest
+    assert data_processor.low_performing_products(valid, threshold, n=2) == lowest[:2]
+
+
+def test_customers_and_days(valid):
+    customers = per_key_totals(valid, "CustomerID")
+    days = per_key_totals(valid, "Date")
+
+    assert data_processor.customer_analysis(valid) == {
+        customer: {"total_spent": spent, "purchase_count": count,
+                   "products_bought": sorted(names), "avg_order_value": round(spent / count, 2)}
+        for customer, (_, spent, count, names) in sorted(customers.items(), key=lambda item: -item[1][1])
+    }
+    assert data_processor.daily_sales_trend(valid) == {
+        day: {"revenue": revenue, "transaction_count": count, "unique_customers": len(ids)}
+        for day, (_, revenue, count, ids) in sorted(days.items())
+    }
+
+    peak = max(days.items(), key=lambda item: item[1][1])
+    assert data_processor.find_peak_sales_day(valid) == (peak[0], peak[1][1], peak[1][2])
+
+
+def test_chunked_updates_match_one_pass(valid):
+    whole = SalesAggregator(valid)
+    chunked = SalesAggregator()
+    for start in range(0, len(valid), 1000):
+        chunked.update(iter(valid[start:start + 1000]))
+    single = SalesAggregator()
+    for tx in valid[:50]:
+        single.add(tx)
+
+    assert chunked.customer_analysis() == whole.customer_analysis()
+    assert chunked.daily_sales_trend() == whole.daily_sales_trend()
+    assert single.region_wise_sales() == SalesAggregator(valid[:50]).region_wise_sales()
+
+
+def test_standalone_functions_match_the_aggregator(valid):
+    analytics = SalesAggregator(valid)
+    records = validate_and_filter([dict(tx) for tx in valid], records=True)[0]
+    table = TransactionTable.from_transactions(valid)
+
+    for rows in (valid, records, table):
+        assert list(data_processor.region_wise_sales(rows).items()) == list(analytics.region_wise_sales().items())
+        assert data_processor.top_selling_products(rows, 10) == analytics.top_selling_products(10)
+        assert list(data_processor.customer_analysis(rows).items()) == list(analytics.customer_analysis().items())
+        assert data_processor.daily_sales_trend(rows) == analytics.daily_sales_trend()
+        assert data_processor.find_peak_sales_day(rows) == analytics.find_peak_sales_day()
+        assert data_processor.low_performing_products(rows, 10 ** 6, 7) == analytics.low_performing_products(10 ** 6, 7)
@@ -0,0 +1,41 @@
+import pytest
+
+from utils import data_processor
+from utils.file_handler import parse_transactions, read_sales_data, validate_and_filter
+
+pytest.importorskip("numpy")
+
+ANALYTICS = ("calculate_total_revenue", "region_wise_sales", "top_selling_products",
+             "customer_analysis", "daily_sales_trend", "find_peak_sales_day", "low_performing_products")
+
+
+@pytest.mark.parametrize("filename", ["sample_file", "generated_file"])
+@pytest.mark.parametrize("name", ANALYTICS)
+def test_numpy_backend_matches_python(name, filename, request):
+    lines = read_sales_data(request.getfixturevalue(filename))
+    valid = validate_and_filter(parse_transactions(lines))[0]
+    analysis = getattr(data_processor, name)
+
+    assert analysis(valid, backend="numpy") == analysis(valid)
+
+
+def test_numpy_backend_with_arguments_and_tables(generated_file):
+    table = validate_and_filter(parse_transactions(read_sales_data(generated_file), as_table=True))[0]
+
+    for n in (1, 3, 100):
+        assert data_processor.top_selling_products(table, n, backend="numpy") == \
+            data_processor.top_selling_products(table, n)
+    for threshold, n in ((10, None), (10**9, None), (10**9, 4)):
+        assert data_processor.low_performing_products(table, threshold, n, backend="numpy") == \
+            data_processor.low_performing_products(table, threshold, n)
+
+
+def test_numpy_backend_without_transactions():
+    assert data_processor.calculate_total_revenue([], backend="numpy") == 0.0
+    assert data_processor.region_wise_sales([], backend="numpy") == {}
+    assert data_processor.top_selling_products([], backend="numpy") == []
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        data_processor.region_wise_sales([], backend="gpu")
@@ -0,0 +1,85 @@
+import json
+import os
+
+import pytest
+
+import main
+from utils.batch import expand_inputs, output_names
+from utils.data_processor import SalesAggregator, load_state
+from utils.enriched_store import load_enriched_data
+from utils.file_handler import parse_transactions, read_sales_data, validate_and_filter
+
+
+@pytest.fixture
+def stores(generated_file, tmp_path, monkeypatch):
+    """
+    The generated file split into three store files under stores/.
+    """
+
+    with open(generated_file, encoding="utf-8") as file:
+        header, *lines = file.readlines()
+
+    (tmp_path / "stores").mkdir()
+    (tmp_path / "data").mkdir()
+    monkeypatch.chdir(tmp_path)
+
+    third = len(lines) // 3 + 1
+    for i in range(3):
+        with open(tmp_path / "stores" / f"store{i}.txt", "w", encoding="utf-8") as file:
+            file.writelines([header] + lines[i * third:(i + 1) * third])
+
+    return tmp_path
+
+
+def test_batch_outputs_match_a_single_run(generated_file, stores):
+    exit_code = main.main(["stores/", "missing.txt", "--offline", "--workers", "2",
+                           "--output-dir", "out", "--region", "North"])
+
+    assert exit_code == main.EXIT_PARTIAL
+
+    with open("out/batch_summary.json", encoding="utf-8") as file:
+        summary = json.load(file)
+    assert (summary["succeeded"], summary["failed"]) == (3, 1)
+    assert "missing.txt" in [entry["file"] for entry in summary["files"] if "error" in entry]
+
+    valid, _, filter_summary = validate_and_filter(
+        parse_transactions(read_sales_data(generated_file)), "North"
+    )
+    assert summary["filter_summary"] == filter_summary
+
+    combined = load_state("out/combined_state.json")
+    expected = SalesAggregator(valid)
+    assert combined.transaction_count == expected.transaction_count
+    assert combined.customer_analysis() == expected.customer_analysis()
+    assert combined.daily_sales_trend() == expected.daily_sales_trend()
+
+    rows = load_enriched_data("out/combined_enriched_sales_data.txt")
+    assert [row["TransactionID"] for row in rows] == [tx["TransactionID"] for tx in valid]
+    for i in range(3):
+        assert os.path.exists(f"out/store{i}/sales_report.txt")
+
+
+def test_batch_with_every_file_missing(stores):
+    assert main.main(["missing.txt", "--offline", "--output-dir", "out"]) == main.EXIT_FAILED
+    assert main.main(["nothing/*.txt", "--offline"]) == main.EXIT_USAGE
+
+
+def test_expand_inputs_and_output_names(stores):
+    files = expand_inputs(["stores/", "stores/store1.txt", "stores/*0.txt", "other.txt"])
+
+    # Directory matches in name order, duplicates dropped, missing paths kept
+    assert files == [f"stores/store{i}.txt" for i in range(3)] + ["other.txt"]
+    assert output_names(["a/sales.txt", "b/sales.txt", "c/other.txt"]) == ["sales", "sales_1", "other"]
+
+
+def test_batch_keeps_parsed_caches_in_the_output_dir(stores):
+    for _ in range(2):
+        assert main.main(["stores/", "--offline", "--workers", "1", "--output-dir", "out"]) == main.EXIT_OK
+
+    with open("out/batch_summary.json", encoding="utf-8") as file:
+        summary = json.load(file)
+
+    assert sorted(os.listdir("stores")) == [f"store{i}.txt" for i in range(3)]
+    assert [entry["parse_cache"] for entry in summary["files"]] == ["hit"] * 3
+    for i in range(3):
+        assert os.path.exists(f"out/store{i}/store{i}.txt.parsed")
@@ -0,0 +1,46 @@
+from generate_sales_data import generate_sales_file
+from run_benchmarks import compare
+
+from utils.file_handler import parse_transactions, read_sales_data, validate_and_filter
+
+
+def test_generator_is_deterministic(tmp_path):
+    first = generate_sales_file(str(tmp_path / "a.txt"), 3000, seed=3)
+    second = generate_sales_file(str(tmp_path / "b.txt"), 3000, seed=3)
+    other = generate_sales_file(str(tmp_path / "c.txt"), 3000, seed=4)
+
+    with open(first, "rb") as a, open(second, "rb") as b, open(other, "rb") as c:
+        data = a.read()
+        assert data == b.read()
+        assert data != c.read()
+
+
+def test_generated_rows_and_dirty_rate(tmp_path):
+    dirty = generate_sales_file(str(tmp_path / "dirty.txt"), 5000, seed=1, dirty_rate=0.05)
+    clean = generate_sales_file(str(tmp_path / "clean.txt"), 5000, seed=1, dirty_rate=0)
+
+    _, clean_invalid, _ = validate_and_filter(parse_transactions(read_sales_data(clean)))
+    valid, dirty_invalid, _ = validate_and_filter(parse_transactions(read_sales_data(dirty)))
+
+    assert len(parse_transactions(read_sales_data(clean))) == 5000
+    assert clean_invalid == 0
+    assert 0 < dirty_invalid < 5000 * 0.05
+    assert len(valid) > 5000 * 0.9
+
+
+def test_compare_flags_slow_and_big_stages():
+    baseline = {"rows": 1000, "stages": {
+        "parse": {"rows_per_second": 100000, "peak_bytes": 10_000_000},
+        "report": {"rows_per_second": 100000, "peak_bytes": 10_000_000},
+        "gone": {"rows_per_second": 1, "peak_bytes": 1},
+    }}
+    results = {
+        "parse": {"seconds": 1.0, "rows_per_second": 50000, "peak_bytes": 30_000_000},
+        "report": {"seconds": 1.0, "rows_per_second": 90000, "peak_bytes": 11_000_000},
+    }
+
+    regressions = compare(results, 1000, baseline, tolerance=0.25)
+
+    assert len(regressions) == 2
+    assert all(regression.startswith("parse:") for regression in regressions)
+    assert compare(results, 2000, baseline, tolerance=0.25) == regressions[:1]
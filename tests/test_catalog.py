@@ -0,0 +1,246 @@
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from utils import api_handler
+from utils.api_handler import create_product_mapping, fetch_product_catalog, lazy_product_mapping
+
+PAGE_CAP = 30
+
+
+class CatalogHandler(BaseHTTPRequestHandler):
+    """
+    Stand-in for the products API: paginated with limit / skip (capped at
+    PAGE_CAP per page) and a per-page ETag, plus the single-product
+    endpoint (<url>/<id>).
+    """
+
+    def do_GET(self):
+        catalog = self.server.catalog
+        url = urlparse(self.path)
+
+        if url.path.rstrip("/") != urlparse(catalog.url).path:
+            return self.single_product(catalog, url.path.rsplit("/", 1)[-1])
+
+        query = parse_qs(url.query)
+        limit = min(int(query.get("limit", ["30"])[0]), PAGE_CAP)
+        skip = int(query.get("skip", ["0"])[0])
+
+        body = json.dumps({
+            "products": catalog.products[skip:skip + limit],
+            "total": len(catalog.products), "skip": skip, "limit": limit
+        }).encode("utf-8")
+        etag = '"' + hashlib.sha256(body).hexdigest()[:16] + '"'
+
+        conditional = self.headers.get("If-None-Match") is not None
+        catalog.requests.append((skip, conditional))
+
+        if catalog.failures:
+            catalog.failures -= 1
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def single_product(self, catalog, product_id):
+        catalog.requests.append((product_id, False))
+        product = next((product for product in catalog.products if str(product["id"]) == product_id), None)
+
+        body = json.dumps(product).encode("utf-8") if product else b"{}"
+        self.send_response(200 if product else 404)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubCatalog:
+    def __init__(self, url, size):
+        self.url = url
+        self.products = [{"id": i, "title": f"Product {i}", "price": float(i)} for i in range(1, size + 1)]
+        self.requests = []
+        self.failures = 0
+
+
+def start_catalog(size, path="/products"):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CatalogHandler)
+    server.catalog = StubCatalog(f"http://127.0.0.1:{server.server_port}{path}", size)
+    server.catalog.close = lambda: (server.shutdown(), server.server_close())
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    return server
+
+
+@pytest.fixture
+def servers():
+    started = []
+
+    def start(size=95, path="/products"):
+        server = start_catalog(size, path)
+        started.append(server)
+        return server.catalog
+
+    yield start
+
+    for server in started:
+        server.catalog.close()
+
+
+@pytest.fixture
+def cache_file(tmp_path):
+    return str(tmp_path / "catalog_cache.json")
+
+
+def test_fresh_cache_is_used_without_requests(servers, cache_file):
+    catalog = servers()
+
+    products, status = fetch_product_catalog(catalog.url, cache_file)
+    assert status["cache"] == "miss" and status["source"] == "api"
+    assert products == catalog.products
+
+    catalog.requests.clear()
+    products, status = fetch_product_catalog(catalog.url, cache_file)
+
+    assert status["cache"] == "hit"
+    assert products == catalog.products
+    assert catalog.requests == []
+
+
+def test_expired_cache_is_refetched(servers, cache_file):
+    catalog = servers()
+    fetch_product_catalog(catalog.url, cache_file)
+    catalog.products[0]["price"] = 999.0
+
+    products, status = fetch_product_catalog(catalog.url, cache_file, ttl=0)
+
+    assert status["cache"] == "refreshed"
+    assert products[0]["price"] == 999.0
+
+
+def test_offline_and_unreachable_use_the_cached_copy(servers, cache_file, monkeypatch):
+    catalog = servers()
+    fetch_product_catalog(catalog.url, cache_file)
+
+    products, status = fetch_product_catalog(catalog.url, cache_file, ttl=0, offline=True)
+    assert status["cache"] == "offline"
+    assert products == catalog.products
+
+    monkeypatch.setattr(api_handler.time, "sleep", lambda seconds: None)
+    catalog.close()
+    products, status = fetch_product_catalog(catalog.url, cache_file, ttl=0)
+
+    assert status["cache"] == "stale" and status["error"]
+    assert products == catalog.products
+
+
+def test_cache_is_keyed_by_base_url(servers, cache_file):
+    first = servers(size=10)
+    second = servers(size=20)
+
+    fetch_product_catalog(first.url, cache_file)
+    products, status = fetch_product_catalog(second.url, cache_file)
+
+    assert status["source"] == "api"
+    assert products == second.products
+    assert fetch_product_catalog(first.url, cache_file, offline=True)[0] == []
+
+
+def test_pages_are_fetched_at_the_server_page_size(servers, cache_file):
+    catalog = servers(size=95)
+
+    products, _ = fetch_product_catalog(catalog.url, cache_file)
+
+    assert products == catalog.products
+    assert sorted(skip for skip, _ in catalog.requests) == [0, 30, 60, 90]
+
+
+def test_unchanged_catalog_is_revalidated(servers, cache_file):
+    catalog = servers(size=95)
+    fetch_product_catalog(catalog.url, cache_file)
+    catalog.requests.clear()
+
+    products, status = fetch_product_catalog(catalog.url, cache_file, ttl=0)
+
+    assert status["cache"] == "revalidated" and status["source"] == "cache"
+    assert products == catalog.products
+    assert sorted(catalog.requests) == [(0, True), (30, True), (60, True), (90, True)]
+
+
+def test_changed_later_page_is_refetched(servers, cache_file):
+    catalog = servers(size=95)
+    fetch_product_catalog(catalog.url, cache_file)
+    catalog.products[70]["price"] = 1.5
+
+    products, status = fetch_product_catalog(catalog.url, cache_file, ttl=0)
+
+    assert status["cache"] == "refreshed" and status["source"] == "api"
+    assert products == catalog.products
+
+    # The refreshed copy is revalidated as a whole next time
+    products, status = fetch_product_catalog(catalog.url, cache_file, ttl=0)
+    assert status["cache"] == "revalidated"
+    assert products[70]["price"] == 1.5
+
+
+def test_changed_first_page_refetches_everything(servers, cache_file):
+    catalog = servers(size=95)
+    fetch_product_catalog(catalog.url, cache_file)
+    catalog.products.append({"id": 96, "title": "Product 96", "price": 96.0})
+    catalog.requests.clear()
+
+    products, status = fetch_product_catalog(catalog.url, cache_file, ttl=0)
+
+    assert status["cache"] == "refreshed"
+    assert products == catalog.products
+    assert sorted(catalog.requests) == [(0, True), (30, False), (60, False), (90, False)]
+
+
+def test_failed_requests_are_retried(servers, cache_file, monkeypatch):
+    monkeypatch.setattr(api_handler.time, "sleep", lambda seconds: None)
+    catalog = servers(size=95)
+    catalog.failures = 2
+
+    products, status = fetch_product_catalog(catalog.url, cache_file)
+
+    assert status["source"] == "api"
+    assert products == catalog.products
+    assert len(catalog.requests) == 6
+
+    catalog.failures = 100
+    products, status = fetch_product_catalog(catalog.url, cache_file, ttl=0)
+    assert status["cache"] == "stale" and "503" in status["error"]
+
+
+def test_lazy_lookup_requests_only_used_products(servers, monkeypatch):
+    monkeypatch.setattr(api_handler, "_product_lru", api_handler.OrderedDict())
+    catalog = servers(size=20)
+    transactions = [{"ProductID": product_id} for product_id in ("P103", "P101", "P103", "P150", "X1")]
+
+    mapping = lazy_product_mapping(transactions, catalog.url)
+
+    assert mapping == create_product_mapping([catalog.products[0], catalog.products[2]])
+    assert sorted(catalog.requests) == [("1", False), ("3", False), ("50", False)]
+
+    # Found and unknown (404) products are both remembered for the run
+    catalog.requests.clear()
+    assert lazy_product_mapping(transactions, catalog.url) == mapping
+    assert catalog.requests == []
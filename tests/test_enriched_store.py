@@ -0,0 +1,51 @@
+import pytest
+from generate_sales_data import product_catalog
+
+from utils.api_handler import create_product_mapping, enrich_sales_data, save_enriched_data
+from utils.enriched_store import BASE_FIELDS, ENRICHED_FIELDS, load_enriched_data
+from utils.file_handler import parse_transactions, read_sales_data, validate_and_filter
+
+FIELDS = BASE_FIELDS + ENRICHED_FIELDS
+OPTIONAL = {".zst": "zstandard", ".npz": "numpy", ".parquet": "pyarrow"}
+
+
+@pytest.fixture(scope="module")
+def enriched(generated_file):
+    lines = read_sales_data(generated_file)
+    table = validate_and_filter(parse_transactions(lines, as_table=True))[0]
+    return enrich_sales_data(table, create_product_mapping(product_catalog()))
+
+
+def file_rows(enriched):
+    return [{field: row[field] for field in FIELDS} for row in enriched]
+
+
+@pytest.mark.parametrize("extension", [".txt", ".gz", ".zst", ".npz", ".parquet"])
+def test_formats_round_trip(enriched, extension, tmp_path):
+    if extension in OPTIONAL:
+        pytest.importorskip(OPTIONAL[extension])
+
+    filename = str(tmp_path / f"enriched{extension}")
+
+    assert save_enriched_data(enriched, filename)
+    assert load_enriched_data(filename) == file_rows(enriched)
+
+    columns = load_enriched_data(filename, as_columns=True)
+    assert list(columns["TransactionID"]) == [row["TransactionID"] for row in enriched]
+
+
+def test_append_and_dictionary_rows(enriched, tmp_path):
+    filename = str(tmp_path / "enriched.txt")
+    rows = list(enriched)
+
+    assert save_enriched_data(rows[:100], filename)
+    assert save_enriched_data(enriched[100:250], filename, append=True)
+
+    assert load_enriched_data(filename) == file_rows(rows[:250])
+
+
+def test_failed_save_leaves_no_file(enriched, tmp_path):
+    filename = tmp_path / "missing" / "enriched.txt"
+
+    assert not save_enriched_data(enriched, str(filename))
+    assert not filename.exists()
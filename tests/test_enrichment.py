@@ -0,0 +1,35 @@
+from generate_sales_data import product_catalog
+
+from utils.api_handler import create_product_mapping, enrich_sales_data, enrichment_summary
+from utils.file_handler import parse_transactions, read_sales_data, validate_and_filter
+
+
+def enriched_pair(filename):
+    lines = read_sales_data(filename)
+    mapping = create_product_mapping(product_catalog())
+    valid = validate_and_filter(parse_transactions(lines))[0]
+    table = validate_and_filter(parse_transactions(lines, as_table=True))[0]
+
+    return enrich_sales_data(valid, mapping), enrich_sales_data(table, mapping)
+
+
+def test_table_and_dictionaries_enrich_alike(generated_file):
+    from_dicts, from_table = enriched_pair(generated_file)
+    rows = list(from_dicts)
+
+    assert rows == list(from_table)
+    assert {row["API_Match"] for row in rows} == {True, False}
+    assert from_dicts.summary() == from_table.summary() == enrichment_summary(rows)
+
+
+def test_indexing_and_slicing(generated_file):
+    from_dicts, from_table = enriched_pair(generated_file)
+    rows = list(from_dicts)
+
+    for enriched in (from_dicts, from_table):
+        assert enriched[0] == rows[0]
+        assert enriched[-1] == rows[-1]
+        assert enriched[5:10] == rows[5:10]
+        assert enriched[-3:] == rows[-3:]
+        assert enriched[::1000] == rows[::1000]
+        assert enriched[10:5] == []
@@ -0,0 +1,150 @@
+import os
+
+import pytest
+
+import main
+from utils.data_processor import SalesAggregator
+from utils.file_handler import parse_transactions, read_sales_data, validate_and_filter
+from utils.incremental import incremental_analysis, load_snapshot, save_snapshot
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """
+    Empty working directory with the data/ and output/ folders main.py
+    writes to.
+    """
+
+    (tmp_path / "data").mkdir()
+    (tmp_path / "output").mkdir()
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def write_lines(filename, lines, mode="w"):
+    with open(filename, mode, encoding="utf-8") as file:
+        file.writelines(lines)
+
+
+def full_aggregator(filename, *filters):
+    valid = validate_and_filter(parse_transactions(read_sales_data(filename)), *filters)[0]
+    return SalesAggregator(valid)
+
+
+def test_appended_runs_match_a_full_run(generated_file, workdir):
+    with open(generated_file, encoding="utf-8") as file:
+        lines = file.readlines()
+
+    filename = str(workdir / "sales.txt")
+    snapshot_file = str(workdir / "snapshot.json")
+    write_lines(filename, lines[:5000])
+
+    for start, end in ((5000, 9000), (9000, len(lines))):
+        _, _, _, snapshot = incremental_analysis(filename, snapshot_file)
+        save_snapshot(snapshot, snapshot_file)
+        write_lines(filename, lines[start:end], mode="a")
+
+    analytics, _, summary, snapshot = incremental_analysis(filename, snapshot_file)
+    expected = full_aggregator(filename)
+
+    assert not snapshot["rebuilt"]
+    assert analytics.transaction_count == expected.transaction_count
+    assert analytics.region_wise_sales() == expected.region_wise_sales()
+    assert analytics.top_customers(20) == expected.top_customers(20)
+    assert analytics.customer_analysis() == expected.customer_analysis()
+    assert summary["total_input"] == len(read_sales_data(filename))
+
+
+def test_cli_filters_apply_in_incremental_mode(sample_file, workdir):
+    exit_code = main.main(["--incremental", sample_file, "--offline", "--region", "North",
+                           "--min-amount", "1000"])
+    snapshot = load_snapshot()
+
+    assert exit_code == main.EXIT_OK
+    assert snapshot["filters"] == {"region": "North", "min_amount": 1000.0, "max_amount": None}
+
+    expected = full_aggregator(sample_file, "North", 1000)
+    assert SalesAggregator.from_state(snapshot["state"]).region_wise_sales() == expected.region_wise_sales()
+
+
+def test_failed_save_keeps_the_previous_snapshot(sample_file, workdir, monkeypatch):
+    monkeypatch.setattr(main, "save_enriched_data", lambda *args, **kwargs: False)
+
+    exit_code = main.run_incremental(sample_file, offline=True)
+
+    assert exit_code == main.EXIT_FAILED
+    assert not os.path.exists("output/analytics_snapshot.json")
+
+
+def test_partial_last_line_waits_for_the_next_run(sample_file, workdir):
+    with open(sample_file, encoding="utf-8") as file:
+        lines = file.readlines()
+
+    filename = str(workdir / "sales.txt")
+    snapshot_file = str(workdir / "snapshot.json")
+    write_lines(filename, lines[:-1] + [lines[-1].rstrip("\n")])
+
+    analytics, _, _, snapshot = incremental_analysis(filename, snapshot_file)
+    save_snapshot(snapshot, snapshot_file)
+    write_lines(filename, ["\n"], mode="a")
+    analytics, _, _, snapshot = incremental_analysis(filename, snapshot_file)
+
+    assert not snapshot["rebuilt"]
+    assert analytics.transaction_count == full_aggregator(filename).transaction_count
+
+
+def test_changed_prefix_rebuilds(sample_file, workdir):
+    with open(sample_file, encoding="utf-8") as file:
+        lines = file.readlines()
+
+    filename = str(workdir / "sales.txt")
+    snapshot_file = str(workdir / "snapshot.json")
+    write_lines(filename, lines)
+    save_snapshot(incremental_analysis(filename, snapshot_file)[3], snapshot_file)
+
+    changed = next(i for i, line in enumerate(lines) if line.endswith("|North\n"))
+    lines[changed] = lines[changed].replace("|North", "|South")
+    write_lines(filename, lines)
+    analytics, _, _, snapshot = incremental_analysis(filename, snapshot_file)
+
+    assert snapshot["rebuilt"]
+    assert analytics.region_wise_sales() == full_aggregator(filename).region_wise_sales()
+
+
+def test_carriage_return_line_endings(sample_file, workdir):
+    with open(sample_file, encoding="utf-8") as file:
+        lines = file.readlines()
+
+    filename = str(workdir / "sales.txt")
+    snapshot_file = str(workdir / "snapshot.json")
+    with open(filename, "w", encoding="utf-8", newline="") as file:
+        file.write("\r".join(line.rstrip("\n") for line in lines[:30]) + "\r")
+
+    save_snapshot(incremental_analysis(filename, snapshot_file)[3], snapshot_file)
+    with open(filename, "a", encoding="utf-8", newline="") as file:
+        file.write("\n" + "\r\n".join(line.rstrip("\n") for line in lines[30:]) + "\r\n")
+    analytics, _, summary, snapshot = incremental_analysis(filename, snapshot_file)
+
+    assert not snapshot["rebuilt"]
+    assert analytics.transaction_count == full_aggregator(filename).transaction_count > 0
+    assert summary["total_input"] == len(read_sales_data(filename))
+
+
+def test_appended_latin1_bytes_read_like_a_rebuild(sample_file, workdir):
+    with open(sample_file, "rb") as file:
+        data = file.read()
+
+    filename = str(workdir / "sales.txt")
+    snapshot_file = str(workdir / "snapshot.json")
+    with open(filename, "wb") as file:
+        file.write(data)
+    save_snapshot(incremental_analysis(filename, snapshot_file)[3], snapshot_file)
+
+    # A latin-1 region name: the whole file now reads as latin-1
+    with open(filename, "ab") as file:
+        file.write(b"T999|2024-12-31|P101|Laptop|1|100.0|C001|Nord\xe9\n")
+    analytics, _, _, snapshot = incremental_analysis(filename, snapshot_file)
+
+    assert snapshot["rebuilt"]
+    assert analytics.region_wise_sales() == full_aggregator(filename).region_wise_sales()
+    assert "Nord\xe9" in analytics.region_wise_sales()
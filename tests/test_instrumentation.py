@@ -0,0 +1,50 @@
+import json
+import pstats
+import tracemalloc
+
+import pytest
+
+from utils.instrumentation import RunRecorder
+
+
+def test_stages_are_recorded_and_written(tmp_path):
+    recorder = RunRecorder()
+
+    assert recorder.call("sum", sum, range(1000), rows_in=1000, rows_out=lambda result: 1) == 499500
+    with recorder.stage("rows") as stats:
+        stats.rows_out = 5
+
+    with pytest.raises(ZeroDivisionError):
+        recorder.call("fail", lambda: 1 / 0)
+
+    record_file = tmp_path / "run_record.json"
+    history_file = tmp_path / "run_history.jsonl"
+    recorder.write(str(record_file), "failed", str(history_file))
+    recorder.write(str(record_file), "ok", str(history_file))
+
+    record = json.loads(record_file.read_text(encoding="utf-8"))
+    stages = {stage["stage"]: stage for stage in record["stages"]}
+
+    assert record["status"] == "ok"
+    assert list(stages) == ["sum", "rows", "fail"]
+    assert (stages["sum"]["rows_in"], stages["sum"]["rows_out"]) == (1000, 1)
+    assert stages["rows"]["rows_out"] == 5
+    assert stages["fail"]["error"].startswith("ZeroDivisionError")
+    assert all(stage["wall_seconds"] >= 0 and stage["peak_rss_bytes"] for stage in record["stages"])
+
+    history = [json.loads(line) for line in history_file.read_text(encoding="utf-8").splitlines()]
+    assert [run["status"] for run in history] == ["failed", "ok"]
+
+
+def test_memory_tracing_and_profiling(tmp_path):
+    recorder = RunRecorder(trace_memory=True, profile_stage="build", profile_dir=str(tmp_path))
+
+    try:
+        recorder.call("build", lambda: [str(i) for i in range(100000)])
+    finally:
+        tracemalloc.stop()
+
+    stats = recorder.stages[0]
+    assert stats.tracemalloc_peak_bytes > 1_000_000
+    assert stats.profile_file == str(tmp_path / "profile_build.prof")
+    assert pstats.Stats(stats.profile_file).total_calls > 0
@@ -0,0 +1,43 @@
+from utils.data_processor import SalesAggregator
+from utils.file_handler import parse_transactions, read_sales_data, validate_and_filter
+from utils.transaction_table import CATEGORICAL_FIELDS, new_symbols
+
+
+def test_interned_rows_equal_plain_rows(generated_file):
+    lines = read_sales_data(generated_file)
+    plain = parse_transactions(lines)
+    interned = parse_transactions(lines, symbols=new_symbols())
+
+    assert interned == plain
+    assert SalesAggregator(validate_and_filter(interned)[0]).customer_analysis() == \
+        SalesAggregator(validate_and_filter(plain)[0]).customer_analysis()
+
+
+def test_equal_values_share_one_string(generated_file):
+    symbols = new_symbols()
+    transactions = parse_transactions(read_sales_data(generated_file), symbols=symbols)
+
+    for field in CATEGORICAL_FIELDS:
+        distinct = {id(tx[field]) for tx in transactions}
+        assert len(distinct) == len({tx[field] for tx in transactions}) == len(symbols[field].values)
+
+
+def test_shared_symbols_keep_codes_across_calls(generated_file):
+    lines = read_sales_data(generated_file)
+    half = len(lines) // 2
+    symbols = new_symbols()
+
+    first = parse_transactions(lines[:half], symbols=symbols)
+    second = parse_transactions(lines[half:], symbols=symbols)
+    sizes = {field: len(symbols[field].values) for field in CATEGORICAL_FIELDS}
+    table = parse_transactions(lines, as_table=True, symbols=symbols)
+
+    # The same objects in both halves, and no new values for the table
+    assert first[0]["Region"] is next(tx["Region"] for tx in second if tx["Region"] == first[0]["Region"])
+    assert list(table) == first + second
+
+    for field in CATEGORICAL_FIELDS:
+        values = symbols[field].values
+        assert table.symbols[field] is symbols[field]
+        assert len(values) == sizes[field]
+        assert [values[code] for code in table.codes[field]] == [tx[field] for tx in first + second]
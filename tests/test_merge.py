@@ -0,0 +1,110 @@
+import pytest
+
+from utils.data_processor import SalesAggregator, merge_aggregators, merge_state_files, save_state
+from utils.file_handler import parse_transactions, read_sales_data, validate_and_filter
+
+
+def valid_table(filename):
+    table = parse_transactions(read_sales_data(filename), as_table=True)
+    return validate_and_filter(table)[0]
+
+
+def halves(valid):
+    half = len(valid) // 2
+    return valid.take(range(half)), valid.take(range(half, len(valid)))
+
+
+def test_merged_aggregator_matches_whole(generated_file):
+    valid = valid_table(generated_file)
+    whole = SalesAggregator(valid)
+    merged = merge_aggregators([SalesAggregator(part) for part in halves(valid)])
+
+    assert merged.transaction_count == whole.transaction_count
+    assert merged.region_wise_sales() == whole.region_wise_sales()
+    assert merged.top_selling_products() == whole.top_selling_products()
+    assert merged.customer_analysis() == whole.customer_analysis()
+    assert merged.daily_sales_trend() == whole.daily_sales_trend()
+
+
+def test_state_round_trip(generated_file):
+    whole = SalesAggregator(valid_table(generated_file))
+    restored = SalesAggregator.from_state(whole.to_state())
+
+    assert restored.customer_analysis() == whole.customer_analysis()
+    assert restored.daily_sales_trend() == whole.daily_sales_trend()
+
+
+def thirds(valid):
+    third = len(valid) // 3
+    return [valid.take(range(start, min(start + third, len(valid))))
+            for start in range(0, len(valid), third)]
+
+
+def test_merge_order_does_not_change_the_results(generated_file, tmp_path):
+    valid = valid_table(generated_file)
+    parts = [SalesAggregator(part) for part in thirds(valid)]
+    whole = SalesAggregator(valid)
+
+    for i, part in enumerate(parts):
+        save_state(part, str(tmp_path / f"part{i}.json"))
+
+    for merged in (merge_aggregators(parts[::-1]), merge_state_files(str(tmp_path))):
+        assert merged.transaction_count == whole.transaction_count
+        assert merged.calculate_total_revenue() == pytest.approx(whole.calculate_total_revenue())
+        assert merged.top_selling_products(10) == whole.top_selling_products(10)
+        assert merged.customer_analysis() == whole.customer_analysis()
+        assert merged.daily_sales_trend() == whole.daily_sales_trend()
+
+
+def test_merge_hll_aggregators(generated_file):
+    valid = valid_table(generated_file)
+    merged = merge_aggregators(SalesAggregator(part, distinct="hll") for part in halves(valid))
+    restored = SalesAggregator.from_state(merged.to_state())
+    exact = SalesAggregator(valid).daily_sales_trend()
+
+    assert merged.distinct == restored.distinct == "hll"
+    assert restored.daily_sales_trend() == merged.daily_sales_trend()
+    for day, data in merged.daily_sales_trend().items():
+        assert data["transaction_count"] == exact[day]["transaction_count"]
+        assert abs(data["unique_customers"] - exact[day]["unique_customers"]) <= \
+            max(2, 0.1 * exact[day]["unique_customers"])
+
+
+def test_merge_rejects_different_modes(sample_file):
+    valid = valid_table(sample_file)
+
+    with pytest.raises(ValueError):
+        SalesAggregator(valid).merge(SalesAggregator(valid, distinct="hll"))
+    with pytest.raises(ValueError):
+        SalesAggregator(valid).merge(SalesAggregator(valid, customers="heavy_hitters"))
+
+
+def test_merge_heavy_hitter_aggregators(generated_file):
+    valid = valid_table(generated_file)
+    first, second = halves(valid)
+
+    parts = [SalesAggregator(part, customers="heavy_hitters", heavy_hitters=100)
+             for part in (first, second)]
+    merged = merge_aggregators(parts)
+
+    assert merged.customers == "heavy_hitters"
+    assert merged.heavy_hitters == 100
+    assert merged.transaction_count == len(valid)
+    assert merged.region_wise_sales() == SalesAggregator(valid).region_wise_sales()
+
+
+def test_merge_heavy_hitter_state_files(generated_file, tmp_path):
+    valid = valid_table(generated_file)
+    whole = SalesAggregator(valid, customers="heavy_hitters", heavy_hitters=100)
+
+    for i, part in enumerate(halves(valid)):
+        save_state(SalesAggregator(part, customers="heavy_hitters", heavy_hitters=100),
+                   str(tmp_path / f"part{i}.json"))
+
+    merged = merge_state_files(str(tmp_path))
+
+    assert merged.customers == "heavy_hitters"
+    assert merged.transaction_count == whole.transaction_count
+    assert merged.top_selling_products() == whole.top_selling_products()
+    assert len(merged.top_customers(10)) == 10
+
@@ -0,0 +1,54 @@
+from utils.file_handler import (file_encoding, parallel_parse_and_validate, parse_and_validate_chunk,
+                                parse_transactions, read_sales_data, split_file, validate_and_filter)
+
+HEADER = "TransactionID|Date|ProductID|ProductName|Quantity|UnitPrice|CustomerID|Region"
+LINES = ["T001|2024-12-01|P101|Café Latte|1|100|C001|North",
+         "T002|2024-12-01|P102|Mouse|0|50|C002|South",
+         "",
+         "T003|2024-12-02|P103|Keyboard|1|75|C003|East"]
+
+
+def serial(filename, *filters):
+    return validate_and_filter(parse_transactions(read_sales_data(filename)), *filters)
+
+
+def assert_parallel_matches(filename, *filters):
+    valid, invalid_count, summary = serial(filename, *filters)
+    parallel, parallel_invalid, parallel_summary = parallel_parse_and_validate(filename, *filters, workers=2)
+
+    assert list(parallel) == valid
+    assert parallel_invalid == invalid_count
+    assert parallel_summary == summary
+
+
+def test_parallel_matches_serial(generated_file):
+    assert_parallel_matches(generated_file)
+    assert_parallel_matches(generated_file, "North", 1000, 50000)
+
+
+def test_chunks_cover_every_line(generated_file):
+    ranges = split_file(generated_file, 7, min_chunk_bytes=1)
+    encoding = file_encoding(generated_file)
+    chunks = [parse_and_validate_chunk(generated_file, start, end, encoding) for start, end in ranges]
+
+    assert len(ranges) == 7
+    assert sum(total for _, total, _ in chunks) == len(read_sales_data(generated_file))
+    assert [tx for table, _, _ in chunks for tx in table] == serial(generated_file)[0]
+
+
+def test_parallel_universal_newlines(tmp_path):
+    for newline in ("\r", "\r\n"):
+        filename = tmp_path / "sales.txt"
+        filename.write_bytes(newline.join([HEADER] + LINES + [""]).encode("utf-8"))
+
+        assert_parallel_matches(str(filename))
+        assert len(parallel_parse_and_validate(str(filename))[0]) == 2
+
+
+def test_parallel_mixed_encodings(tmp_path):
+    filename = tmp_path / "sales.txt"
+    filename.write_bytes("\n".join([HEADER, LINES[0]]).encode("utf-8") + b"\n"
+                         + "\n".join(LINES[1:] + ["T004|2024-12-03|P104|Crème|1|9|C004|West"])
+                         .encode("latin-1"))
+
+    assert_parallel_matches(str(filename))
@@ -0,0 +1,61 @@
+import shutil
+
+import pytest
+
+from utils.data_processor import SalesAggregator
+from utils.file_handler import parse_transactions, read_sales_data, validate_and_filter
+from utils.parsed_cache import cache_filename, parse_sales_file
+
+
+@pytest.fixture
+def sales_file(generated_file, tmp_path):
+    filename = tmp_path / "sales.txt"
+    shutil.copy(generated_file, filename)
+    return str(filename)
+
+
+def test_cached_table_matches_a_fresh_parse(sales_file):
+    expected = parse_transactions(read_sales_data(sales_file))
+
+    table, status = parse_sales_file(sales_file)
+    assert status == {"cache": "miss", "lines": len(read_sales_data(sales_file))}
+
+    cached, status = parse_sales_file(sales_file)
+    assert status["cache"] == "hit"
+    assert list(cached) == list(table) == expected
+
+    # Memory-mapped tables validate and aggregate like parsed ones
+    valid = validate_and_filter(cached)[0]
+    assert list(valid) == validate_and_filter(expected)[0]
+    assert SalesAggregator(valid).customer_analysis() == \
+        SalesAggregator(validate_and_filter(table)[0]).customer_analysis()
+
+
+def test_changed_source_is_parsed_again(sales_file):
+    parse_sales_file(sales_file)
+
+    with open(sales_file, "a", encoding="utf-8") as file:
+        file.write("T999|2024-12-31|P101|Laptop|1|100|C001|North\n")
+    table, status = parse_sales_file(sales_file)
+
+    assert status["cache"] == "miss"
+    assert table[-1]["TransactionID"] == "T999"
+    assert parse_sales_file(sales_file)[1]["cache"] == "hit"
+
+
+def test_damaged_cache_is_rebuilt(sales_file):
+    parse_sales_file(sales_file)
+    with open(cache_filename(sales_file), "r+b") as file:
+        file.write(b"garbage!")
+
+    table, status = parse_sales_file(sales_file)
+
+    assert status["cache"] == "miss"
+    assert list(table) == parse_transactions(read_sales_data(sales_file))
+
+
+def test_cache_disabled(sales_file, tmp_path):
+    table, status = parse_sales_file(sales_file, use_cache=False)
+
+    assert status["cache"] == "disabled"
+    assert not (tmp_path / "sales.txt.parsed").exists()
@@ -0,0 +1,55 @@
+import json
+import shutil
+import threading
+
+import pytest
+from generate_sales_data import product_catalog
+
+import main
+
+
+@pytest.fixture
+def workdir(sample_file, tmp_path, monkeypatch):
+    (tmp_path / "data").mkdir()
+    (tmp_path / "output").mkdir()
+    shutil.copy(sample_file, tmp_path / "data" / "sales_data.txt")
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def test_catalog_fetch_overlaps_parsing(workdir, monkeypatch):
+    parsed = threading.Event()
+    parse_sales_file = main.parse_sales_file
+
+    def parse_and_signal(*args, **kwargs):
+        result = parse_sales_file(*args, **kwargs)
+        parsed.set()
+        return result
+
+    def fetch_after_parse(*args, **kwargs):
+        # Only returns if parsing ran while the fetch was in flight
+        assert parsed.wait(10)
+        return product_catalog(), {"cache": "hit", "source": "cache", "age_seconds": 0.0, "error": None}
+
+    monkeypatch.setattr(main, "parse_sales_file", parse_and_signal)
+    monkeypatch.setattr(main, "fetch_product_catalog", fetch_after_parse)
+
+    assert main.main(["--region", "North"]) == main.EXIT_OK
+
+    with open("output/run_record.json", encoding="utf-8") as file:
+        stages = {stage["stage"] for stage in json.load(file)["stages"]}
+    assert {"fetch (bg)", "read+parse", "fetch wait", "enrich", "report"} <= stages
+    assert (workdir / "output" / "sales_report.txt").exists()
+
+
+def test_lazy_lookup_runs_in_the_background(workdir, monkeypatch):
+    product_ids = []
+
+    def lookup(transactions, *args, **kwargs):
+        product_ids.extend(sorted(transactions.symbols["ProductID"].values))
+        return {}
+
+    monkeypatch.setattr(main, "lazy_product_mapping", lookup)
+
+    assert main.main(["--lazy-products", "--min-amount", "0"]) == main.EXIT_OK
+    assert "P101" in product_ids
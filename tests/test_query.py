@@ -0,0 +1,53 @@
+import pytest
+
+from utils.file_handler import parse_transactions, read_sales_data, validate_and_filter
+from utils.query import SalesIndex
+
+FILTERS = [
+    (None, None, None),
+    ("North", None, None),
+    (None, 5000, None),
+    (None, None, 20000),
+    ("South", 1000, 50000),
+    ("East", 50000, 1000),       # empty amount range
+    ("Nowhere", None, None),
+]
+
+
+@pytest.fixture(scope="module")
+def rows(generated_file):
+    return parse_transactions(read_sales_data(generated_file))
+
+
+@pytest.fixture(scope="module")
+def index(rows):
+    return SalesIndex(rows)
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_query_matches_validate_and_filter(rows, index, filters):
+    valid, invalid_count, summary = validate_and_filter(rows, *filters)
+    table, query_invalid, query_summary = index.query(*filters).result()
+
+    assert list(table) == valid
+    assert query_invalid == invalid_count
+    assert {key: query_summary[key] for key in summary} == summary
+
+
+def test_date_product_and_customer_filters(rows, index):
+    valid = validate_and_filter(rows)[0]
+    products = {"P101", "P105"}
+    customers = {tx["CustomerID"] for tx in valid[:40]}
+
+    result = index.query(min_amount=1000, start_date="2024-03-01", end_date="2024-06-30",
+                         product_ids=products, customer_ids=customers)
+    expected = [
+        tx for tx in valid
+        if tx["Amount"] >= 1000 and "2024-03-01" <= tx["Date"] <= "2024-06-30"
+        and tx["ProductID"] in products and tx["CustomerID"] in customers
+    ]
+
+    assert list(result.to_table()) == expected
+    assert len(result) == result.summary["final_count"] == len(expected)
+    assert result.summary["filtered_by_date"] > 0
+    assert result.summary["filtered_by_product"] > 0
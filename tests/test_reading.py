@@ -0,0 +1,43 @@
+from utils.file_handler import read_sales_data
+
+HEADER = "TransactionID|Date|ProductID|ProductName|Quantity|UnitPrice|CustomerID|Region"
+LINES = ["T001|2024-12-01|P101|Café Latte|1|100|C001|North",
+         "T002|2024-12-01|P102|Mouse|2|50|C002|South",
+         "",
+         "T003|2024-12-02|P103|Keyboard|1|75|C003|East"]
+
+
+def assert_stream_matches(filename):
+    lines = read_sales_data(str(filename))
+
+    assert lines
+    assert list(read_sales_data(str(filename), stream=True)) == lines
+
+
+def test_stream_matches_read(generated_file):
+    assert_stream_matches(generated_file)
+
+
+def test_stream_universal_newlines(tmp_path):
+    for newline in ("\n", "\r", "\r\n"):
+        filename = tmp_path / "sales.txt"
+        filename.write_bytes(newline.join([HEADER] + LINES + [""]).encode("utf-8"))
+
+        assert_stream_matches(filename)
+        assert list(read_sales_data(str(filename), stream=True))[0] == LINES[0]
+
+
+def test_stream_mixed_encodings(tmp_path):
+    # A utf-8 line followed by a latin-1 one: the whole file is latin-1
+    filename = tmp_path / "sales.txt"
+    filename.write_bytes("\n".join([HEADER, LINES[0]]).encode("utf-8") + b"\n"
+                         + "\n".join(LINES[1:] + ["T004|2024-12-03|P104|Crème|1|9|C004|West"])
+                         .encode("latin-1"))
+
+    assert_stream_matches(filename)
+    assert next(read_sales_data(str(filename), stream=True)) == LINES[0].encode("utf-8").decode("latin-1")
+
+
+def test_stream_missing_file(tmp_path, capsys):
+    assert list(read_sales_data(str(tmp_path / "missing.txt"), stream=True)) == []
+    assert "File not found" in capsys.readouterr().out
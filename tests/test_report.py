@@ -0,0 +1,38 @@
+from generate_sales_data import product_catalog
+
+from report_generator import generate_sales_report
+from utils.api_handler import create_product_mapping, enrich_sales_data, enrichment_summary
+from utils.data_processor import SalesAggregator
+from utils.file_handler import parse_transactions, read_sales_data, validate_and_filter
+
+
+def report_lines(filename):
+    # Without the "Generated: <time>" line
+    with open(filename, encoding="utf-8") as file:
+        return [line for line in file if "Generated:" not in line]
+
+
+def test_report_from_precomputed_aggregates(sample_file, tmp_path):
+    valid = validate_and_filter(parse_transactions(read_sales_data(sample_file)))[0]
+    enriched = enrich_sales_data(valid, create_product_mapping(product_catalog()))
+
+    computed = tmp_path / "computed.txt"
+    precomputed = tmp_path / "precomputed.txt"
+    generate_sales_report(valid, enriched, str(computed))
+    # Everything comes from the aggregator and the summary, not the rows
+    generate_sales_report([], [], str(precomputed), analytics=SalesAggregator(valid),
+                          enrichment=enrichment_summary(enriched))
+
+    lines = report_lines(computed)
+    assert lines == report_lines(precomputed)
+    assert f"Records Processed: {len(valid)}\n" in "".join(lines)
+    assert "TOP 5 CUSTOMERS" in "".join(lines)
+
+
+def test_report_of_no_transactions(tmp_path):
+    filename = tmp_path / "empty.txt"
+    generate_sales_report([], [], str(filename))
+
+    text = "".join(report_lines(filename))
+    assert "Date Range:           N/A" in text
+    assert "Best Selling Day: N/A" in text
@@ -0,0 +1,129 @@
+import pytest
+
+import main
+from report_generator import generate_sales_report
+from utils.batch import run_batch
+from utils.data_processor import SalesAggregator, load_state, merge_aggregators
+from utils.file_handler import parse_transactions, read_sales_data, validate_and_filter
+from utils.incremental import incremental_analysis, load_snapshot
+from utils.rollups import SalesRollup
+
+NO_ENRICHMENT = {"total": 0, "enriched": 0, "failed_products": []}
+
+
+def assert_close(result, expected):
+    """
+    Rollup results are equal up to float rounding of the revenue sums
+    (merged HyperLogLog sketches give the same estimates).
+    """
+
+    assert list(result) == list(expected)
+    for key, data in expected.items():
+        assert result[key] == pytest.approx(data)
+
+
+def valid_table(filename):
+    return validate_and_filter(parse_transactions(read_sales_data(filename), as_table=True))[0]
+
+
+def test_buckets_add_up_to_the_daily_trend(generated_file):
+    valid = valid_table(generated_file)
+    trend = SalesAggregator(valid).daily_sales_trend()
+    rollup = SalesRollup(valid)
+
+    days = rollup.series("day")
+    assert {day: data["transaction_count"] for day, data in days.items()} == \
+        {day: data["transaction_count"] for day, data in trend.items()}
+
+    for granularity in ("week", "month"):
+        buckets = rollup.series(granularity).values()
+        assert sum(data["transaction_count"] for data in buckets) == len(valid)
+        assert sum(data["revenue"] for data in buckets) == pytest.approx(sum(valid.amount))
+
+    start, end = "2024-03-01", "2024-03-31"
+    in_march = [data for day, data in trend.items() if start <= day <= end]
+    march = rollup.total(start, end)
+    assert march["transaction_count"] == sum(data["transaction_count"] for data in in_march)
+    assert march["revenue"] == pytest.approx(sum(data["revenue"] for data in in_march))
+    assert rollup.peak("day")[0] == SalesAggregator(valid).find_peak_sales_day()[0]
+
+
+def test_merged_and_restored_rollups_match(generated_file):
+    valid = valid_table(generated_file)
+    half = len(valid) // 2
+    whole = SalesRollup(valid)
+    merged = SalesRollup(valid.take(range(half))).merge(SalesRollup(valid.take(range(half, len(valid)))))
+    restored = SalesRollup.from_state(whole.to_state())
+
+    for rollup in (merged, restored):
+        assert_close(rollup.series("month", region="North"), whole.series("month", region="North"))
+        assert rollup.last_days(7) == pytest.approx(whole.last_days(7))
+
+
+def test_per_product_customers_are_opt_in(generated_file):
+    valid = valid_table(generated_file)
+    product = valid.symbols["ProductName"].values[0]
+    lean = SalesRollup(valid)
+    full = SalesRollup(valid, product_customers=True)
+
+    # Same sums either way; only the per-product customer estimates differ
+    assert_close(lean.series("week"), full.series("week"))
+    assert lean.series("month", product=product).keys() == full.series("month", product=product).keys()
+    assert all(data["unique_customers"] is None for data in lean.series("month", product=product).values())
+    assert lean.total(product=product)["unique_customers"] is None
+    assert full.total(product=product)["unique_customers"] > 0
+
+    restored = SalesRollup.from_state(lean.to_state())
+    assert restored.total(product=product) == lean.total(product=product)
+    assert len(str(lean.to_state())) < len(str(full.to_state())) / 2
+
+    with pytest.raises(ValueError):
+        lean.merge(full)
+
+
+def test_aggregator_keeps_rollups_through_merge_and_state(generated_file):
+    valid = valid_table(generated_file)
+    half = len(valid) // 2
+    parts = [SalesAggregator(part, rollup=True)
+             for part in (valid.take(range(half)), valid.take(range(half, len(valid))))]
+
+    merged = SalesAggregator.from_state(merge_aggregators(parts).to_state())
+
+    assert_close(merged.rollup.series("week"), SalesRollup(valid).series("week"))
+    assert SalesAggregator(valid).rollup is None
+
+    with pytest.raises(ValueError):
+        merge_aggregators([parts[0], SalesAggregator(valid)])
+
+
+def test_report_has_a_date_range_section(sample_file, tmp_path):
+    valid = validate_and_filter(parse_transactions(read_sales_data(sample_file)))[0]
+    with_rollup = tmp_path / "with.txt"
+    without = tmp_path / "without.txt"
+
+    generate_sales_report(valid, [], str(with_rollup), SalesAggregator(valid, rollup=True),
+                          enrichment=NO_ENRICHMENT)
+    generate_sales_report(valid, [], str(without), SalesAggregator(valid), enrichment=NO_ENRICHMENT)
+
+    assert "DATE-RANGE HIGHLIGHTS" in with_rollup.read_text(encoding="utf-8")
+    assert "Peak Month:   2024-12" in with_rollup.read_text(encoding="utf-8")
+    assert "DATE-RANGE HIGHLIGHTS" not in without.read_text(encoding="utf-8")
+
+
+def test_batch_and_incremental_keep_rollups(sample_file, tmp_path, monkeypatch):
+    run_batch([sample_file], str(tmp_path / "batch"), workers=1, offline=True, rollup=True)
+
+    combined = load_state(str(tmp_path / "batch" / "combined_state.json"))
+    assert combined.rollup is not None
+    assert "DATE-RANGE HIGHLIGHTS" in (tmp_path / "batch" / "combined_sales_report.txt").read_text(encoding="utf-8")
+
+    (tmp_path / "output").mkdir()
+    (tmp_path / "data").mkdir()
+    monkeypatch.chdir(tmp_path)
+    assert main.main(["--incremental", sample_file, "--offline", "--rollups"]) == main.EXIT_OK
+    assert SalesAggregator.from_state(load_snapshot()["state"]).rollup.total() == \
+        combined.rollup.total()
+
+    # Turning rollups off rebuilds the snapshot without them
+    analytics, _, _, snapshot = incremental_analysis(sample_file)
+    assert snapshot["rebuilt"] and analytics.rollup is None
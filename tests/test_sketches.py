@@ -0,0 +1,96 @@
+import random
+from collections import Counter
+
+import pytest
+
+from utils.data_processor import SalesAggregator
+from utils.file_handler import parse_transactions, read_sales_data, validate_and_filter
+from utils.sketches import CountMinSketch, SpaceSaving
+
+
+def skewed_stream(size, keys, seed=1):
+    """
+    (key, weight) pairs where a few keys carry most of the weight.
+    """
+
+    rng = random.Random(seed)
+    return [(f"K{int(rng.paretovariate(1.2)) % keys}", rng.randint(1, 50)) for _ in range(size)]
+
+
+def test_top_n_matches_a_full_sort(generated_file):
+    valid = validate_and_filter(parse_transactions(read_sales_data(generated_file)))[0]
+    analytics = SalesAggregator(valid)
+
+    # sorted() is stable, so ties keep first-seen order like nlargest
+    by_quantity = sorted(analytics.product_totals(), key=lambda x: x[1], reverse=True)
+    by_spend = sorted(analytics.customer_analysis().items(), key=lambda x: x[1]["total_spent"], reverse=True)
+    lowest = analytics.low_performing_products(threshold=10 ** 9)
+
+    for n in (1, 5, len(by_quantity)):
+        assert analytics.top_selling_products(n) == by_quantity[:n]
+        assert analytics.low_performing_products(10 ** 9, n) == lowest[:n]
+
+    assert [customer for customer, _, _ in analytics.top_customers(10)] == [customer for customer, _ in by_spend[:10]]
+
+
+def test_space_saving_bounds():
+    stream = skewed_stream(20000, 2000)
+    totals = Counter()
+    summary = SpaceSaving(50)
+    for key, weight in stream:
+        totals[key] += weight
+        summary.add(key, weight)
+
+    assert len(summary) == 50
+    for key, (estimate, error) in summary.counters.items():
+        assert estimate - error <= totals[key] <= estimate
+
+    threshold = sum(totals.values()) / 50
+    assert {key for key, total in totals.items() if total > threshold} <= summary.counters.keys()
+
+
+def test_space_saving_merge_keeps_bounds():
+    stream = skewed_stream(20000, 2000, seed=2)
+    totals = Counter()
+    parts = [SpaceSaving(50), SpaceSaving(50)]
+    for i, (key, weight) in enumerate(stream):
+        totals[key] += weight
+        parts[i % 2].add(key, weight)
+
+    merged = SpaceSaving.from_state(parts[0].to_state()).merge(parts[1])
+
+    for key, (estimate, error) in merged.counters.items():
+        assert estimate - error <= totals[key] <= estimate
+
+    threshold = sum(totals.values()) / 50
+    assert {key for key, total in totals.items() if total > threshold} <= merged.counters.keys()
+
+
+def test_count_min_never_undercounts():
+    stream = skewed_stream(20000, 2000, seed=3)
+    totals = Counter()
+    sketch = CountMinSketch(width=256, depth=4)
+    for key, weight in stream:
+        totals[key] += weight
+        sketch.add(key, weight)
+
+    assert all(sketch.estimate(key) >= total for key, total in totals.items())
+
+    restored = CountMinSketch.from_state(sketch.to_state())
+    assert all(restored.estimate(key) == sketch.estimate(key) for key in totals)
+
+
+def test_heavy_hitters_exact_while_customers_fit(generated_file):
+    valid = validate_and_filter(parse_transactions(read_sales_data(generated_file), as_table=True))[0]
+    exact = SalesAggregator(valid)
+    sketched = SalesAggregator(valid, customers="heavy_hitters", heavy_hitters=1000)
+
+    expected = exact.top_customers(20)
+    top = sketched.top_customers(20)
+
+    assert [customer for customer, _, _ in top] == [customer for customer, _, _ in expected]
+    assert [spent for _, spent, _ in top] == pytest.approx([spent for _, spent, _ in expected])
+    assert all(count >= orders for (_, _, count), (_, _, orders) in zip(top, expected))
+
+    with pytest.raises(ValueError):
+        sketched.customer_analysis()
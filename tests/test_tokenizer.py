@@ -0,0 +1,65 @@
+import pytest
+
+from utils.file_handler import detect_encoding, parse_transactions, read_sales_data, tokenize_sales_file
+
+HEADER = b"TransactionID|Date|ProductID|ProductName|Quantity|UnitPrice|CustomerID|Region\n"
+
+
+def expected_table(filename):
+    return parse_transactions(read_sales_data(filename), as_table=True)
+
+
+def test_tokenizer_matches_line_parser(generated_file):
+    table, line_count = tokenize_sales_file(generated_file, block_bytes=1 << 16)
+
+    assert line_count == len(read_sales_data(generated_file))
+    assert list(table) == list(expected_table(generated_file))
+
+
+def test_latin1_byte_held_across_ascii_block(tmp_path):
+    # "\xc3" ends the first block and "\xa9" starts the third: the bytes
+    # only look like utf-8 if the ASCII block in between is skipped
+    first = HEADER + b"T001|2024-12-01|P101|Caf\xc3"
+    block_bytes = len(first)
+    second = b"|1|100|C001|North\nT002|2024-12-01|P102|Mouse|2|50|C002|South\nT003|2024-12-02|P103|"
+    second = second.replace(b"Mouse", b"Mouse" + b"s" * (block_bytes - len(second)))
+    data = first + second + b"\xa9Keyboard|1|75|C003|East\n"
+
+    assert len(second) == block_bytes
+    assert detect_encoding(data, block_bytes) == "latin-1"
+
+    filename = tmp_path / "sales.txt"
+    filename.write_bytes(data)
+    table, _ = tokenize_sales_file(str(filename), block_bytes=block_bytes)
+
+    assert list(table) == list(expected_table(str(filename)))
+    assert table.row(0)["ProductName"] == "Caf\xc3"
+
+
+def test_universal_newlines(tmp_path):
+    lines = [b"T001|2024-12-01|P101|Laptop|1|100|C001|North",
+             b"T002|2024-12-01|P102|Mouse|2|50|C002|South",
+             b"",
+             b"T003|2024-12-02|P103|Keyboard|1|75|C003|East"]
+
+    for newline in (b"\r", b"\r\n"):
+        filename = tmp_path / "sales.txt"
+        filename.write_bytes(HEADER.replace(b"\n", newline) + newline.join(lines) + newline)
+        table, line_count = tokenize_sales_file(str(filename))
+
+        assert line_count == 3
+        assert list(table) == list(expected_table(str(filename)))
+
+
+def test_numpy_tokenizer_matches_line_parser(generated_file, tmp_path):
+    pytest.importorskip("numpy")
+
+    latin1 = tmp_path / "latin1.txt"
+    latin1.write_bytes(HEADER + b"T001|2024-12-01|P101|Caf\xe9|1|1,200|C001|North\r"
+                       + b"T002|2024-12-01|P102|Mouse, Wireless|2|50|C002|South\r\n\n")
+
+    for filename in (generated_file, str(latin1)):
+        table, line_count = tokenize_sales_file(filename, block_bytes=1 << 16, backend="numpy")
+
+        assert line_count == len(read_sales_data(filename))
+        assert list(table) == list(expected_table(filename))
@@ -0,0 +1,53 @@
+from utils.file_handler import parse_transactions, read_sales_data, validate_and_filter
+from utils.transaction_table import PackedStrings, SymbolTable, TransactionTable
+
+
+def test_table_rows_match_parsed_dictionaries(generated_file):
+    lines = read_sales_data(generated_file)
+    rows = parse_transactions(lines)
+    table = parse_transactions(lines, as_table=True)
+
+    assert len(table) == len(rows)
+    assert list(table) == rows
+    assert table[-1] == rows[-1]
+    assert table[10:20] == rows[10:20]
+    assert list(TransactionTable.from_transactions(rows)) == rows
+
+
+def test_validated_table_matches_validated_dictionaries(generated_file):
+    lines = read_sales_data(generated_file)
+    valid, invalid_count, summary = validate_and_filter(parse_transactions(lines))
+    table, table_invalid, table_summary = validate_and_filter(parse_transactions(lines, as_table=True))
+
+    assert table.validated
+    assert list(table) == valid
+    assert (table_invalid, table_summary) == (invalid_count, summary)
+
+
+def test_take_and_extend(generated_file):
+    table = parse_transactions(read_sales_data(generated_file), as_table=True)
+    rows = list(table)
+    positions = list(range(0, len(table), 7))
+
+    taken = table.take(positions)
+    assert taken.symbols is table.symbols
+    assert list(taken) == [rows[i] for i in positions]
+
+    # Extending re-encodes codes from other symbol tables
+    combined = TransactionTable()
+    combined.extend(table.take(range(100)))
+    combined.extend(TransactionTable.from_transactions(rows[100:200]))
+    assert list(combined) == rows[:200]
+
+
+def test_symbol_table_and_packed_strings():
+    symbols = SymbolTable(["North", "South", "North"])
+    assert symbols.values == ["North", "South"]
+    assert symbols.encode("East") == 2
+    assert symbols.decode(1) == "South"
+    assert "East" in symbols and "West" not in symbols
+
+    strings = PackedStrings(*PackedStrings.pack(["T001", "", "Café"]))
+    assert list(strings) == ["T001", "", "Café"]
+    assert strings[-1] == "Café"
+    assert len(strings) == 3
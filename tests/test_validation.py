@@ -0,0 +1,90 @@
+from utils.file_handler import (VALIDATION_RULES, parallel_parse_and_validate, parse_transactions,
+                                read_sales_data, validate_and_filter, validate_rows, validate_rows_with,
+                                validate_table, validate_table_with)
+from utils.query import SalesIndex
+from utils.transaction_table import Transaction, TransactionTable
+
+FILTERS = ("North", 1000, 50000)
+
+
+def row(**fields):
+    tx = {
+        "TransactionID": "T001", "Date": "2024-12-01", "ProductID": "P101",
+        "ProductName": "Laptop", "Quantity": 2, "UnitPrice": 100.0,
+        "CustomerID": "C001", "Region": "North"
+    }
+    tx.update(fields)
+    return tx
+
+
+def test_rejections_counted_under_first_failed_rule():
+    transactions = [
+        row(),
+        row(Quantity=0, CustomerID="X1"),   # fails quantity first
+        row(UnitPrice=-1.0),
+        row(TransactionID="X001", Region=""),
+        row(ProductID="Q101"),
+        row(CustomerID=""),
+        row(Region="  "),
+    ]
+
+    valid, invalid_count, summary = validate_and_filter(transactions)
+
+    assert len(valid) == 1
+    assert invalid_count == 6
+    assert summary["invalid_by_rule"] == {name: 1 for name, _, _ in VALIDATION_RULES}
+    assert sum(summary["invalid_by_rule"].values()) == summary["invalid"]
+
+
+def test_returns_dictionaries_with_amount_by_default():
+    valid, _, _ = validate_and_filter([row()])
+
+    assert type(valid[0]) is dict
+    assert valid[0]["Amount"] == 200.0
+
+
+def test_records_read_like_dictionaries():
+    dicts, _, dict_summary = validate_and_filter([row(), row(Quantity=3)])
+    records, _, record_summary = validate_and_filter([row(), row(Quantity=3)], records=True)
+
+    assert all(isinstance(tx, Transaction) for tx in records)
+    assert records == dicts
+    assert record_summary == dict_summary
+
+    tx = records[1]
+    assert tx["Amount"] == tx.Amount == 300.0
+    assert tx.get("Missing", 5) == 5
+    assert dict(tx) == tx.to_dict() == dicts[1]
+
+
+def test_all_paths_give_the_same_summary(generated_file):
+    lines = read_sales_data(generated_file)
+
+    valid, _, summary = validate_and_filter(parse_transactions(lines), *FILTERS)
+    table, _, table_summary = validate_and_filter(parse_transactions(lines, as_table=True), *FILTERS)
+    parallel, _, parallel_summary = parallel_parse_and_validate(generated_file, *FILTERS, workers=3)
+    query_summary = SalesIndex(parse_transactions(lines)).query(*FILTERS).summary
+
+    assert summary["invalid"] > 0
+    assert summary == table_summary == parallel_summary
+    assert {key: query_summary[key] for key in summary} == summary
+    assert list(table) == valid
+    assert list(parallel) == valid
+
+
+def test_inline_chain_matches_the_rule_predicates(generated_file):
+    lines = read_sales_data(generated_file)
+    transactions = parse_transactions(lines) + [
+        row(Quantity=0), row(UnitPrice=float("nan")), row(TransactionID="X1"),
+        row(ProductID=""), row(CustomerID="c1"), row(Region="\t"),
+    ]
+
+    inline = validate_rows(transactions)
+    predicates = validate_rows_with(parse_transactions(lines) + transactions[-6:], False, VALIDATION_RULES)
+
+    assert inline == predicates
+    assert all(inline[2])
+
+    table = TransactionTable.from_transactions(transactions)
+    assert validate_table(table) == validate_table_with(table, VALIDATION_RULES)
+    assert validate_table(table)[1] == inline[2]
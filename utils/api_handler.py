@@ -1,26 +1,333 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
+from requests.adapters import HTTPAdapter
+
+from utils.enriched_store import ENRICHED_FIELDS, write_enriched
+from utils.transaction_table import Transaction, TransactionTable
 
 BASE_URL = "https://dummyjson.com/products"
 
+# Local copy of the product catalog, revalidated after CATALOG_TTL seconds
+CATALOG_CACHE_FILE = "data/product_catalog_cache.json"
+CATALOG_TTL = 24 * 60 * 60
+REQUEST_TIMEOUT = 10
+
+# Pagination / concurrency / retry settings for catalog downloads
+PAGE_SIZE = 100
+MAX_WORKERS = 8
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.5
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# In-process LRU of single-product lookups (numeric API id -> product,
+# or None when the API has no such product), shared across calls
+PRODUCT_LRU_SIZE = 4096
+_product_lru = OrderedDict()
+_product_lru_lock = threading.Lock()
+
 #--------------3.1--------------# 
-def fetch_all_products():
+def fetch_all_products(base_url=BASE_URL, cache_file=CATALOG_CACHE_FILE, ttl=CATALOG_TTL,
+                       offline=False, timeout=REQUEST_TIMEOUT):
     """
     Fetches all products from DummyJSON API.
 
     Returns: list of product dictionaries
+    (see fetch_product_catalog for caching / offline behaviour)
+    """
+
+    products, _ = fetch_product_catalog(base_url, cache_file, ttl, offline, timeout)
+
+    return products
+
+
+def fetch_product_catalog(base_url=BASE_URL, cache_file=CATALOG_CACHE_FILE, ttl=CATALOG_TTL,
+                          offline=False, timeout=REQUEST_TIMEOUT):
+    """
+    Fetches the product catalog through a local on-disk cache.
+
+    - A cached copy younger than ttl seconds is used as is (no request).
+    - An older copy is revalidated page by page with If-None-Match /
+      If-Modified-Since; only changed pages are downloaded again, and if
+      every page answers 304 only its timestamp is refreshed.
+    - If the API cannot be reached, the last good copy is served.
+    - offline=True never touches the network.
+    - cache_file=None disables the cache.
+    - A cached copy is only used for the base_url it was fetched from.
+
+    Returns: (products, status) where status is a dictionary with
+    'cache' ('hit', 'miss', 'revalidated', 'refreshed', 'stale',
+    'offline' or 'disabled'), 'source' ('cache', 'api' or 'none'),
+    'age_seconds' of the copy served and 'error' (if any).
     """
 
+    cache = load_catalog_cache(cache_file, base_url) if cache_file else None
+    age = time.time() - cache["fetched_at"] if cache else None
+
+    status = {
+        "cache": "disabled" if not cache_file else "miss",
+        "source": "none",
+        "age_seconds": age,
+        "error": None
+    }
+
+    if cache and (offline or age < ttl):
+        status["cache"] = "offline" if offline else "hit"
+        status["source"] = "cache"
+        return cache["products"], status
+
+    if offline:
+        status["error"] = "offline mode and no cached catalog"
+        print("No cached product catalog available in offline mode")
+        return [], status
+
     try:
-        # Using limit=100 to fetch all available products
-        response = requests.get(f"{BASE_URL}?limit=100")
-        data = response.json()
+        with create_session() as session:
+            # The first page doubles as the revalidation request; if it is
+            # unchanged (and so is the total), every other cached page is
+            # revalidated too
+            cached_pages = cache.get("pages") if cache else None
+            first_page, first_entry = fetch_page(session, base_url, 0, PAGE_SIZE, timeout,
+                                                 cached_pages[0] if cached_pages else None)
+
+            if first_page is None:
+                products, pages, changed = revalidate_pages(session, base_url, cache, timeout)
+
+                if not changed:
+                    cache["fetched_at"] = time.time()
+                    save_catalog_cache(cache, cache_file)
+
+                    status.update(cache="revalidated", source="cache", age_seconds=0.0)
+                    return cache["products"], status
+            else:
+                products, pages = fetch_remaining_pages(session, base_url, first_page, first_entry,
+                                                        timeout)
+
+    except (requests.RequestException, ValueError, KeyError) as e:
+        status["error"] = str(e)
 
-        print("Successfully fetched products from API")
-        return data["products"]
+        if cache:
+            print("Failed to fetch products from API, using cached catalog")
+            status.update(cache="stale", source="cache")
+            return cache["products"], status
 
-    except:
         print("Failed to fetch products from API")
-        return []
+        return [], status
+
+    print("Successfully fetched products from API")
+
+    if cache_file:
+        save_catalog_cache({
+            "base_url": base_url,
+            "fetched_at": time.time(),
+            "pages": pages,
+            "products": products
+        }, cache_file)
+
+    status.update(cache="refreshed" if cache else status["cache"], source="api", age_seconds=0.0)
+
+    return products, status
+
+
+def create_session(pool_size=MAX_WORKERS):
+    """
+    Returns a requests.Session whose connection pool is large enough
+    for pool_size concurrent requests to the same host.
+    """
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    return session
+
+
+def get_with_retries(session, url, params=None, headers=None, timeout=REQUEST_TIMEOUT,
+                     retries=MAX_RETRIES, backoff=BACKOFF_FACTOR):
+    """
+    GET with a per-request timeout, retrying connection errors, timeouts
+    and retryable status codes (429 / 5xx) with exponential backoff
+    (backoff, 2 * backoff, 4 * backoff ... seconds).
+
+    Returns: the final requests.Response
+    """
+
+    for attempt in range(retries + 1):
+        try:
+            response = session.get(url, params=params, headers=headers, timeout=timeout)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == retries:
+                raise
+        else:
+            if response.status_code not in RETRY_STATUS_CODES or attempt == retries:
+                return response
+
+        time.sleep(backoff * (2 ** attempt))
+
+
+def fetch_page(session, base_url, skip, limit=PAGE_SIZE, timeout=REQUEST_TIMEOUT, cached=None):
+    """
+    Fetches one page of products starting at skip. With cached (the
+    page's entry in the catalog cache) the request is conditional.
+
+    Returns: (page, entry) where page is the response body ({'products',
+    'total', ...}), or None if the server answered 304 Not Modified, and
+    entry is the page's cache entry ({'skip', 'limit', 'count', 'etag',
+    'last_modified'})
+    """
+
+    headers = {}
+    if cached:
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    response = get_with_retries(session, base_url, {"limit": limit, "skip": skip}, headers, timeout)
+
+    if response.status_code == 304 and cached:
+        return None, cached
+
+    response.raise_for_status()
+    page = response.json()
+
+    return page, {
+        "skip": skip,
+        "limit": limit,
+        "count": len(page["products"]),
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified")
+    }
+
+
+def fetch_remaining_pages(session, base_url, first_page, first_entry, timeout=REQUEST_TIMEOUT,
+                          max_workers=MAX_WORKERS):
+    """
+    Given the first page ({'products', 'total', ...}) and its cache
+    entry, fetches every other page concurrently (at most max_workers at
+    a time) on the shared session.
+
+    Returns: (products, pages) with all products, in catalog order, and
+    the cache entry of each page
+    """
+
+    products = list(first_page["products"])
+    pages = [first_entry]
+    total = first_page.get("total", len(products))
+
+    # Step by the page size the server actually returned (it may cap limit)
+    page_size = len(products)
+    skips = range(page_size, total, page_size) if page_size else []
+
+    if skips:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(skips))) as executor:
+            results = executor.map(
+                lambda skip: fetch_page(session, base_url, skip, page_size, timeout), skips
+            )
+
+            for page, entry in results:
+                products.extend(page["products"])
+                pages.append(entry)
+
+    return products, pages
+
+
+def revalidate_pages(session, base_url, cache, timeout=REQUEST_TIMEOUT, max_workers=MAX_WORKERS):
+    """
+    Revalidates every page of a cached catalog after the first one
+    (which the caller has already found unchanged) with conditional
+    requests, concurrently. Unchanged pages keep their cached products.
+
+    Returns: (products, pages, changed) where changed tells whether any
+    page was downloaded again
+    """
+
+    cached_pages = cache["pages"]
+    cached_products = cache["products"]
+
+    products = cached_products[:cached_pages[0]["count"]]
+    pages = [cached_pages[0]]
+    changed = False
+
+    if len(cached_pages) > 1:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(cached_pages) - 1)) as executor:
+            results = executor.map(
+                lambda entry: fetch_page(session, base_url, entry["skip"], entry["limit"], timeout,
+                                         entry),
+                cached_pages[1:]
+            )
+
+            offset = len(products)
+            for cached, (page, entry) in zip(cached_pages[1:], results):
+                if page is None:
+                    products.extend(cached_products[offset:offset + cached["count"]])
+                else:
+                    products.extend(page["products"])
+                    changed = True
+
+                pages.append(entry)
+                offset += cached["count"]
+
+    return products, pages, changed
+
+
+def load_catalog_cache(cache_file, base_url=BASE_URL):
+    """
+    Loads the cached catalog of base_url. Returns None if missing,
+    unreadable or fetched from another URL.
+    """
+
+    try:
+        with open(cache_file, "r", encoding="utf-8") as file:
+            cache = json.load(file)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(cache, dict) or "fetched_at" not in cache or "products" not in cache:
+        return None
+
+    if cache.get("base_url") != base_url:
+        return None
+
+    return cache
+
+
+def save_catalog_cache(cache, cache_file):
+    """
+    Writes the catalog cache atomically (temp file + rename).
+    """
+
+    temp_file = f"{cache_file}.tmp"
+
+    try:
+        with open(temp_file, "w", encoding="utf-8") as file:
+            json.dump(cache, file)
+        os.replace(temp_file, cache_file)
+    except OSError as e:
+        print(f"Warning: Could not write product catalog cache ({e})")
+
+
+def format_catalog_status(status):
+    """
+    One-line description of a fetch_product_catalog() status for the
+    run summary.
+    """
+
+    text = f"cache {status['cache']}, source: {status['source']}"
+
+    if status["age_seconds"] is not None and status["source"] == "cache":
+        text += f", age: {status['age_seconds'] / 60:.0f} min"
+
+    if status["error"]:
+        text += f", error: {status['error']}"
+
+    return text
 
 def create_product_mapping(api_products):
     """
@@ -41,78 +348,319 @@ def create_product_mapping(api_products):
 
     return product_mapping
 
+def api_product_id(product_id):
+    """
+    Maps a sales ProductID to its API id (example: P101 -> 1).
+    Returns None if the ProductID is not in the expected format.
+    """
+
+    try:
+        return int(product_id[1:]) - 100
+    except (ValueError, TypeError):
+        return None
+
+
+def distinct_product_ids(transactions):
+    """
+    Returns the set of ProductIDs used by the transactions.
+    TransactionTables are read from their code column directly.
+    """
+
+    if isinstance(transactions, TransactionTable):
+        values = transactions.symbols["ProductID"].values
+        return {values[code] for code in set(transactions.codes["ProductID"])}
+
+    return {tx["ProductID"] for tx in transactions}
+
+
+def fetch_products_by_ids(ids, base_url=BASE_URL, timeout=REQUEST_TIMEOUT, max_workers=MAX_WORKERS):
+    """
+    Looks up individual products through the single-product endpoint
+    ({base_url}/{id}). Ids already in the in-process LRU are not
+    requested again; the rest are fetched concurrently on one pooled
+    session. Products the API does not know (404) are remembered too.
+
+    Returns: list of product dictionaries that were found
+    """
+
+    ids = sorted({i for i in ids if i is not None and i > 0})
+    found = {}
+    missing = []
+
+    with _product_lru_lock:
+        for product_id in ids:
+            if product_id in _product_lru:
+                _product_lru.move_to_end(product_id)
+                found[product_id] = _product_lru[product_id]
+            else:
+                missing.append(product_id)
+
+    if missing:
+        def fetch_one(product_id):
+            try:
+                response = get_with_retries(session, f"{base_url}/{product_id}", timeout=timeout)
+                if response.status_code == 404:
+                    return product_id, None, True
+                response.raise_for_status()
+                return product_id, response.json(), True
+            except (requests.RequestException, ValueError):
+                # Not cached, so the next call tries again
+                return product_id, None, False
+
+        with create_session(max_workers) as session:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(missing))) as executor:
+                results = list(executor.map(fetch_one, missing))
+
+        failed = 0
+        with _product_lru_lock:
+            for product_id, product, ok in results:
+                found[product_id] = product
+
+                if not ok:
+                    failed += 1
+                    continue
+
+                _product_lru[product_id] = product
+                _product_lru.move_to_end(product_id)
+                while len(_product_lru) > PRODUCT_LRU_SIZE:
+                    _product_lru.popitem(last=False)
+
+        if failed:
+            print(f"Failed to fetch {failed} of {len(missing)} products from API")
+
+    return [found[i] for i in ids if found.get(i) is not None]
+
+
+def lazy_product_mapping(transactions, base_url=BASE_URL, timeout=REQUEST_TIMEOUT):
+    """
+    Builds a product mapping for only the products the transactions use,
+    instead of downloading the whole catalog.
+
+    Returns: dictionary mapping product ID -> info (as create_product_mapping)
+    """
+
+    ids = [api_product_id(product_id) for product_id in distinct_product_ids(transactions)]
+
+    return create_product_mapping(fetch_products_by_ids(ids, base_url, timeout))
+
 #--------------3.2--------------# 
-def enrich_sales_data(transactions, product_mapping):
+# Values of the API columns for a product the API does not know
+UNMATCHED_ATTRIBUTES = (None, None, None, False)
+
+
+def product_attributes(product_id, product_mapping):
+    """
+    Returns the API column values for one ProductID as a tuple
+    (API_Category, API_Brand, API_Rating, API_Match).
+    """
+
+    # Extract numeric ID from ProductID (example: P101 -> 1)
+    api_info = product_mapping.get(api_product_id(product_id))
+
+    if api_info is None:
+        return UNMATCHED_ATTRIBUTES
+
+    return (api_info["category"], api_info["brand"], api_info["rating"], True)
+
+
+class EnrichedTransactions:
+    """
+    Enriched transactions as a join instead of a copy.
+
+    The API attributes are resolved once per distinct ProductID (for a
+    TransactionTable: one entry per ProductID dictionary code) and each
+    transaction reaches them through its ProductID. Enriched row
+    dictionaries are only built on the fly while iterating, so the
+    result costs O(distinct products), not O(transactions).
+
+    Iterating / indexing yields the same dictionaries enrich_sales_data
+    used to return (transaction fields + API_Category, API_Brand,
+    API_Rating, API_Match).
+    """
+
+    def __init__(self, transactions, product_mapping):
+        self.transactions = transactions
+
+        if isinstance(transactions, TransactionTable):
+            # Attribute table indexed by ProductID code
+            self.code_attributes = [
+                product_attributes(product_id, product_mapping)
+                for product_id in transactions.symbols["ProductID"].values
+            ]
+            self.attributes = None
+        else:
+            self.code_attributes = None
+            self.attributes = {
+                product_id: product_attributes(product_id, product_mapping)
+                for product_id in distinct_product_ids(transactions)
+            }
+
+    def iter_with_attributes(self):
+        """
+        Yields (transaction, attributes tuple) pairs without merging them.
+        """
+
+        if self.code_attributes is not None:
+            code_attributes = self.code_attributes
+            for tx, code in zip(self.transactions, self.transactions.codes["ProductID"]):
+                yield tx, code_attributes[code]
+        else:
+            attributes = self.attributes
+            for tx in self.transactions:
+                yield tx, attributes[tx["ProductID"]]
+
+    def _enriched_row(self, tx, attributes):
+        enriched_tx = tx.to_dict() if isinstance(tx, Transaction) else dict(tx)
+        enriched_tx.update(zip(ENRICHED_FIELDS, attributes))
+
+        return enriched_tx
+
+    def __iter__(self):
+        for tx, attributes in self.iter_with_attributes():
+            yield self._enriched_row(tx, attributes)
+
+    def __len__(self):
+        return len(self.transactions)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+
+        tx = self.transactions[i]
+
+        if self.code_attributes is not None:
+            if i < 0:
+                i += len(self.transactions)
+            attributes = self.code_attributes[self.transactions.codes["ProductID"][i]]
+        else:
+            attributes = self.attributes[tx["ProductID"]]
+
+        return self._enriched_row(tx, attributes)
+
+    def summary(self):
+        """
+        enrichment_summary() without building any row dictionaries.
+        """
+
+        total = len(self.transactions)
+        enriched = 0
+        failed_products = set()
+
+        if self.code_attributes is not None:
+            table = self.transactions
+            names = table.symbols["ProductName"].values
+            matched = [attributes[3] for attributes in self.code_attributes]
+
+            # Count rows per (ProductID, ProductName) code pair once
+            pair_counts = {}
+            for pair in zip(table.codes["ProductID"], table.codes["ProductName"]):
+                pair_counts[pair] = pair_counts.get(pair, 0) + 1
+
+            for (product_code, name_code), count in pair_counts.items():
+                if matched[product_code]:
+                    enriched += count
+                else:
+                    failed_products.add(names[name_code])
+        else:
+            for tx in self.transactions:
+                if self.attributes[tx["ProductID"]][3]:
+                    enriched += 1
+                else:
+                    failed_products.add(tx["ProductName"])
+
+        return {
+            "total": total,
+            "enriched": enriched,
+            "failed_products": sorted(failed_products)
+        }
+
+
+def enrich_sales_data(transactions, product_mapping=None):
     """
     Enriches transaction data with API product information.
 
-    Returns: list of enriched transaction dictionaries
+    If product_mapping is None, only the products used by the
+    transactions are looked up (see lazy_product_mapping).
+
+    Returns: EnrichedTransactions, which iterates / indexes as the list
+    of enriched transaction dictionaries (built lazily, without copying
+    every transaction up front)
     """
 
-    enriched_transactions = []
+    if product_mapping is None:
+        product_mapping = lazy_product_mapping(transactions)
 
-    for tx in transactions:
-        enriched_tx = tx.copy()  # Start with original transaction fields
+    return EnrichedTransactions(transactions, product_mapping)
 
-        try:
-            # Extract numeric ID from ProductID (example: P101 -> 101)
-            product_id_str = tx["ProductID"]
-            numeric_id = int(tx["ProductID"][1:]) - 100
+def enrichment_summary(enriched_transactions):
+    """
+    Summarizes enrichment results.
 
-            # Check if this ID exists in API product mapping
-            if numeric_id in product_mapping:
-                api_info = product_mapping[numeric_id]
+    Returns: dictionary with total, enriched (matched) count and the
+    sorted names of products that could not be enriched
+    """
 
-                enriched_tx["API_Category"] = api_info["category"]
-                enriched_tx["API_Brand"] = api_info["brand"]
-                enriched_tx["API_Rating"] = api_info["rating"]
-                enriched_tx["API_Match"] = True
+    if isinstance(enriched_transactions, EnrichedTransactions):
+        return enriched_transactions.summary()
 
-            else:
-                # Product not found in API
-                enriched_tx["API_Category"] = None
-                enriched_tx["API_Brand"] = None
-                enriched_tx["API_Rating"] = None
-                enriched_tx["API_Match"] = False
+    total = 0
+    enriched = 0
+    failed_products = set()
+
+    for tx in enriched_transactions:
+        total += 1
 
-        except:
-            # Any unexpected error → mark as not matched
-            enriched_tx["API_Category"] = None
-            enriched_tx["API_Brand"] = None
-            enriched_tx["API_Rating"] = None
-            enriched_tx["API_Match"] = False
+        if tx["API_Match"]:
+            enriched += 1
+        else:
+            failed_products.add(tx["ProductName"])
 
-        enriched_transactions.append(enriched_tx)
+    return {
+        "total": total,
+        "enriched": enriched,
+        "failed_products": sorted(failed_products)
+    }
 
-    return enriched_transactions
 
-def save_enriched_data(enriched_transactions, filename="data/enriched_sales_data.txt"):
+def merge_enrichment_summaries(first, second):
     """
-    Saves enriched transactions back to a pipe-delimited file.
+    Combines two enrichment_summary() results (either may be None).
     """
 
-    # Header including new API columns
-    header = (
-        "TransactionID|Date|ProductID|ProductName|Quantity|UnitPrice|CustomerID|Region|"
-        "API_Category|API_Brand|API_Rating|API_Match\n"
-    )
+    if first is None:
+        return second
+    if second is None:
+        return first
 
-    try:
-        with open(filename, "w", encoding="utf-8") as file:
-            file.write(header)
+    return {
+        "total": first["total"] + second["total"],
+        "enriched": first["enriched"] + second["enriched"],
+        "failed_products": sorted(set(first["failed_products"]) | set(second["failed_products"]))
+    }
 
-            for tx in enriched_transactions:
-                line = (
-                    f"{tx['TransactionID']}|{tx['Date']}|{tx['ProductID']}|{tx['ProductName']}|"
-                    f"{tx['Quantity']}|{tx['UnitPrice']}|{tx['CustomerID']}|{tx['Region']}|"
-                    f"{tx['API_Category']}|{tx['API_Brand']}|{tx['API_Rating']}|{tx['API_Match']}\n"
-                )
 
-                file.write(line)
+def save_enriched_data(enriched_transactions, filename="data/enriched_sales_data.txt", append=False,
+                       file_format=None):
+    """
+    Saves enriched transactions back to a pipe-delimited file.
+    With append=True the rows are added to the end of an existing file
+    (the header is only written when the file is new or empty).
 
-        print("Enriched data saved successfully!")
+    file_format: 'text', 'gzip', 'zstd', 'npz' or 'parquet' (default:
+    picked from the extension - .gz, .zst, .npz, .parquet, else text).
+    Lines are written in large batches and a full write goes through a
+    temp file + rename, so a failure never leaves a partial file behind.
+    Reload with enriched_store.load_enriched_data().
 
-    except:
-        print("Error saving enriched data file!")
+    Returns: True if the file was written
+    """
+
+    try:
+        write_enriched(enriched_transactions, filename, file_format, append)
 
+    except (OSError, ImportError, ValueError) as e:
+        print(f"Error saving enriched data file! ({e})")
+        return False
 
+    print("Enriched data saved successfully!")
+    return True
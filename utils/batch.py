@@ -0,0 +1,267 @@
+import contextlib
+import glob
+import io
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.api_handler import (create_product_mapping, enrich_sales_data,
+                               enrichment_summary, fetch_product_catalog,
+                               format_catalog_status, lazy_product_mapping,
+                               merge_enrichment_summaries, save_enriched_data)
+from utils.data_processor import SalesAggregator, merge_aggregators, save_state
+from utils.enriched_store import HEADER
+from utils.file_handler import add_filter_summaries, validate_and_filter
+from utils.parsed_cache import parse_sales_file
+
+from report_generator import generate_sales_report
+
+# Product mapping shared by the files a worker process handles
+# (None: look products up per file)
+_worker_product_mapping = None
+
+
+def expand_inputs(inputs, pattern="*.txt"):
+    """
+    Resolves sales file arguments: plain paths, glob patterns and
+    directories (every file matching `pattern` in them).
+
+    Returns: list of paths, in argument order (matches sorted by name),
+    without duplicates. Plain paths are kept even if they do not exist,
+    so they are reported as failed files.
+    """
+
+    files = []
+
+    for item in inputs:
+        if os.path.isdir(item):
+            matches = sorted(
+                path for path in glob.glob(os.path.join(item, pattern)) if os.path.isfile(path)
+            )
+        elif glob.has_magic(item):
+            matches = sorted(path for path in glob.glob(item, recursive=True) if os.path.isfile(path))
+        else:
+            matches = [item]
+
+        files.extend(matches)
+
+    return list(dict.fromkeys(files))
+
+
+def output_names(files):
+    """
+    Returns a unique output directory name per input file (its name
+    without extension, with a counter for repeated names).
+    """
+
+    names = []
+    seen = {}
+
+    for path in files:
+        name = os.path.splitext(os.path.basename(path))[0]
+        count = seen.get(name, 0)
+        seen[name] = count + 1
+        names.append(name if count == 0 else f"{name}_{count}")
+
+    return names
+
+
+def _init_worker(product_mapping):
+    global _worker_product_mapping
+    _worker_product_mapping = product_mapping
+
+
+def process_sales_file(filename, output_dir, region=None, min_amount=None, max_amount=None,
+                       use_cache=True, backend="python", rollup=False):
+    """
+    Runs the whole pipeline for one sales file and writes its outputs to
+    output_dir (enriched_sales_data.txt, sales_report.txt). The parsed
+    cache is kept there too (<file name>.parsed), so a batch never writes
+    into its input directories.
+
+    Returns: dictionary with the file's counts and its aggregator state
+    (for the combined outputs). Raises on failure.
+    """
+
+    if not os.path.isfile(filename):
+        raise FileNotFoundError(f"File not found: {filename}")
+
+    os.makedirs(output_dir, exist_ok=True)
+    cache_file = os.path.join(output_dir, f"{os.path.basename(filename)}.parsed")
+
+    # The per-step success messages would interleave across workers
+    with contextlib.redirect_stdout(io.StringIO()):
+        transactions, parse_status = parse_sales_file(filename, cache_file, use_cache=use_cache,
+                                                      backend=backend)
+        valid_transactions, invalid_count, filter_summary = validate_and_filter(
+            transactions, region, min_amount, max_amount
+        )
+        analytics = SalesAggregator(valid_transactions, rollup=rollup)
+
+        product_mapping = _worker_product_mapping
+        if product_mapping is None:
+            product_mapping = lazy_product_mapping(valid_transactions)
+
+        enriched_transactions = enrich_sales_data(valid_transactions, product_mapping)
+        enrichment = enrichment_summary(enriched_transactions)
+
+        enriched_file = os.path.join(output_dir, "enriched_sales_data.txt")
+        report_file = os.path.join(output_dir, "sales_report.txt")
+
+        if not save_enriched_data(enriched_transactions, enriched_file):
+            raise OSError(f"Could not write {enriched_file}")
+
+        generate_sales_report(valid_transactions, enriched_transactions, report_file,
+                              analytics=analytics, enrichment=enrichment)
+
+    return {
+        "file": filename,
+        "lines": parse_status["lines"],
+        "parse_cache": parse_status["cache"],
+        "filter_summary": filter_summary,
+        "enrichment": enrichment,
+        "enriched_file": enriched_file,
+        "report_file": report_file,
+        "state": analytics.to_state()
+    }
+
+
+def _process_safely(filename, output_dir, *args):
+    """
+    process_sales_file for the worker pool: failures are returned as
+    {'file', 'error'} so one bad file does not stop the batch.
+    """
+
+    try:
+        return process_sales_file(filename, output_dir, *args)
+    except Exception as e:
+        return {"file": filename, "error": f"{type(e).__name__}: {e}"}
+
+
+def combine_enriched_files(paths, filename):
+    """
+    Concatenates per-file enriched text files (one header) into
+    filename, through a temp file + rename.
+    """
+
+    temp_file = f"{filename}.tmp.{os.getpid()}"
+
+    try:
+        with open(temp_file, "w", encoding="utf-8") as out:
+            out.write(HEADER)
+
+            for path in paths:
+                with open(path, "r", encoding="utf-8") as file:
+                    file.readline()  # Skip header row
+                    shutil.copyfileobj(file, out)
+
+        os.replace(temp_file, filename)
+
+    finally:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+
+
+def run_batch(files, output_dir="output", region=None, min_amount=None, max_amount=None,
+              workers=None, offline=False, lazy_products=False, use_cache=True, backend="python",
+              rollup=False):
+    """
+    Processes many sales files in a ProcessPoolExecutor.
+
+    The product catalog is fetched once and shared with the workers
+    (lazy_products=True: each file looks up only its own products).
+    rollup=True keeps date-range rollups in every aggregator, so the
+    reports get a date-range section.
+    Each file gets output_dir/<name>/; the combined outputs are
+    - combined_sales_report.txt (from the merged aggregators)
+    - combined_enriched_sales_data.txt
+    - combined_state.json (merged SalesAggregator state)
+    - batch_summary.json (per-file counts and errors)
+
+    Returns: list of per-file results in input order (failed files have
+    an 'error' key instead of the counts)
+    """
+
+    workers = workers or os.cpu_count() or 1
+
+    if lazy_products:
+        product_mapping = None
+    else:
+        api_products, catalog_status = fetch_product_catalog(offline=offline)
+        product_mapping = create_product_mapping(api_products)
+        print(f"Product catalog: {len(api_products)} products ({format_catalog_status(catalog_status)})")
+
+    names = output_names(files)
+    tasks = [
+        (path, os.path.join(output_dir, name), region, min_amount, max_amount, use_cache, backend,
+         rollup)
+        for path, name in zip(files, names)
+    ]
+
+    if workers == 1 or len(files) <= 1:
+        _init_worker(product_mapping)
+        results = [_process_safely(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(files)), initializer=_init_worker,
+                                 initargs=(product_mapping,)) as executor:
+            futures = [executor.submit(_process_safely, *task) for task in tasks]
+            results = [future.result() for future in futures]
+
+    for result in results:
+        if "error" in result:
+            print(f"✗ {result['file']}: {result['error']}")
+        else:
+            summary = result["filter_summary"]
+            print(f"✓ {result['file']}: {summary['final_count']} valid, {summary['invalid']} invalid")
+
+    write_combined_outputs(results, output_dir)
+
+    return results
+
+
+def write_combined_outputs(results, output_dir):
+    """
+    Writes the combined outputs of run_batch for the successful files
+    (merged in input order, so the result does not depend on which
+    worker finished first).
+    """
+
+    succeeded = [result for result in results if "error" not in result]
+    os.makedirs(output_dir, exist_ok=True)
+
+    batch_summary = {
+        "files": [
+            {key: value for key, value in result.items() if key != "state"}
+            for result in results
+        ],
+        "succeeded": len(succeeded),
+        "failed": len(results) - len(succeeded)
+    }
+
+    if succeeded:
+        analytics = merge_aggregators(
+            SalesAggregator.from_state(result["state"]) for result in succeeded
+        )
+
+        enrichment = None
+        for result in succeeded:
+            enrichment = merge_enrichment_summaries(enrichment, result["enrichment"])
+
+        filter_summary = {}
+        for result in succeeded:
+            filter_summary = add_filter_summaries(filter_summary, result["filter_summary"])
+        batch_summary["filter_summary"] = filter_summary
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_sales_report([], [], os.path.join(output_dir, "combined_sales_report.txt"),
+                                  analytics=analytics, enrichment=enrichment)
+
+        combine_enriched_files(
+            [result["enriched_file"] for result in succeeded],
+            os.path.join(output_dir, "combined_enriched_sales_data.txt")
+        )
+        save_state(analytics, os.path.join(output_dir, "combined_state.json"))
+
+    with open(os.path.join(output_dir, "batch_summary.json"), "w", encoding="utf-8") as file:
+        json.dump(batch_summary, file, indent=2)
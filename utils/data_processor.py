@@ -1,5 +1,234 @@
+import heapq
+import json
+import os
+from array import array
+from itertools import chain
+from operator import attrgetter, itemgetter
+
+from utils.rollups import SalesRollup
+from utils.sketches import CountMinSketch, HyperLogLog, SpaceSaving
+from utils.transaction_table import CATEGORICAL_FIELDS, SymbolTable, Transaction, TransactionTable
+
+# Fields SalesAggregator.update reads from each row
+ROW_FIELDS = ("Quantity", "UnitPrice", "ProductName", "CustomerID", "Region", "Date")
+
+# Available analytics backends. "numpy" needs NumPy installed and runs
+# the vectorized versions in utils/vectorized.py (identical results).
+BACKENDS = ("python", "numpy")
+
+
+def _numpy_backend(transactions):
+    """
+    Returns (vectorized module, TransactionTable) for backend="numpy".
+    """
+
+    try:
+        from utils import vectorized
+    except ImportError as e:
+        raise ImportError("backend='numpy' requires NumPy to be installed") from e
+
+    if not isinstance(transactions, TransactionTable):
+        transactions = TransactionTable.from_transactions(transactions)
+
+    return vectorized, transactions
+
+
+def _check_backend(backend):
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}', expected one of {BACKENDS}")
+
+
+#--------------Single-metric passes--------------#
+# The standalone 2.1 - 2.3 functions each need one or two accumulators,
+# so they walk the rows once filling only those (SalesAggregator fills
+# all of them). The accumulators have the aggregator's layout and go
+# through the same formatting helpers, so both give identical results.
+
+def _rows(transactions, *fields):
+    """
+    Iterates (Quantity, UnitPrice, *fields) tuples over dictionaries,
+    Transaction records or a TransactionTable. fields must be
+    categorical fields.
+    """
+
+    if isinstance(transactions, TransactionTable):
+        columns = [
+            map(transactions.symbols[field].values.__getitem__, transactions.codes[field])
+            for field in fields
+        ]
+        return zip(transactions.quantity, transactions.unit_price, *columns)
+
+    transactions = iter(transactions)
+    first = next(transactions, None)
+    if first is None:
+        return iter(())
+
+    getter = (attrgetter if isinstance(first, Transaction) else itemgetter)("Quantity", "UnitPrice", *fields)
+
+    return map(getter, chain((first,), transactions))
+
+
+def _region_pass(transactions):
+    """
+    Returns (total revenue, {region: [total_sales, transaction_count]})
+    """
+
+    total_revenue = 0.0
+    region_data = {}
+
+    for quantity, unit_price, region_name in _rows(transactions, "Region"):
+        amount = quantity * unit_price
+        total_revenue += amount
+
+        region = region_data.get(region_name)
+        if region is None:
+            region = region_data[region_name] = [0.0, 0]
+        region[0] += amount
+        region[1] += 1
+
+    return total_revenue, region_data
+
+
+def _product_pass(transactions):
+    """
+    Returns {product name: [total_quantity, total_revenue]}
+    """
+
+    product_data = {}
+
+    for quantity, unit_price, product in _rows(transactions, "ProductName"):
+        prod = product_data.get(product)
+        if prod is None:
+            prod = product_data[product] = [0, 0.0]
+        prod[0] += quantity
+        prod[1] += quantity * unit_price
+
+    return product_data
+
+
+def _customer_pass(transactions):
+    """
+    Returns {customer: [total_spent, purchase_count, set(product names)]}
+    """
+
+    customer_data = {}
+
+    for quantity, unit_price, customer, product in _rows(transactions, "CustomerID", "ProductName"):
+        data = customer_data.get(customer)
+        if data is None:
+            data = customer_data[customer] = [0.0, 0, set()]
+        data[0] += quantity * unit_price
+        data[1] += 1
+        data[2].add(product)
+
+    return customer_data
+
+
+def _daily_pass(transactions, unique_customers=True):
+    """
+    Returns {date: [revenue, transaction_count, set(customer ids)]}
+    (the sets stay empty with unique_customers=False)
+    """
+
+    daily_data = {}
+
+    for quantity, unit_price, date, customer in _rows(transactions, "Date", "CustomerID"):
+        day = daily_data.get(date)
+        if day is None:
+            day = daily_data[date] = [0.0, 0, set()]
+        day[0] += quantity * unit_price
+        day[1] += 1
+        if unique_customers:
+            day[2].add(customer)
+
+    return daily_data
+
+
+def _region_stats(region_data, total_revenue):
+    """
+    Formats region accumulators as region_wise_sales returns them.
+    """
+
+    region_stats = {}
+
+    for region, (sales, count) in region_data.items():
+        percentage = (sales / total_revenue) * 100 if total_revenue > 0 else 0
+        region_stats[region] = {
+            "total_sales": sales,
+            "transaction_count": count,
+            "percentage": round(percentage, 2)
+        }
+
+    return dict(
+        sorted(region_stats.items(), key=lambda item: item[1]["total_sales"], reverse=True)
+    )
+
+
+def _top_products(product_data, n):
+    """
+    Top n (ProductName, TotalQuantity, TotalRevenue) by quantity.
+    nlargest keeps first-seen order among equal quantities, like a
+    stable sort, without sorting every product.
+    """
+
+    totals = [(product, data[0], data[1]) for product, data in product_data.items()]
+
+    return heapq.nlargest(n, totals, key=lambda x: x[1])
+
+
+def _low_products(product_data, threshold, n):
+    """
+    Products with total quantity below threshold, quantity ascending
+    (only the n lowest if n is given).
+    """
+
+    low_products = [
+        (product, data[0], data[1])
+        for product, data in product_data.items() if data[0] < threshold
+    ]
+
+    if n is not None:
+        return heapq.nsmallest(n, low_products, key=lambda x: x[1])
+
+    low_products.sort(key=lambda x: x[1])
+
+    return low_products
+
+
+def _customer_stats(total_spent, count, products):
+    avg_order = total_spent / count if count > 0 else 0
+
+    return {
+        "total_spent": total_spent,
+        "purchase_count": count,
+        "products_bought": sorted(products),
+        "avg_order_value": round(avg_order, 2)
+    }
+
+
+def _daily_stats(daily_data):
+    """
+    Formats daily accumulators as daily_sales_trend returns them.
+    """
+
+    return {
+        date: {
+            "revenue": data[0],
+            "transaction_count": data[1],
+            "unique_customers": len(data[2])
+        }
+        for date, data in sorted(daily_data.items())
+    }
+
+
+def _peak_day(daily_data):
+    peak_date = max(daily_data.items(), key=lambda x: x[1][0])
+
+    return (peak_date[0], peak_date[1][0], peak_date[1][1])
+
+
 #--------------2.1--------------# 
-def calculate_total_revenue(transactions):
+def calculate_total_revenue(transactions, backend="python"):
     """
     Calculates total revenue from all transactions
 
@@ -9,8 +238,20 @@ def calculate_total_revenue(transactions):
     Example: 1545000.50
     """
 
+    _check_backend(backend)
+    if backend == "numpy":
+        vectorized, table = _numpy_backend(transactions)
+        return vectorized.calculate_total_revenue(table)
+
     total_revenue = 0.0
 
+    # Columnar tables already hold Quantity * UnitPrice per row
+    if isinstance(transactions, TransactionTable):
+        for amount in transactions.amount:
+            total_revenue += amount
+
+        return total_revenue
+
     # Loop through each transaction and add Quantity * UnitPrice
     for tx in transactions:
         total_revenue += tx["Quantity"] * tx["UnitPrice"]
@@ -18,7 +259,7 @@ def calculate_total_revenue(transactions):
     return total_revenue
 
 
-def region_wise_sales(transactions):
+def region_wise_sales(transactions, backend="python"):
     """
     Analyzes sales by region
 
@@ -35,38 +276,17 @@ def region_wise_sales(transactions):
     }
     """
 
-    region_data = {}
-    total_revenue = calculate_total_revenue(transactions)
-
-    # Step 1: Aggregate sales and count per region
-    for tx in transactions:
-        region = tx["Region"]
-        amount = tx["Quantity"] * tx["UnitPrice"]
+    _check_backend(backend)
+    if backend == "numpy":
+        vectorized, table = _numpy_backend(transactions)
+        return vectorized.region_wise_sales(table)
 
-        if region not in region_data:
-            region_data[region] = {
-                "total_sales": 0.0,
-                "transaction_count": 0
-            }
-
-        region_data[region]["total_sales"] += amount
-        region_data[region]["transaction_count"] += 1
-
-    # Step 2: Calculate percentage of total sales
-    for region in region_data:
-        sales = region_data[region]["total_sales"]
-        percentage = (sales / total_revenue) * 100 if total_revenue > 0 else 0
-        region_data[region]["percentage"] = round(percentage, 2)
-
-    # Step 3: Sort dictionary by total_sales descending
-    sorted_regions = dict(
-        sorted(region_data.items(), key=lambda item: item[1]["total_sales"], reverse=True)
-    )
+    total_revenue, region_data = _region_pass(transactions)
 
-    return sorted_regions
+    return _region_stats(region_data, total_revenue)
 
 
-def top_selling_products(transactions, n=5):
+def top_selling_products(transactions, n=5, backend="python"):
     """
     Finds top n products by total quantity sold
 
@@ -80,39 +300,15 @@ def top_selling_products(transactions, n=5):
     ]
     """
 
-    product_data = {}
-
-    # Step 1: Aggregate quantity and revenue per product
-    for tx in transactions:
-        product = tx["ProductName"]       # Aggregate by ProductName
-        quantity = tx["Quantity"]         # Grab quantity
-        revenue = tx["Quantity"] * tx["UnitPrice"]  # Compute revenue
-
-        if product not in product_data:
-            product_data[product] = {
-                "total_quantity": 0,
-                "total_revenue": 0.0
-            }
-
-        product_data[product]["total_quantity"] += quantity
-        product_data[product]["total_revenue"] += revenue
+    _check_backend(backend)
+    if backend == "numpy":
+        vectorized, table = _numpy_backend(transactions)
+        return vectorized.top_selling_products(table, n)
 
-    # Step 2: Convert to list of tuples
-    product_list = []
-    for product in product_data:
-        data = product_data[product]
-        product_list.append(
-            (product, data["total_quantity"], data["total_revenue"])
-        )
+    return _top_products(_product_pass(transactions), n)
 
-    # Step 3: Sort by total_quantity descending
-    product_list.sort(key=lambda x: x[1], reverse=True)  #Sort by Quantity Decending
 
-    # Step 4: Return top n
-    return product_list[:n]
-
-
-def customer_analysis(transactions):
+def customer_analysis(transactions, backend="python"):
     """
     Analyzes customer purchase patterns
 
@@ -124,52 +320,27 @@ def customer_analysis(transactions):
             'total_spent': 95000.0,
             'purchase_count': 3,
             'avg_order_value': 31666.67,
-            'products_bought': ['Laptop', 'Mouse', 'Keyboard']
+            'products_bought': ['Keyboard', 'Laptop', 'Mouse']   # sorted
         },
         ...
     }
     """
 
-    customer_data = {}
+    _check_backend(backend)
+    if backend == "numpy":
+        vectorized, table = _numpy_backend(transactions)
+        return vectorized.customer_analysis(table)
 
-    # Step 1: Aggregate per customer
-    for tx in transactions:
-        customer = tx["CustomerID"]
-        product = tx["ProductName"]
-        amount = tx["Quantity"] * tx["UnitPrice"]
-
-        if customer not in customer_data:
-            customer_data[customer] = {
-                "total_spent": 0.0,
-                "purchase_count": 0,
-                "products_bought": set()  # using set to avoid duplicates
-            }
+    customer_data = _customer_pass(transactions)
 
-        customer_data[customer]["total_spent"] += amount
-        customer_data[customer]["purchase_count"] += 1
-        customer_data[customer]["products_bought"].add(product)
-
-    # Step 2: Calculate average order value & convert product sets to list
-    for customer in customer_data:
-        total_spent = customer_data[customer]["total_spent"]
-        count = customer_data[customer]["purchase_count"]
-
-        avg_order = total_spent / count if count > 0 else 0
-
-        customer_data[customer]["avg_order_value"] = round(avg_order, 2)
-        customer_data[customer]["products_bought"] = list(
-            customer_data[customer]["products_bought"]
-        )
-
-    # Step 3: Sort customers by total_spent descending
-    sorted_customers = dict(
-        sorted(customer_data.items(), key=lambda item: item[1]["total_spent"], reverse=True)
-    )
-
-    return sorted_customers
+    # Biggest spenders first; the sort is stable, so ties keep first-seen order
+    return {
+        customer: _customer_stats(*data)
+        for customer, data in sorted(customer_data.items(), key=lambda item: item[1][0], reverse=True)
+    }
 
 #--------------2.2--------------#
-def daily_sales_trend(transactions):
+def daily_sales_trend(transactions, backend="python"):
     """
     Analyzes sales trends by date.
 
@@ -178,100 +349,722 @@ def daily_sales_trend(transactions):
     revenue, transaction_count, unique_customers
     """
 
-    daily_data = {}
+    _check_backend(backend)
+    if backend == "numpy":
+        vectorized, table = _numpy_backend(transactions)
+        return vectorized.daily_sales_trend(table)
 
-    for tx in transactions:
-        date = tx["Date"]
-        amount = tx["Quantity"] * tx["UnitPrice"]
-        customer = tx["CustomerID"]
-
-        # Create date entry if not present
-        if date not in daily_data:
-            daily_data[date] = {
-                "revenue": 0.0,
-                "transaction_count": 0,
-                "unique_customers": set()
-            }
+    return _daily_stats(_daily_pass(transactions))
 
-        # Update daily metrics
-        daily_data[date]["revenue"] += amount
-        daily_data[date]["transaction_count"] += 1
-        daily_data[date]["unique_customers"].add(customer)
+def find_peak_sales_day(transactions, backend="python"):
+    """
+    Identifies the date with highest revenue.
+    Returns tuple: (date, revenue, transaction_count)
+    """
 
-    # Convert customer sets to counts
-    for date in daily_data:
-        daily_data[date]["unique_customers"] = len(daily_data[date]["unique_customers"])
+    _check_backend(backend)
+    if backend == "numpy":
+        vectorized, table = _numpy_backend(transactions)
+        return vectorized.find_peak_sales_day(table)
 
-    # Sort dictionary by date
-    sorted_daily_data = dict(sorted(daily_data.items()))
+    return _peak_day(_daily_pass(transactions, unique_customers=False))
 
-    return sorted_daily_data
 
-def find_peak_sales_day(transactions):
+#--------------2.3--------------#
+def low_performing_products(transactions, threshold=10, n=None, backend="python"):
     """
-    Identifies the date with highest revenue.
-    Returns tuple: (date, revenue, transaction_count)
+    Identifies products with total quantity less than threshold.
+    n: return only the n lowest (default: all below threshold)
+    Returns list of tuples:
+    (ProductName, TotalQuantity, TotalRevenue)
     """
 
-    daily_sales = {}
+    _check_backend(backend)
+    if backend == "numpy":
+        vectorized, table = _numpy_backend(transactions)
+        return vectorized.low_performing_products(table, threshold, n)
 
-    for tx in transactions:
-        date = tx["Date"]
-        amount = tx["Quantity"] * tx["UnitPrice"]
+    return _low_products(_product_pass(transactions), threshold, n)
+
+
+#--------------2.4--------------#
+class SalesAggregator:
+    """
+    Single-pass aggregation engine for when several of the 2.1 - 2.3
+    results are needed (main.py, the report).
+
+    One walk over the transactions fills the per-region, per-product,
+    per-customer and per-day accumulators together (Quantity * UnitPrice
+    is computed once per row). The methods then return exactly the
+    structures the standalone functions above return; each of those
+    fills only its own accumulators.
+
+    Aggregators are mergeable: build one per chunk / file / machine,
+    ship to_state() (plain JSON) around and combine them with merge().
+    distinct="hll" keeps daily unique customers as HyperLogLog sketches
+    instead of exact sets, so the state stays small (counts become
+    estimates).
+
+    customers="heavy_hitters" replaces the exact per-customer state with
+    a Space-Saving summary of customer spend (heavy_hitters counters)
+    and a Count-Min sketch of purchase counts, for when there are too
+    many customers to keep. top_customers() then returns estimates
+    (exact while there are at most heavy_hitters customers);
+    customer_analysis() needs customers="exact".
+
+    rollup=True also keeps a SalesRollup (self.rollup) of day / week /
+    month buckets for date-range questions; it is merged and saved with
+    the rest of the state. Off by default: it makes the update several
+    times slower and the state much bigger.
+
+    Usage:
+        analytics = SalesAggregator(valid_transactions)
+        analytics.region_wise_sales()
+        analytics.top_selling_products(n=5)
+    """
 
-        if date not in daily_sales:
-            daily_sales[date] = {
-                "revenue": 0.0,
-                "transaction_count": 0
+    DISTINCT_MODES = ("exact", "hll")
+    CUSTOMER_MODES = ("exact", "heavy_hitters")
+
+    def __init__(self, transactions=None, distinct="exact", hll_precision=12,
+                 customers="exact", heavy_hitters=1000, rollup=False):
+        if distinct not in self.DISTINCT_MODES:
+            raise ValueError(f"Unknown distinct mode '{distinct}', expected one of {self.DISTINCT_MODES}")
+        if customers not in self.CUSTOMER_MODES:
+            raise ValueError(f"Unknown customers mode '{customers}', expected one of {self.CUSTOMER_MODES}")
+
+        self.distinct = distinct
+        self.hll_precision = hll_precision
+        self.customers = customers
+        self.heavy_hitters = heavy_hitters
+
+        self.total_revenue = 0.0
+        self.transaction_count = 0
+
+        # region -> [total_sales, transaction_count]
+        self.region_data = {}
+        # product name -> [total_quantity, total_revenue]
+        self.product_data = {}
+        # Customers as parallel arrays indexed by slot (first-seen order):
+        # total spent, purchase count and the products bought as a bitset
+        # (bit i set: bought self.product_codes.values[i]). Bitsets are a
+        # uint64 array until there are more than 64 products, then ints.
+        self.customer_ids = SymbolTable()
+        self.customer_spent = array("d")
+        self.customer_purchases = array("q")
+        self.customer_products = array("Q")
+        self.product_codes = SymbolTable()
+        # customers="heavy_hitters": approximate spend / purchase counts
+        self.customer_spend = None
+        self.customer_counts = None
+        if customers == "heavy_hitters":
+            self.customer_spend = SpaceSaving(heavy_hitters)
+            self.customer_counts = CountMinSketch()
+        # date -> [revenue, transaction_count, set(customer ids) or HyperLogLog]
+        self.daily_data = {}
+        # rollup=True: day / week / month buckets
+        self.rollup = SalesRollup() if rollup else None
+
+        if transactions is not None:
+            self.update(transactions)
+
+    def _new_distinct(self):
+        """
+        Returns an empty distinct-customer counter for a new day.
+        """
+
+        if self.distinct == "hll":
+            return HyperLogLog(self.hll_precision)
+
+        return set()
+
+    def _customer_slot(self, customer):
+        """
+        Returns the slot of a customer, adding an empty one if new.
+        """
+
+        slot = self.customer_ids.codes.get(customer)
+
+        if slot is None:
+            slot = self.customer_ids.encode(customer)
+            self.customer_spent.append(0.0)
+            self.customer_purchases.append(0)
+            self.customer_products.append(0)
+
+        return slot
+
+    def _product_bit(self, product):
+        """
+        Returns the bitset bit of a product, adding it if new.
+        Callers holding self.customer_products must re-read it after a
+        new product (the 65th switches the bitsets to a list).
+        """
+
+        code = self.product_codes.encode(product)
+
+        if code >= 64 and isinstance(self.customer_products, array):
+            self.customer_products = list(self.customer_products)
+
+        return 1 << code
+
+    def _product_names(self, bits):
+        """
+        Decodes a products-bought bitset into product names, sorted so
+        the list does not depend on the order the products were first
+        seen (which differs between merged and restored aggregators).
+        """
+
+        names = self.product_codes.values
+        products = []
+
+        while bits:
+            lowest = bits & -bits
+            products.append(names[lowest.bit_length() - 1])
+            bits ^= lowest
+
+        return sorted(products)
+
+    def add(self, tx):
+        """
+        Adds a single transaction to every accumulator.
+        """
+
+        self.update((tx,))
+
+    def update(self, transactions):
+        """
+        Adds every transaction from an iterable (list or generator)
+        or a TransactionTable. Returns self so calls can be chained.
+        """
+
+        if self.rollup is not None:
+            # Both walk the same rows, so a one-shot iterable is stored first
+            if not isinstance(transactions, TransactionTable):
+                transactions = TransactionTable.from_transactions(transactions)
+            self.rollup.update(transactions)
+
+        if isinstance(transactions, TransactionTable):
+            return self._update_table(transactions)
+
+        # Transaction records are read by attribute (much faster than
+        # through their dictionary view), dictionaries by key
+        transactions = iter(transactions)
+        first = next(transactions, None)
+        if first is None:
+            return self
+        transactions = chain((first,), transactions)
+        row_fields = (attrgetter if isinstance(first, Transaction) else itemgetter)(*ROW_FIELDS)
+
+        region_data = self.region_data
+        product_data = self.product_data
+        daily_data = self.daily_data
+
+        # Exact per-customer arrays, or the heavy-hitter sketches
+        exact_customers = self.customers == "exact"
+        if exact_customers:
+            customer_slots = self.customer_ids.codes
+            customer_slot = self._customer_slot
+            spent = self.customer_spent
+            purchases = self.customer_purchases
+            bought = self.customer_products
+            product_bits = {name: 1 << code for name, code in self.product_codes.codes.items()}
+        else:
+            add_spend = self.customer_spend.add
+            add_purchase = self.customer_counts.add
+
+        total_revenue = self.total_revenue
+        count = 0
+
+        for tx in transactions:
+            quantity, unit_price, product, customer, region_name, date = row_fields(tx)
+            amount = quantity * unit_price
+
+            total_revenue += amount
+            count += 1
+
+            region = region_data.get(region_name)
+            if region is None:
+                region = region_data[region_name] = [0.0, 0]
+            region[0] += amount
+            region[1] += 1
+
+            prod = product_data.get(product)
+            if prod is None:
+                prod = product_data[product] = [0, 0.0]
+            prod[0] += quantity
+            prod[1] += amount
+
+            if exact_customers:
+                slot = customer_slots.get(customer)
+                if slot is None:
+                    slot = customer_slot(customer)
+                bit = product_bits.get(product)
+                if bit is None:
+                    bit = product_bits[product] = self._product_bit(product)
+                    bought = self.customer_products
+                spent[slot] += amount
+                purchases[slot] += 1
+                bought[slot] |= bit
+            else:
+                add_spend(customer, amount)
+                add_purchase(customer)
+
+            day = daily_data.get(date)
+            if day is None:
+                day = daily_data[date] = [0.0, 0, self._new_distinct()]
+            day[0] += amount
+            day[1] += 1
+            day[2].add(customer)
+
+        self.total_revenue = total_revenue
+        self.transaction_count += count
+
+        return self
+
+    def _update_table(self, table):
+        """
+        Integer-keyed version of update() for a TransactionTable.
+
+        Each dictionary code is resolved to its accumulator once; rows then
+        index plain lists by code instead of hashing strings. Rows are
+        visited in order, so sums and first-seen ordering are identical
+        to the row-dictionary path.
+        """
+
+        symbols = table.symbols
+        codes = table.codes
+        region_values = symbols["Region"].values
+        product_values = symbols["ProductName"].values
+        customer_values = symbols["CustomerID"].values
+        date_values = symbols["Date"].values
+
+        region_acc = [None] * len(region_values)
+        product_acc = [None] * len(product_values)
+        product_bit_acc = [None] * len(product_values)
+        customer_acc = [None] * len(customer_values)
+        daily_acc = [None] * len(date_values)
+
+        region_data = self.region_data
+        product_data = self.product_data
+        daily_data = self.daily_data
+        exact_customers = self.customers == "exact"
+
+        customer_slot = self._customer_slot
+        spent = self.customer_spent
+        purchases = self.customer_purchases
+        bought = self.customer_products
+
+        total_revenue = self.total_revenue
+
+        for quantity, amount, region_code, product_code, customer_code, date_code in zip(
+            table.quantity, table.amount, codes["Region"], codes["ProductName"],
+            codes["CustomerID"], codes["Date"]
+        ):
+            total_revenue += amount
+
+            region = region_acc[region_code]
+            if region is None:
+                key = region_values[region_code]
+                region = region_data.get(key)
+                if region is None:
+                    region = region_data[key] = [0.0, 0]
+                region_acc[region_code] = region
+            region[0] += amount
+            region[1] += 1
+
+            prod = product_acc[product_code]
+            if prod is None:
+                key = product_values[product_code]
+                prod = product_data.get(key)
+                if prod is None:
+                    prod = product_data[key] = [0, 0.0]
+                product_acc[product_code] = prod
+            prod[0] += quantity
+            prod[1] += amount
+
+            if exact_customers:
+                slot = customer_acc[customer_code]
+                if slot is None:
+                    slot = customer_acc[customer_code] = customer_slot(customer_values[customer_code])
+                bit = product_bit_acc[product_code]
+                if bit is None:
+                    bit = product_bit_acc[product_code] = self._product_bit(product_values[product_code])
+                    bought = self.customer_products
+                spent[slot] += amount
+                purchases[slot] += 1
+                bought[slot] |= bit
+
+            day = daily_acc[date_code]
+            if day is None:
+                key = date_values[date_code]
+                day = daily_data.get(key)
+                if day is None:
+                    day = daily_data[key] = [0.0, 0, self._new_distinct()]
+                daily_acc[date_code] = day
+            day[0] += amount
+            day[1] += 1
+            day[2].add(customer_values[customer_code])
+
+        self.total_revenue = total_revenue
+        self.transaction_count += len(table)
+
+        if not exact_customers:
+            self._add_customer_totals(table)
+
+        return self
+
+    def _add_customer_totals(self, table):
+        """
+        customers="heavy_hitters": totals the table's rows per customer
+        code, then adds each customer to the sketches once.
+        """
+
+        customer_values = table.symbols["CustomerID"].values
+        spent = [0.0] * len(customer_values)
+        purchases = [0] * len(customer_values)
+
+        for amount, code in zip(table.amount, table.codes["CustomerID"]):
+            spent[code] += amount
+            purchases[code] += 1
+
+        add_spend = self.customer_spend.add
+        add_purchase = self.customer_counts.add
+
+        for code, customer in enumerate(customer_values):
+            if purchases[code]:
+                add_spend(customer, spent[code])
+                add_purchase(customer, purchases[code])
+
+    # ---------- Merging ----------
+    def merge(self, other):
+        """
+        Merges another aggregator's partial results into this one.
+        Merging is associative and commutative (up to float rounding
+        of the sums and dictionary ordering of first-seen keys).
+        Returns self.
+        """
+
+        if other.distinct != self.distinct:
+            raise ValueError("Cannot merge aggregators with different distinct modes")
+        if other.customers != self.customers:
+            raise ValueError("Cannot merge aggregators with different customers modes")
+        if (other.rollup is None) != (self.rollup is None):
+            raise ValueError("Cannot merge aggregators with and without rollups")
+
+        if self.rollup is not None:
+            self.rollup.merge(other.rollup)
+
+        self.total_revenue += other.total_revenue
+        self.transaction_count += other.transaction_count
+
+        for region, (sales, count) in other.region_data.items():
+            acc = self.region_data.setdefault(region, [0.0, 0])
+            acc[0] += sales
+            acc[1] += count
+
+        for product, (quantity, revenue) in other.product_data.items():
+            acc = self.product_data.setdefault(product, [0, 0.0])
+            acc[0] += quantity
+            acc[1] += revenue
+
+        # Other's product bits -> this aggregator's, per distinct bitset
+        other_bits = [self._product_bit(product) for product in other.product_codes.values]
+        translated = {0: 0}
+
+        for customer, spent, count, bits in zip(other.customer_ids.values, other.customer_spent,
+                                                other.customer_purchases, other.customer_products):
+            slot = self._customer_slot(customer)
+            self.customer_spent[slot] += spent
+            self.customer_purchases[slot] += count
+
+            own_bits = translated.get(bits)
+            if own_bits is None:
+                own_bits = 0
+                remaining = bits
+                while remaining:
+                    lowest = remaining & -remaining
+                    own_bits |= other_bits[lowest.bit_length() - 1]
+                    remaining ^= lowest
+                translated[bits] = own_bits
+
+            self.customer_products[slot] |= own_bits
+
+        if self.customers == "heavy_hitters":
+            self.customer_spend |= other.customer_spend
+            self.customer_counts |= other.customer_counts
+
+        for date, (revenue, count, customers) in other.daily_data.items():
+            acc = self.daily_data.get(date)
+            if acc is None:
+                acc = self.daily_data[date] = [0.0, 0, self._new_distinct()]
+            acc[0] += revenue
+            acc[1] += count
+            acc[2] |= customers
+
+        return self
+
+    def to_state(self):
+        """
+        Returns the partial aggregates as a JSON-serializable dictionary.
+        """
+
+        if self.distinct == "hll":
+            distinct_state = lambda customers: customers.to_state()
+        else:
+            distinct_state = sorted
+
+        state = {
+            "version": 1,
+            "distinct": self.distinct,
+            "hll_precision": self.hll_precision,
+            "customer_mode": self.customers,
+            "total_revenue": self.total_revenue,
+            "transaction_count": self.transaction_count,
+            "regions": self.region_data,
+            "products": self.product_data,
+            "customers": {
+                customer: [spent, count, self._product_names(bits)]
+                for customer, spent, count, bits in zip(self.customer_ids.values, self.customer_spent,
+                                                        self.customer_purchases, self.customer_products)
+            },
+            "daily": {
+                date: [revenue, count, distinct_state(customers)]
+                for date, (revenue, count, customers) in self.daily_data.items()
             }
+        }
 
-        daily_sales[date]["revenue"] += amount
-        daily_sales[date]["transaction_count"] += 1
+        if self.customers == "heavy_hitters":
+            state["customer_sketches"] = {
+                "spend": self.customer_spend.to_state(),
+                "counts": self.customer_counts.to_state()
+            }
 
-    # Find date with maximum revenue
-    peak_date = max(daily_sales.items(), key=lambda x: x[1]["revenue"])
+        if self.rollup is not None:
+            state["rollup"] = self.rollup.to_state()
+
+        return state
+
+    @classmethod
+    def from_state(cls, state):
+        """
+        Rebuilds an aggregator from to_state() output.
+        """
+
+        if state.get("version") != 1:
+            raise ValueError(f"Unsupported aggregator state version: {state.get('version')}")
+
+        # States written before the customers option are always exact
+        customers = state.get("customer_mode", "exact")
+
+        aggregator = cls(distinct=state["distinct"], hll_precision=state["hll_precision"],
+                         customers=customers)
+        aggregator.total_revenue = state["total_revenue"]
+        aggregator.transaction_count = state["transaction_count"]
+
+        if aggregator.distinct == "hll":
+            load_distinct = HyperLogLog.from_state
+        else:
+            load_distinct = set
+
+        aggregator.region_data = {
+            region: [sales, count] for region, (sales, count) in state["regions"].items()
+        }
+        aggregator.product_data = {
+            product: [quantity, revenue]
+            for product, (quantity, revenue) in state["products"].items()
+        }
+        for customer, (spent, count, products) in state["customers"].items():
+            slot = aggregator._customer_slot(customer)
+            aggregator.customer_spent[slot] = spent
+            aggregator.customer_purchases[slot] = count
+            for product in products:
+                bit = aggregator._product_bit(product)
+                aggregator.customer_products[slot] |= bit
+        aggregator.daily_data = {
+            date: [revenue, count, load_distinct(customers)]
+            for date, (revenue, count, customers) in state["daily"].items()
+        }
+
+        if customers == "heavy_hitters":
+            sketches = state["customer_sketches"]
+            aggregator.customer_spend = SpaceSaving.from_state(sketches["spend"])
+            aggregator.customer_counts = CountMinSketch.from_state(sketches["counts"])
+            aggregator.heavy_hitters = aggregator.customer_spend.capacity
+
+        if state.get("rollup") is not None:
+            aggregator.rollup = SalesRollup.from_state(state["rollup"])
+
+        return aggregator
+
+    # ---------- Results ----------
+    def calculate_total_revenue(self):
+        """
+        Returns: float (total revenue)
+        """
+
+        return self.total_revenue
+
+    def region_wise_sales(self):
+        """
+        Returns: region statistics sorted by total_sales descending
+        (same format as region_wise_sales)
+        """
+
+        return _region_stats(self.region_data, self.total_revenue)
+
+    def product_totals(self):
+        """
+        Returns: list of (ProductName, TotalQuantity, TotalRevenue)
+        in first-seen order
+        """
+
+        return [
+            (product, data[0], data[1])
+            for product, data in self.product_data.items()
+        ]
+
+    def top_selling_products(self, n=5):
+        """
+        Returns: top n products by total quantity
+        (same format as top_selling_products)
+        """
+
+        return _top_products(self.product_data, n)
+
+    def customer_analysis(self, n=None, customer_ids=None):
+        """
+        Returns: customer statistics sorted by total_spent descending
+        (same format as customer_analysis)
+
+        The per-customer dictionaries are only built for the customers
+        returned: the n biggest spenders if n is given, and/or only the
+        given customer_ids.
+        """
+
+        if self.customers != "exact":
+            raise ValueError("customer_analysis needs exact customer state (customers='exact'); "
+                             "use top_customers() with customers='heavy_hitters'")
+
+        slots = range(len(self.customer_ids))
+        if customer_ids is not None:
+            codes = self.customer_ids.codes
+            slots = sorted({codes[customer] for customer in customer_ids if customer in codes})
+
+        spent = self.customer_spent
+        if n is not None:
+            slots = heapq.nlargest(n, slots, key=spent.__getitem__)
+        else:
+            slots = sorted(slots, key=spent.__getitem__, reverse=True)
+
+        return {self.customer_ids.values[slot]: self._customer_stats(slot) for slot in slots}
+
+    def _customer_stats(self, slot):
+        return _customer_stats(self.customer_spent[slot], self.customer_purchases[slot],
+                               self._product_names(self.customer_products[slot]))
+
+    def top_customers(self, n=5):
+        """
+        Returns: top n customers by total spent as list of tuples
+        (CustomerID, TotalSpent, PurchaseCount)
+
+        With customers="heavy_hitters" TotalSpent and PurchaseCount are
+        the sketch estimates (upper bounds).
+        """
+
+        if self.customers == "heavy_hitters":
+            return [
+                (customer, spent, int(self.customer_counts.estimate(customer)))
+                for customer, spent, _ in self.customer_spend.top(n)
+            ]
+
+        top = heapq.nlargest(n, range(len(self.customer_ids)), key=self.customer_spent.__getitem__)
+
+        return [
+            (self.customer_ids.values[slot], self.customer_spent[slot], self.customer_purchases[slot])
+            for slot in top
+        ]
+
+    def daily_sales_trend(self):
+        """
+        Returns: daily statistics sorted by date
+        (same format as daily_sales_trend)
+        """
+
+        return _daily_stats(self.daily_data)
+
+    def find_peak_sales_day(self):
+        """
+        Returns tuple: (date, revenue, transaction_count)
+        """
+
+        return _peak_day(self.daily_data)
+
+    def low_performing_products(self, threshold=10, n=None):
+        """
+        Returns: products with total quantity below threshold,
+        sorted by quantity ascending (same format as low_performing_products);
+        only the n lowest if n is given
+        """
+
+        return _low_products(self.product_data, threshold, n)
 
-    return (
-        peak_date[0],
-        peak_date[1]["revenue"],
-        peak_date[1]["transaction_count"]
-    )
 
+#--------------2.5--------------#
+def save_state(aggregator, filename):
+    """
+    Writes an aggregator's partial state to a JSON file.
+    The file is written to a temp name and renamed, so readers of a
+    shared directory never see a half-written state.
+    """
 
-#--------------2.3--------------#
-def low_performing_products(transactions, threshold=10):
+    temp_file = f"{filename}.tmp.{os.getpid()}"
+
+    with open(temp_file, "w", encoding="utf-8") as file:
+        json.dump(aggregator.to_state(), file)
+
+    os.replace(temp_file, filename)
+
+
+def load_state(filename):
     """
-    Identifies products with total quantity less than threshold.
-    Returns list of tuples:
-    (ProductName, TotalQuantity, TotalRevenue)
+    Loads a SalesAggregator from a JSON state file.
     """
 
-    product_data = {}
+    with open(filename, "r", encoding="utf-8") as file:
+        return SalesAggregator.from_state(json.load(file))
 
-    for tx in transactions:
-        product = tx["ProductName"]
-        quantity = tx["Quantity"]
-        revenue = tx["Quantity"] * tx["UnitPrice"]
-
-        if product not in product_data:
-            product_data[product] = {
-                "total_quantity": 0,
-                "total_revenue": 0.0
-            }
 
-        product_data[product]["total_quantity"] += quantity
-        product_data[product]["total_revenue"] += revenue
+def merge_aggregators(aggregators):
+    """
+    Merges an iterable of SalesAggregators into a new one.
+    """
 
-    # Collect only low performing products
-    low_products = []
+    merged = None
 
-    for product, data in product_data.items():
-        if data["total_quantity"] < threshold:
-            low_products.append(
-                (product, data["total_quantity"], data["total_revenue"])
-            )
+    for aggregator in aggregators:
+        if merged is None:
+            merged = SalesAggregator(distinct=aggregator.distinct,
+                                     hll_precision=aggregator.hll_precision,
+                                     customers=aggregator.customers,
+                                     heavy_hitters=aggregator.heavy_hitters,
+                                     rollup=aggregator.rollup is not None)
+        merged.merge(aggregator)
 
-    # Sort by total quantity ascending
-    low_products.sort(key=lambda x: x[1])
+    return merged if merged is not None else SalesAggregator()
 
-    return low_products
+
+def merge_state_files(paths):
+    """
+    Final merge step: combines partial state files into one aggregator.
+
+    paths: list of state files, or a directory whose *.json files
+    are all merged (sorted by name, for a reproducible order).
+    """
+
+    if isinstance(paths, str) and os.path.isdir(paths):
+        paths = sorted(
+            os.path.join(paths, name) for name in os.listdir(paths)
+            if name.endswith(".json")
+        )
+
+    return merge_aggregators(load_state(path) for path in paths)
@@ -0,0 +1,379 @@
+import gzip
+import io
+import os
+
+from utils.transaction_table import Transaction, TransactionTable
+
+# Columns of the enriched data files, in file order
+BASE_FIELDS = ("TransactionID", "Date", "ProductID", "ProductName",
+               "Quantity", "UnitPrice", "CustomerID", "Region")
+ENRICHED_FIELDS = ("API_Category", "API_Brand", "API_Rating", "API_Match")
+HEADER = "|".join(BASE_FIELDS + ENRICHED_FIELDS) + "\n"
+
+# String columns stored dictionary-encoded in the binary formats
+CATEGORICAL_COLUMNS = ("Date", "ProductID", "ProductName", "CustomerID", "Region",
+                       "API_Category", "API_Brand")
+
+# Lines joined into one buffer per write() call
+WRITE_BATCH_LINES = 10000
+
+FORMATS = ("text", "gzip", "zstd", "npz", "parquet")
+
+
+def detect_format(filename):
+    """
+    Picks the file format from the file extension.
+    """
+
+    if filename.endswith(".gz"):
+        return "gzip"
+    if filename.endswith(".zst"):
+        return "zstd"
+    if filename.endswith(".npz"):
+        return "npz"
+    if filename.endswith(".parquet"):
+        return "parquet"
+
+    return "text"
+
+
+def iter_enriched_rows(enriched_transactions):
+    """
+    Yields (transaction, (API_Category, API_Brand, API_Rating, API_Match))
+    pairs from an EnrichedTransactions join or a list of enriched dicts.
+    """
+
+    if hasattr(enriched_transactions, "iter_with_attributes"):
+        return enriched_transactions.iter_with_attributes()
+
+    return (
+        (tx, tuple(tx[field] for field in ENRICHED_FIELDS))
+        for tx in enriched_transactions
+    )
+
+
+#--------------Text formats--------------#
+def iter_text_batches(enriched_transactions, batch_lines=WRITE_BATCH_LINES):
+    """
+    Formats the pipe-delimited lines and yields them joined into large
+    string buffers of batch_lines lines each.
+    """
+
+    batch = []
+
+    for tx, (category, brand, rating, match) in iter_enriched_rows(enriched_transactions):
+        batch.append(
+            f"{tx['TransactionID']}|{tx['Date']}|{tx['ProductID']}|{tx['ProductName']}|"
+            f"{tx['Quantity']}|{tx['UnitPrice']}|{tx['CustomerID']}|{tx['Region']}|"
+            f"{category}|{brand}|{rating}|{match}\n"
+        )
+
+        if len(batch) >= batch_lines:
+            yield "".join(batch)
+            batch = []
+
+    if batch:
+        yield "".join(batch)
+
+
+def open_text(filename, mode, file_format):
+    """
+    Opens a text / gzip / zstd file for reading ('r'), writing ('w')
+    or appending ('a') as utf-8 text.
+    """
+
+    if file_format == "gzip":
+        return gzip.open(filename, mode + "t", encoding="utf-8")
+
+    if file_format == "zstd":
+        try:
+            import zstandard
+        except ImportError as e:
+            raise ImportError("zstd output requires the 'zstandard' package") from e
+
+        raw = open(filename, mode + "b")
+        if mode == "r":
+            stream = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+        else:
+            stream = zstandard.ZstdCompressor().stream_writer(raw, closefd=True)
+
+        return io.TextIOWrapper(stream, encoding="utf-8")
+
+    return open(filename, mode, encoding="utf-8")
+
+
+def write_text(enriched_transactions, filename, file_format, append=False):
+    write_header = not append or not os.path.exists(filename) or os.path.getsize(filename) == 0
+
+    with open_text(filename, "a" if append else "w", file_format) as file:
+        if write_header:
+            file.write(HEADER)
+
+        for buffer in iter_text_batches(enriched_transactions):
+            file.write(buffer)
+
+
+def parse_optional(value, convert):
+    return None if value == "None" else convert(value)
+
+
+def read_text(filename, file_format):
+    """
+    Reads a text / gzip / zstd enriched file into row dictionaries.
+    """
+
+    rows = []
+
+    with open_text(filename, "r", file_format) as file:
+        file.readline()  # Skip header row
+
+        for line in file:
+            line = line.rstrip("\n")
+            if not line:
+                continue
+
+            parts = line.split("|")
+            rows.append({
+                "TransactionID": parts[0],
+                "Date": parts[1],
+                "ProductID": parts[2],
+                "ProductName": parts[3],
+                "Quantity": int(parts[4]),
+                "UnitPrice": float(parts[5]),
+                "CustomerID": parts[6],
+                "Region": parts[7],
+                "API_Category": parse_optional(parts[8], str),
+                "API_Brand": parse_optional(parts[9], str),
+                "API_Rating": parse_optional(parts[10], float),
+                "API_Match": parts[11] == "True"
+            })
+
+    return rows
+
+
+#--------------Binary columnar formats--------------#
+def enriched_columns(enriched_transactions):
+    """
+    Collects the enriched data column by column.
+
+    Returns: dictionary with
+    - 'TransactionID': list of strings
+    - 'Quantity', 'UnitPrice', 'API_Rating' (None allowed), 'API_Match': lists
+    - each CATEGORICAL_COLUMNS name: (values, codes) with code -1 for None
+    A table-backed EnrichedTransactions is read straight from its arrays.
+    """
+
+    transactions = getattr(enriched_transactions, "transactions", None)
+    code_attributes = getattr(enriched_transactions, "code_attributes", None)
+
+    if isinstance(transactions, TransactionTable) and code_attributes is not None:
+        return table_columns(transactions, code_attributes)
+
+    columns = {"TransactionID": [], "Quantity": [], "UnitPrice": [],
+               "API_Rating": [], "API_Match": []}
+    encoders = {name: {} for name in CATEGORICAL_COLUMNS}
+    codes = {name: [] for name in CATEGORICAL_COLUMNS}
+
+    for tx, attributes in iter_enriched_rows(enriched_transactions):
+        row = tx.to_dict() if isinstance(tx, Transaction) else dict(tx)
+        row.update(zip(ENRICHED_FIELDS, attributes))
+
+        for name in columns:
+            columns[name].append(row[name])
+
+        for name in CATEGORICAL_COLUMNS:
+            value = row[name]
+            if value is None:
+                codes[name].append(-1)
+            else:
+                codes[name].append(encoders[name].setdefault(value, len(encoders[name])))
+
+    for name in CATEGORICAL_COLUMNS:
+        columns[name] = (list(encoders[name]), codes[name])
+
+    return columns
+
+
+def table_columns(table, code_attributes):
+    """
+    enriched_columns() for a TransactionTable joined with its per-ProductID
+    attribute list; categorical codes are reused as they are.
+    """
+
+    product_codes = table.codes["ProductID"]
+    columns = {
+        "TransactionID": table.transaction_ids,
+        "Quantity": table.quantity,
+        "UnitPrice": table.unit_price,
+        "API_Rating": [code_attributes[code][2] for code in product_codes],
+        "API_Match": [code_attributes[code][3] for code in product_codes]
+    }
+
+    for name in ("Date", "ProductID", "ProductName", "CustomerID", "Region"):
+        columns[name] = (table.symbols[name].values, table.codes[name])
+
+    # API_Category / API_Brand: encode per ProductID code, then map rows
+    for index, name in ((0, "API_Category"), (1, "API_Brand")):
+        encoder = {}
+        product_to_code = []
+        for attributes in code_attributes:
+            value = attributes[index]
+            product_to_code.append(-1 if value is None else encoder.setdefault(value, len(encoder)))
+        columns[name] = (list(encoder), [product_to_code[code] for code in product_codes])
+
+    return columns
+
+
+def write_npz(enriched_transactions, filename):
+    try:
+        import numpy as np
+    except ImportError as e:
+        raise ImportError("npz output requires NumPy to be installed") from e
+
+    columns = enriched_columns(enriched_transactions)
+    arrays = {
+        "TransactionID": np.array(columns["TransactionID"], dtype=str),
+        "Quantity": np.asarray(columns["Quantity"], dtype=np.int64),
+        "UnitPrice": np.asarray(columns["UnitPrice"], dtype=np.float64),
+        "API_Rating": np.array([np.nan if r is None else r for r in columns["API_Rating"]],
+                               dtype=np.float64),
+        "API_Match": np.asarray(columns["API_Match"], dtype=bool)
+    }
+
+    for name in CATEGORICAL_COLUMNS:
+        values, codes = columns[name]
+        arrays[f"{name}.values"] = np.array(values, dtype=str)
+        arrays[f"{name}.codes"] = np.asarray(codes, dtype=np.int32)
+
+    with open(filename, "wb") as file:
+        np.savez(file, **arrays)
+
+
+def read_npz_columns(filename):
+    import numpy as np
+
+    columns = {}
+
+    with np.load(filename) as data:
+        for name in ("TransactionID", "Quantity", "UnitPrice", "API_Rating", "API_Match"):
+            columns[name] = data[name]
+
+        for name in CATEGORICAL_COLUMNS:
+            # Append a None slot so code -1 decodes to None
+            values = np.append(data[f"{name}.values"].astype(object), None)
+            columns[name] = values[data[f"{name}.codes"]]
+
+    rating = columns["API_Rating"].astype(object)
+    rating[np.isnan(columns["API_Rating"])] = None
+    columns["API_Rating"] = rating
+
+    return columns
+
+
+def write_parquet(enriched_transactions, filename):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("parquet output requires the 'pyarrow' package") from e
+
+    columns = enriched_columns(enriched_transactions)
+    arrays = {
+        "TransactionID": pa.array(columns["TransactionID"], pa.string()),
+        "Quantity": pa.array(columns["Quantity"], pa.int64()),
+        "UnitPrice": pa.array(columns["UnitPrice"], pa.float64()),
+        "API_Rating": pa.array(columns["API_Rating"], pa.float64()),
+        "API_Match": pa.array(columns["API_Match"], pa.bool_())
+    }
+
+    for name in CATEGORICAL_COLUMNS:
+        values, codes = columns[name]
+        indices = pa.array([None if code < 0 else code for code in codes], pa.int32())
+        arrays[name] = pa.DictionaryArray.from_arrays(indices, pa.array(values, pa.string()))
+
+    table = pa.table({name: arrays[name] for name in BASE_FIELDS + ENRICHED_FIELDS})
+    pq.write_table(table, filename)
+
+
+def read_parquet_columns(filename):
+    import pyarrow.parquet as pq
+
+    table = pq.read_table(filename)
+
+    return {name: table.column(name).to_pylist() for name in table.column_names}
+
+
+#--------------Entry points--------------#
+def write_enriched(enriched_transactions, filename, file_format=None, append=False):
+    """
+    Writes enriched transactions in the given format (detected from the
+    extension when None).
+
+    A full write goes to a temp file in the same directory that is then
+    renamed over the target, so readers never see a partial file.
+    append=True (text / gzip / zstd only) appends in place.
+    """
+
+    file_format = file_format or detect_format(filename)
+
+    if file_format not in FORMATS:
+        raise ValueError(f"Unknown format '{file_format}', expected one of {FORMATS}")
+
+    if append:
+        if file_format in ("npz", "parquet"):
+            raise ValueError(f"Cannot append to a {file_format} file")
+
+        write_text(enriched_transactions, filename, file_format, append=True)
+        return
+
+    temp_file = f"{filename}.tmp.{os.getpid()}"
+
+    try:
+        if file_format == "npz":
+            write_npz(enriched_transactions, temp_file)
+        elif file_format == "parquet":
+            write_parquet(enriched_transactions, temp_file)
+        else:
+            write_text(enriched_transactions, temp_file, file_format)
+
+        os.replace(temp_file, filename)
+
+    finally:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+
+
+def load_enriched_data(filename, file_format=None, as_columns=False):
+    """
+    Loads a file written by save_enriched_data in any supported format.
+
+    Returns: list of enriched transaction dictionaries, or with
+    as_columns=True a dictionary of column name -> sequence (for npz this
+    is NumPy arrays, the fast path for downstream jobs)
+    """
+
+    file_format = file_format or detect_format(filename)
+
+    if file_format == "npz":
+        columns = read_npz_columns(filename)
+    elif file_format == "parquet":
+        columns = read_parquet_columns(filename)
+    else:
+        rows = read_text(filename, file_format)
+
+        if as_columns:
+            fields = BASE_FIELDS + ENRICHED_FIELDS
+            return {field: [row[field] for row in rows] for field in fields}
+
+        return rows
+
+    if as_columns:
+        return columns
+
+    fields = BASE_FIELDS + ENRICHED_FIELDS
+    lists = [
+        columns[field].tolist() if hasattr(columns[field], "tolist") else list(columns[field])
+        for field in fields
+    ]
+
+    return [dict(zip(fields, values)) for values in zip(*lists)]
@@ -1,9 +1,26 @@
-def read_sales_data(filename):
+import codecs
+import mmap
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from operator import add, methodcaller, mul
+
+from utils.transaction_table import CATEGORICAL_FIELDS, Transaction, TransactionTable
+
+
+def read_sales_data(filename, stream=False):
     """
     Reads sales data from file while handling encoding issues.
     Returns list of raw data lines (excluding header and empty lines).
+
+    With stream=True a generator is returned instead, which yields the
+    same stripped, non-empty lines one at a time so the whole file never
+    has to sit in memory.
     """
 
+    if stream:
+        return iter_sales_data(filename)
+
     encodings_to_try = ["utf-8", "latin-1", "cp1252"]
     raw_lines = None
 
@@ -30,16 +47,150 @@ def read_sales_data(filename):
 
     return cleaned_lines
 
-def parse_transactions(raw_lines):
+
+def file_encoding(filename):
+    """
+    Returns the encoding read_sales_data would read the whole file with
+    ('utf-8' or 'latin-1'), found without decoding it (see
+    detect_encoding). Raises FileNotFoundError if the file is missing.
+    """
+
+    with open(filename, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return "utf-8"
+
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return detect_encoding(data)
+
+
+def iter_sales_data(filename):
+    """
+    Lazily yields raw data lines (excluding header and empty lines).
+
+    The encoding is decided once for the whole file, as read_sales_data
+    does, and the file is then read in text mode (universal newlines),
+    so the lines are the same as read_sales_data's.
+    """
+
+    try:
+        encoding = file_encoding(filename)
+    except FileNotFoundError:
+        print("Error: File not found!")
+        return
+
+    with open(filename, "r", encoding=encoding) as file:
+        # Skip header row
+        file.readline()
+
+        for line in file:
+            line = line.strip()
+
+            # Skip empty lines
+            if line:
+                yield line
+
+def parse_transactions(raw_lines, as_table=False, symbols=None):
     """
     Parses raw lines into a clean list of transaction dictionaries.
 
     Returns: list of dictionaries with keys:
     ['TransactionID', 'Date', 'ProductID', 'ProductName',
      'Quantity', 'UnitPrice', 'CustomerID', 'Region']
+
+    With as_table=True the rows go straight into a columnar
+    TransactionTable instead (no per-row dictionaries are built).
+
+    symbols: symbol tables (transaction_table.new_symbols()) to encode
+    the categorical fields with, shared with other calls / tables. For
+    dictionaries this also interns the categorical strings (see
+    iter_transactions).
     """
 
-    transactions = []
+    if as_table:
+        table = TransactionTable(symbols)
+        append_values = table.append_values
+
+        for fields in iter_fields(raw_lines):
+            append_values(*fields)
+
+        return table
+
+    return list(iter_transactions(raw_lines, symbols))
+
+
+def _intern_new(symbol_table, shared, value):
+    """
+    Adds a value not seen before to a symbol table and to its
+    value -> shared object map.
+    """
+
+    symbol_table.encode(value)
+    shared[value] = value
+
+    return value
+
+
+def iter_transactions(raw_lines, symbols=None):
+    """
+    Generator version of parse_transactions.
+    Yields one transaction dictionary per valid line, so it can be fed
+    straight from read_sales_data(filename, stream=True).
+
+    With symbols (transaction_table.new_symbols()) the categorical fields
+    (Date, ProductID, ProductName, CustomerID, Region) are interned: rows
+    with the same value share one string object, and new values are added
+    to the symbol tables in first-seen order (the codes a TransactionTable
+    built with the same symbols uses). Retained rows take about 40% less
+    memory, at some parsing speed.
+    """
+
+    interned = symbols is not None
+    if interned:
+        # value -> the shared string object, per categorical field
+        shared = {
+            field: dict(zip(symbol_table.values, symbol_table.values))
+            for field, symbol_table in symbols.items()
+        }
+        dates, product_ids, product_names, customer_ids, regions = (
+            shared["Date"], shared["ProductID"], shared["ProductName"],
+            shared["CustomerID"], shared["Region"]
+        )
+
+    for fields in iter_fields(raw_lines):
+        transaction_id, date, product_id, product_name, quantity, unit_price, customer_id, region = fields
+
+        if interned:
+            # Misses (and empty strings, which are falsy) take the slow path
+            date = dates.get(date) or _intern_new(symbols["Date"], dates, date)
+            product_id = product_ids.get(product_id) or _intern_new(symbols["ProductID"], product_ids, product_id)
+            product_name = (product_names.get(product_name) or
+                            _intern_new(symbols["ProductName"], product_names, product_name))
+            customer_id = (customer_ids.get(customer_id) or
+                           _intern_new(symbols["CustomerID"], customer_ids, customer_id))
+            region = regions.get(region) or _intern_new(symbols["Region"], regions, region)
+
+        # Store cleaned record as dictionary
+        transaction = {
+            "TransactionID": transaction_id,
+            "Date": date,
+            "ProductID": product_id,
+            "ProductName": product_name,
+            "Quantity": quantity,
+            "UnitPrice": unit_price,
+            "CustomerID": customer_id,
+            "Region": region
+        }
+
+        yield transaction
+
+
+def iter_fields(raw_lines):
+    """
+    Splits and cleans raw lines.
+    Yields one tuple of converted field values per valid line, in the
+    order (TransactionID, Date, ProductID, ProductName, Quantity,
+    UnitPrice, CustomerID, Region).
+    """
 
     for line in raw_lines:
         line = line.strip()
@@ -81,50 +232,216 @@ def parse_transactions(raw_lines):
         except:
             continue  # Skip if conversion fails
 
-        # Store cleaned record as dictionary
-        transaction = {
-            "TransactionID": transaction_id,
-            "Date": date,
-            "ProductID": product_id,
-            "ProductName": product_name,
-            "Quantity": quantity,
-            "UnitPrice": unit_price,
-            "CustomerID": customer_id,
-            "Region": region
-        }
+        yield (transaction_id, date, product_id, product_name,
+               quantity, unit_price, customer_id, region)
+
+
+#--------------Validation--------------#
+# (rule name, field, predicate the field value of a valid transaction
+# passes), checked in this order. A rejected row is counted under the
+# first rule it fails (filter_summary["invalid_by_rule"]).
+# validate_rows and validate_table have them written out inline; change
+# all three together.
+VALIDATION_RULES = (
+    ("quantity", "Quantity", lambda quantity: quantity > 0),
+    ("unit_price", "UnitPrice", lambda unit_price: unit_price > 0),
+    ("transaction_id", "TransactionID", methodcaller("startswith", "T")),
+    ("product_id", "ProductID", methodcaller("startswith", "P")),
+    ("customer_id", "CustomerID", methodcaller("startswith", "C")),
+    ("region", "Region", lambda region: region.strip() != ""),
+)
+
+# TransactionTable attributes holding the non-categorical fields
+TABLE_COLUMNS = {"TransactionID": "transaction_ids", "Quantity": "quantity", "UnitPrice": "unit_price"}
+
 
-        transactions.append(transaction)
+def validate_rows(transactions, records=False, rules=VALIDATION_RULES):
+    """
+    Validates transaction dictionaries in one pass (works on any
+    iterable, including iter_transactions generators).
+
+    Valid rows get their Amount added, or with records=True are returned
+    as Transaction records instead.
+
+    Returns: (valid rows, total_input, rejected) where rejected[k] counts
+    the rows whose first failed rule is rules[k]
+    """
+
+    if rules is not VALIDATION_RULES:
+        return validate_rows_with(transactions, records, rules)
+
+    rejected = [0] * len(rules)
+    valid = []
+    append = valid.append
+    from_dict = Transaction.from_dict
+    total_input = 0
+
+    for tx in transactions:
+        total_input += 1
+        quantity = tx["Quantity"]
+        unit_price = tx["UnitPrice"]
+
+        # VALIDATION_RULES written out as one if/elif chain (no call per
+        # rule); keep the two in the same order
+        if not quantity > 0:
+            rejected[0] += 1
+        elif not unit_price > 0:
+            rejected[1] += 1
+        elif not tx["TransactionID"].startswith("T"):
+            rejected[2] += 1
+        elif not tx["ProductID"].startswith("P"):
+            rejected[3] += 1
+        elif not tx["CustomerID"].startswith("C"):
+            rejected[4] += 1
+        elif not tx["Region"].strip():
+            rejected[5] += 1
+        elif records:
+            append(from_dict(tx))
+        else:
+            # Compute transaction amount
+            tx["Amount"] = quantity * unit_price
+            append(tx)
+
+    return valid, total_input, rejected
+
+
+def validate_rows_with(transactions, records, rules):
+    """
+    validate_rows for rules other than VALIDATION_RULES: calls each
+    rule's predicate in turn.
+    """
+
+    checks = [(field, passes) for _, field, passes in rules]
+    rejected = [0] * len(checks)
+    valid = []
+    total_input = 0
+
+    for tx in transactions:
+        total_input += 1
+
+        for k, (field, passes) in enumerate(checks):
+            if not passes(tx[field]):
+                rejected[k] += 1
+                break
+        else:
+            if records:
+                valid.append(Transaction.from_dict(tx))
+            else:
+                tx["Amount"] = tx["Quantity"] * tx["UnitPrice"]
+                valid.append(tx)
 
-    return transactions
+    return valid, total_input, rejected
 
 
-def validate_and_filter(transactions, region=None, min_amount=None, max_amount=None):
+def validate_table(table, rules=VALIDATION_RULES):
+    """
+    Validates a TransactionTable in one pass over the rows. Rules on a
+    categorical field are evaluated once per distinct value rather than
+    once per row.
+
+    Returns: (valid row positions, rejected) as in validate_rows
+    """
+
+    if rules is not VALIDATION_RULES:
+        return validate_table_with(table, rules)
+
+    # Per-code pass flags of the categorical rules
+    symbols = table.symbols
+    flags = {
+        field: [passes(value) for value in symbols[field].values]
+        for _, field, passes in rules if field in CATEGORICAL_FIELDS
+    }
+    valid_product = flags["ProductID"]
+    valid_customer = flags["CustomerID"]
+    valid_region = flags["Region"]
+
+    quantity = table.quantity
+    unit_price = table.unit_price
+    transaction_ids = table.transaction_ids
+    product_codes = table.codes["ProductID"]
+    customer_codes = table.codes["CustomerID"]
+    region_codes = table.codes["Region"]
+
+    rejected = [0] * len(rules)
+    positions = []
+    append = positions.append
+
+    # Same if/elif chain as validate_rows
+    for i in range(len(table)):
+        if not quantity[i] > 0:
+            rejected[0] += 1
+        elif not unit_price[i] > 0:
+            rejected[1] += 1
+        elif not transaction_ids[i].startswith("T"):
+            rejected[2] += 1
+        elif not valid_product[product_codes[i]]:
+            rejected[3] += 1
+        elif not valid_customer[customer_codes[i]]:
+            rejected[4] += 1
+        elif not valid_region[region_codes[i]]:
+            rejected[5] += 1
+        else:
+            append(i)
+
+    return positions, rejected
+
+
+def validate_table_with(table, rules):
+    """
+    validate_table for rules other than VALIDATION_RULES: one rule at a
+    time over the rows still left.
+    """
+
+    symbols = table.symbols
+    positions = range(len(table))
+    rejected = []
+
+    for _, field, passes in rules:
+        if field in CATEGORICAL_FIELDS:
+            flags = [passes(value) for value in symbols[field].values]
+            codes = table.codes[field]
+            kept = [i for i in positions if flags[codes[i]]]
+        else:
+            column = getattr(table, TABLE_COLUMNS[field])
+            kept = [i for i in positions if passes(column[i])]
+
+        rejected.append(len(positions) - len(kept))
+        positions = kept
+
+    return list(positions), rejected
+
+
+def rejection_counts(rejected, rules=VALIDATION_RULES):
+    """
+    Returns {rule name: rejected rows} from a validate_rows /
+    validate_table rejected list.
+    """
+
+    return {rule[0]: count for rule, count in zip(rules, rejected)}
+
+
+def validate_and_filter(transactions, region=None, min_amount=None, max_amount=None, records=False):
     """
     Validates transactions and applies optional filters.
     Returns: (valid_transactions, invalid_count, filter_summary)
+
+    Valid dictionaries get an Amount key. With records=True they are
+    returned as compact Transaction records instead (read like the
+    dictionaries, about a third of the memory). If transactions is a
+    TransactionTable, valid_transactions is also a TransactionTable
+    (sharing its symbol tables).
+
+    filter_summary["invalid_by_rule"] splits invalid_count by the
+    VALIDATION_RULES rule each row failed first.
     """
 
-    valid_transactions = []
-    invalid_count = 0
+    if isinstance(transactions, TransactionTable):
+        return validate_and_filter_table(transactions, region, min_amount, max_amount)
 
     # --- Validation Phase ---
-    for tx in transactions:
-        if (
-            tx["Quantity"] <= 0 or
-            tx["UnitPrice"] <= 0 or
-            not tx["TransactionID"].startswith("T") or
-            not tx["ProductID"].startswith("P") or
-            not tx["CustomerID"].startswith("C") or
-            tx["Region"].strip() == ""
-        ):
-            invalid_count += 1
-            continue
-
-        # Compute transaction amount
-        tx["Amount"] = tx["Quantity"] * tx["UnitPrice"]
-        valid_transactions.append(tx)
+    valid_transactions, total_input, rejected = validate_rows(transactions, records)
+    invalid_count = sum(rejected)
 
-    total_input = len(transactions)
     filtered_by_region = 0
     filtered_by_amount = 0
 
@@ -149,6 +466,7 @@ def validate_and_filter(transactions, region=None, min_amount=None, max_amount=N
     filter_summary = {
         "total_input": total_input,
         "invalid": invalid_count,
+        "invalid_by_rule": rejection_counts(rejected),
         "filtered_by_region": filtered_by_region,
         "filtered_by_amount": filtered_by_amount,
         "final_count": len(valid_transactions)
@@ -157,3 +475,544 @@ def validate_and_filter(transactions, region=None, min_amount=None, max_amount=N
     return valid_transactions, invalid_count, filter_summary
 
 
+def add_filter_summaries(first, second):
+    """
+    Adds up two filter summaries (e.g. of two files, or of two runs over
+    parts of one file). Counts missing from either side count as 0.
+    """
+
+    total = {}
+
+    for key in list(first) + [key for key in second if key not in first]:
+        if key == "invalid_by_rule":
+            first_rules = first.get(key, {})
+            second_rules = second.get(key, {})
+            total[key] = {
+                name: first_rules.get(name, 0) + second_rules.get(name, 0)
+                for name in list(first_rules) + [name for name in second_rules if name not in first_rules]
+            }
+        else:
+            total[key] = first.get(key, 0) + second.get(key, 0)
+
+    return total
+
+
+def validate_and_filter_table(table, region=None, min_amount=None, max_amount=None):
+    """
+    validate_and_filter for a columnar TransactionTable.
+
+    The string checks (ProductID / CustomerID prefixes, blank Region) are
+    evaluated once per distinct value rather than once per row.
+    Returns: (valid_table, invalid_count, filter_summary)
+    """
+
+    # --- Validation Phase ---
+    positions, rejected = validate_table(table)
+
+    return filter_table(table, positions, len(table), rejection_counts(rejected),
+                        region, min_amount, max_amount)
+
+
+def valid_positions(table):
+    """
+    Returns the row positions of a TransactionTable that pass validation.
+    """
+
+    return validate_table(table)[0]
+
+
+def filter_table(table, positions, total_input, invalid_by_rule,
+                 region=None, min_amount=None, max_amount=None):
+    """
+    Applies the optional region / amount filters to already-validated
+    row positions of a TransactionTable.
+    invalid_by_rule: {rule name: rejected rows} of the validation
+    Returns: (valid_table, invalid_count, filter_summary)
+    """
+
+    invalid_count = sum(invalid_by_rule.values())
+
+    filtered_by_region = 0
+    filtered_by_amount = 0
+
+    # --- Apply Region Filter ---
+    if region:
+        before = len(positions)
+        region_codes = table.codes["Region"]
+        region_code = table.symbols["Region"].codes.get(region)
+        positions = [i for i in positions if region_codes[i] == region_code]
+        filtered_by_region = before - len(positions)
+
+    # --- Apply Amount Filters ---
+    amount = table.amount
+
+    if min_amount is not None:
+        before = len(positions)
+        positions = [i for i in positions if amount[i] >= min_amount]
+        filtered_by_amount += before - len(positions)
+
+    if max_amount is not None:
+        before = len(positions)
+        positions = [i for i in positions if amount[i] <= max_amount]
+        filtered_by_amount += before - len(positions)
+
+    # Skip the copy when nothing was dropped
+    if len(positions) == len(table) and table.validated:
+        valid_table = table
+    else:
+        valid_table = table.take(positions)
+        valid_table.validated = True
+
+    # --- Summary Dictionary ---
+    filter_summary = {
+        "total_input": total_input,
+        "invalid": invalid_count,
+        "invalid_by_rule": invalid_by_rule,
+        "filtered_by_region": filtered_by_region,
+        "filtered_by_amount": filtered_by_amount,
+        "final_count": len(valid_table)
+    }
+
+    return valid_table, invalid_count, filter_summary
+
+
+#--------------Byte tokenizer--------------#
+# Bytes removed by str.strip() that are ASCII (bytes.strip() alone only
+# removes the first six)
+STRIP_BYTES = b" \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f"
+
+# Size of the slices the memory-mapped file is tokenized in (the slice
+# end is moved to the next newline)
+TOKENIZE_BLOCK_BYTES = 1 << 22
+
+STRIP_TO_SPACE = bytes.maketrans(b"\t\x0b\x0c\x1c\x1d\x1e\x1f", b" " * 7)
+
+strip_line = methodcaller("strip", STRIP_BYTES)
+count_pipes = methodcaller("count", b"|")
+
+
+def detect_encoding(data, block_bytes=TOKENIZE_BLOCK_BYTES):
+    """
+    Returns the encoding read_sales_data would end up using for a whole
+    file: 'utf-8' if every byte decodes as utf-8, else 'latin-1'.
+    Checked block by block, without building the decoded text.
+    """
+
+    decoder = codecs.getincrementaldecoder("utf-8")()
+
+    try:
+        for start in range(0, len(data), block_bytes):
+            block = data[start:start + block_bytes]
+            # An ASCII block can be skipped, unless the previous block
+            # ended inside a multi-byte sequence the decoder still holds
+            if decoder.getstate()[0] or not block.isascii():
+                decoder.decode(block)
+        decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        return "latin-1"
+
+    return "utf-8"
+
+
+def convert_field(value, convert, encoding):
+    """
+    int() / float() of a byte field, retried on the decoded text (which
+    also accepts non-ASCII digits and whitespace). None if both fail.
+    """
+
+    try:
+        return convert(value)
+    except ValueError:
+        pass
+
+    try:
+        return convert(value.decode(encoding))
+    except ValueError:
+        return None
+
+
+def encode_column(values, symbols, encoding):
+    """
+    Dictionary-encodes a column of byte strings into a SymbolTable.
+    Each distinct value is decoded once, in first-seen order.
+    """
+
+    mapping = dict.fromkeys(values)
+
+    for value in mapping:
+        mapping[value] = symbols.encode(value.decode(encoding))
+
+    return array("i", list(map(mapping.__getitem__, values)))
+
+
+def strip_blank_lines(data):
+    """
+    Drops the blank lines of a block (and its leading / trailing
+    newlines). Returns None if any line would be changed by str.strip()
+    at an ASCII character, as those need the line-by-line path.
+    """
+
+    while b"\n\n" in data:
+        data = data.replace(b"\n\n", b"\n")
+    data = data.strip(b"\n")
+
+    # All strippable bytes are mapped to a space first so two searches
+    # cover them
+    spaced = data.translate(STRIP_TO_SPACE)
+    if spaced[:1] == b" " or spaced[-1:] == b" " or b"\n " in spaced or b" \n" in spaced:
+        return None
+
+    return data
+
+
+def split_regular_block(data):
+    """
+    Fast path of tokenize_block for blocks in which every non-blank line
+    is already stripped and has exactly 8 fields (the common case).
+    Everything is done with whole-block bytes operations.
+
+    Returns: (line_count, fields) where fields is the flat list of field
+    values (8 per row), or None if the block needs the line-by-line path
+    """
+
+    data = strip_blank_lines(data)
+
+    if data is None:
+        return None
+    if not data:
+        return 0, []
+
+    line_count = data.count(b"\n") + 1
+
+    # Each line's first field gets a "\n" prefix. With 8 fields on every
+    # line all of them land in the TransactionID column (every 8th field)
+    fields = data.replace(b"\n", b"|\n").split(b"|")
+    if len(fields) != 8 * line_count:
+        return None
+
+    transaction_ids = b"|".join(fields[0::8])
+    if transaction_ids.count(b"\n") != line_count - 1:
+        return None
+
+    fields[0::8] = transaction_ids.replace(b"\n", b"").split(b"|")
+
+    # Non-ASCII at a line edge could be whitespace str.strip() removes
+    if not data.isascii() and not (transaction_ids.isascii()
+                                   and b"|".join(fields[7::8]).isascii()):
+        return None
+
+    return line_count, fields
+
+
+def split_irregular_block(data, encoding):
+    """
+    Line-by-line path of tokenize_block: strips each line, drops blank
+    lines and lines with too few fields and merges product names that
+    contain "|".
+
+    Returns: (line_count, fields) as split_regular_block
+    """
+
+    lines = list(map(strip_line, data.split(b"\n")))
+
+    # str.strip() also removes non-ASCII whitespace (e.g. NBSP): redo the
+    # strip on the decoded text for lines that start or end outside ASCII
+    if not data.isascii():
+        lines = [
+            line.decode(encoding).strip().encode(encoding)
+            if line and (line[0] > 127 or line[-1] > 127) else line
+            for line in lines
+        ]
+
+    line_count = len(lines) - lines.count(b"")
+
+    # Regular lines have exactly 7 delimiters. The others are blank, have
+    # too few fields (skipped) or a product name containing "|" (merged
+    # back into one field)
+    pipe_counts = list(map(count_pipes, lines))
+
+    if pipe_counts.count(7) != len(lines):
+        for i, pipes in enumerate(pipe_counts):
+            if pipes == 7:
+                continue
+
+            if pipes < 7:
+                lines[i] = None
+            else:
+                parts = lines[i].split(b"|")
+                lines[i] = b"|".join([parts[0], parts[1], parts[2], b"".join(parts[3:-4]),
+                                      parts[-4], parts[-3], parts[-2], parts[-1]])
+
+        lines = [line for line in lines if line is not None]
+
+    if not lines:
+        return line_count, []
+
+    return line_count, b"|".join(lines).split(b"|")
+
+
+def tokenize_block(data, table, encoding="utf-8"):
+    """
+    Tokenizes a block of raw bytes (whole lines) straight into a
+    TransactionTable, with the same results as
+    parse_transactions(<the block's lines>, as_table=True).
+
+    The block is split on b"|" without decoding; numbers are converted
+    from the byte slices and only the distinct values of string fields
+    are decoded. Work is done on whole columns (join / split / map), so
+    the per-row loops run in C; only irregular blocks are handled line
+    by line.
+
+    Returns: number of non-empty lines in the block
+    """
+
+    # Universal newlines, as in text-mode reading
+    if b"\r" in data:
+        data = data.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+
+    split = split_regular_block(data) or split_irregular_block(data, encoding)
+    line_count, fields = split
+
+    if not fields:
+        return line_count
+
+    # Column k is every 8th field from k
+    transaction_ids, dates, product_ids, product_names, quantities, unit_prices, \
+        customer_ids, regions = (fields[k::8] for k in range(8))
+
+    # Remove commas from product name and numeric fields (fields never
+    # contain "|", so a whole column can be joined, cleaned and re-split)
+    for column in (product_names, quantities, unit_prices):
+        joined = b"|".join(column)
+        if b"," in joined:
+            column[:] = joined.replace(b",", b"").split(b"|")
+
+    # Convert data types (falling back per value only if the fast path fails)
+    try:
+        quantities = list(map(int, quantities))
+        unit_prices = list(map(float, unit_prices))
+    except ValueError:
+        quantities = [convert_field(value, int, encoding) for value in quantities]
+        unit_prices = [convert_field(value, float, encoding) for value in unit_prices]
+
+        # Skip rows where either conversion fails
+        keep = [
+            i for i in range(len(quantities))
+            if quantities[i] is not None and unit_prices[i] is not None
+        ]
+        if len(keep) != len(quantities):
+            columns = (transaction_ids, dates, product_ids, product_names,
+                       quantities, unit_prices, customer_ids, regions)
+            transaction_ids, dates, product_ids, product_names, quantities, unit_prices, \
+                customer_ids, regions = ([column[i] for i in keep] for column in columns)
+
+        if not keep:
+            return line_count
+
+    table.transaction_ids.extend(b"|".join(transaction_ids).decode(encoding).split("|"))
+    table.quantity.fromlist(quantities)
+    table.unit_price.fromlist(unit_prices)
+    table.amount.fromlist(list(map(mul, quantities, unit_prices)))
+
+    symbols = table.symbols
+    for field, values in (("Date", dates), ("ProductID", product_ids),
+                          ("ProductName", product_names), ("CustomerID", customer_ids),
+                          ("Region", regions)):
+        table.codes[field].extend(encode_column(values, symbols[field], encoding))
+
+    return line_count
+
+
+def header_end(data):
+    """
+    Returns the offset just after the header row of the raw file bytes.
+    The header ends at the first \\n, \\r or \\r\\n, as in text-mode reading.
+    """
+
+    newline = data.find(b"\n")
+    newline = len(data) if newline == -1 else newline
+    carriage = data.find(b"\r", 0, newline)
+
+    if carriage != -1 and carriage + 1 != newline:
+        return carriage + 1
+
+    return newline + 1
+
+
+def tokenize_sales_file(filename, block_bytes=TOKENIZE_BLOCK_BYTES, backend="python", symbols=None):
+    """
+    Reads and parses a sales file in one step: the file is memory-mapped
+    and tokenized in line-aligned blocks by tokenize_block.
+
+    Same result as parse_transactions(read_sales_data(filename), as_table=True),
+    including the encoding fallback, skipped rows and universal newlines,
+    without decoding the whole file or building per-line strings.
+
+    backend="numpy" tokenizes with the vectorized version in
+    utils/vectorized.py (needs NumPy; same result).
+
+    symbols: symbol tables to encode into (see parse_transactions)
+
+    Returns: (table, line_count) where line_count is the number of lines
+    read_sales_data would return
+    """
+
+    if backend == "numpy":
+        try:
+            from utils.vectorized import tokenize_block as tokenize
+        except ImportError as e:
+            raise ImportError("backend='numpy' requires NumPy to be installed") from e
+    elif backend == "python":
+        tokenize = tokenize_block
+    else:
+        raise ValueError(f"Unknown backend '{backend}', expected 'python' or 'numpy'")
+
+    table = TransactionTable(symbols)
+
+    try:
+        file = open(filename, "rb")
+    except FileNotFoundError:
+        print("Error: File not found!")
+        return table, 0
+
+    with file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return table, 0
+
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            encoding = detect_encoding(data, block_bytes)
+
+            size = len(data)
+
+            start = header_end(data)
+
+            line_count = 0
+
+            while start < size:
+                end = data.find(b"\n", start + block_bytes)
+                end = size if end == -1 else end + 1
+
+                line_count += tokenize(data[start:end], table, encoding)
+                start = end
+
+    return table, line_count
+
+
+#--------------Parallel ingest--------------#
+def split_file(filename, chunk_count, min_chunk_bytes=1 << 20):
+    """
+    Splits a sales file into byte ranges that start and end on line
+    boundaries (the header line is excluded).
+
+    Returns: list of (start, end) tuples in file order
+    """
+
+    with open(filename, "rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        if size == 0:
+            return []
+
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            data_start = min(header_end(data), size)
+
+            data_size = size - data_start
+            if data_size <= 0:
+                return []
+
+            chunk_count = max(1, min(chunk_count, data_size // min_chunk_bytes))
+            chunk_bytes = data_size // chunk_count
+
+            ranges = []
+            start = data_start
+
+            while start < size:
+                end = start + chunk_bytes
+
+                if end >= size or len(ranges) == chunk_count - 1:
+                    end = size
+                else:
+                    # Move the boundary to just after the next newline
+                    newline = data.find(b"\n", end)
+                    end = size if newline == -1 else newline + 1
+
+                ranges.append((start, end))
+                start = end
+
+    return ranges
+
+
+def parse_and_validate_chunk(filename, start, end, encoding="utf-8"):
+    """
+    Worker for parallel_parse_and_validate.
+    Parses and validates the lines in one byte range of the file, decoded
+    with the encoding of the whole file.
+
+    Returns: (valid_table, total_parsed, rejected) where rejected is the
+    validate_table per-rule count list
+    """
+
+    with open(filename, "rb") as file:
+        file.seek(start)
+        data = file.read(end - start)
+
+    table = TransactionTable()
+    tokenize_block(data, table, encoding)
+
+    positions, rejected = validate_table(table)
+
+    valid_table = table.take(positions)
+    valid_table.validated = True
+
+    return valid_table, len(table), rejected
+
+
+def parallel_parse_and_validate(filename, region=None, min_amount=None, max_amount=None,
+                                workers=None):
+    """
+    Parses and validates a sales file across multiple processes.
+
+    The file is split into line-aligned byte ranges; each range is parsed
+    and validated in a ProcessPoolExecutor worker, which returns a compact
+    TransactionTable of its valid rows plus its counts. Chunks are merged
+    in file order, then the region / amount filters are applied, so rows
+    and filter_summary match
+        validate_and_filter(parse_transactions(read_sales_data(...)), ...)
+
+    Returns: (valid_table, invalid_count, filter_summary)
+    """
+
+    workers = workers or os.cpu_count() or 1
+
+    if not os.path.exists(filename):
+        print("Error: File not found!")
+        return validate_and_filter(TransactionTable(), region, min_amount, max_amount)
+
+    encoding = file_encoding(filename)
+    ranges = split_file(filename, workers)
+
+    if len(ranges) <= 1:
+        results = [parse_and_validate_chunk(filename, start, end, encoding) for start, end in ranges]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(
+                parse_and_validate_chunk,
+                [filename] * len(ranges),
+                [start for start, _ in ranges],
+                [end for _, end in ranges],
+                [encoding] * len(ranges)
+            ))
+
+    merged = TransactionTable()
+    merged.validated = True
+    total_input = 0
+    rejected = [0] * len(VALIDATION_RULES)
+
+    for chunk_table, chunk_total, chunk_rejected in results:
+        merged.extend(chunk_table)
+        total_input += chunk_total
+        rejected = list(map(add, rejected, chunk_rejected))
+
+    return filter_table(
+        merged, list(range(len(merged))), total_input, rejection_counts(rejected),
+        region, min_amount, max_amount
+    )
@@ -0,0 +1,224 @@
+import hashlib
+import json
+import os
+
+from utils.data_processor import SalesAggregator
+from utils.file_handler import (add_filter_summaries, file_encoding, header_end, parse_transactions,
+                                validate_and_filter)
+
+SNAPSHOT_FILE = "output/analytics_snapshot.json"
+SNAPSHOT_VERSION = 1
+
+# Bytes hashed at each end of the prefix in quick_check mode
+SAMPLE_BYTES = 1 << 16
+
+
+def _hash_bytes(digest, file, count):
+    """
+    Feeds the next `count` bytes of an open file into a hash object.
+    """
+
+    while count > 0:
+        block = file.read(min(count, 1 << 20))
+        if not block:
+            break
+        digest.update(block)
+        count -= len(block)
+
+
+def prefix_digest(filename, offset, quick=False):
+    """
+    Hashes the first `offset` bytes of a file (sha256).
+
+    By default the whole prefix is hashed, which detects any change.
+    quick=True only hashes the first and last 64 KB of the prefix, for
+    files too large to re-hash on every run.
+    Returns the hashlib object, so the hash can be extended.
+    """
+
+    digest = hashlib.sha256()
+
+    with open(filename, "rb") as file:
+        if quick and offset > 2 * SAMPLE_BYTES:
+            digest.update(file.read(SAMPLE_BYTES))
+            file.seek(offset - SAMPLE_BYTES)
+            digest.update(file.read(SAMPLE_BYTES))
+        else:
+            _hash_bytes(digest, file, offset)
+
+    return digest
+
+
+def load_snapshot(filename=SNAPSHOT_FILE):
+    """
+    Loads a snapshot file. Returns None if it is missing or unreadable.
+    """
+
+    try:
+        with open(filename, "r", encoding="utf-8") as file:
+            snapshot = json.load(file)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError):
+        print("Warning: Snapshot file is unreadable, ignoring it.")
+        return None
+
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        return None
+
+    return snapshot
+
+
+def save_snapshot(snapshot, filename=SNAPSHOT_FILE):
+    """
+    Writes a snapshot atomically (temp file + rename).
+    """
+
+    temp_file = f"{filename}.tmp"
+
+    with open(temp_file, "w", encoding="utf-8") as file:
+        json.dump(snapshot, file)
+
+    os.replace(temp_file, filename)
+
+
+def snapshot_mismatch(snapshot, filename, filters, quick_check=False, rollup=False, encoding="utf-8"):
+    """
+    Checks whether a snapshot can be continued for this file.
+    encoding is the file's current file_encoding(): when appended bytes
+    change it, the whole file reads differently and is rebuilt.
+    Returns: (reason, digest) where reason is None if it can be continued
+    (otherwise why a full rebuild is needed) and digest is the verified
+    prefix hash.
+    """
+
+    if snapshot is None:
+        return "no snapshot", None
+
+    if snapshot["source"] != os.path.abspath(filename):
+        return "different source file", None
+
+    if snapshot["filters"] != filters:
+        return "filters changed", None
+
+    if (snapshot["state"].get("rollup") is not None) != rollup:
+        return "rollups turned on or off", None
+
+    if snapshot.get("encoding") != encoding:
+        return "file encoding changed", None
+
+    if os.path.getsize(filename) < snapshot["offset"]:
+        return "file is shorter than the snapshot (truncated or replaced)", None
+
+    digest = prefix_digest(filename, snapshot["offset"], quick_check)
+    if digest.hexdigest() != snapshot["fingerprint"]:
+        return "already-processed part of the file has changed", None
+
+    return None, digest
+
+
+def read_complete_lines(filename, offset, encoding="utf-8"):
+    """
+    Reads the lines appended after `offset`, decoded with the encoding
+    of the whole file and split on "\n", "\r" and "\r\n" like
+    read_sales_data (text-mode reading).
+
+    Only complete lines are consumed; a trailing partial line (still
+    being written by the feed) is left for the next run. A "\r" at the
+    end counts as a line end: if a "\n" follows later it only adds a
+    blank line, which is skipped.
+    Returns: (list of stripped non-empty lines, new offset)
+    """
+
+    with open(filename, "rb") as file:
+        file.seek(offset)
+        data = file.read()
+
+    start = header_end(data) if offset == 0 else 0
+    end = max(data.rfind(b"\n"), data.rfind(b"\r")) + 1
+
+    # Not even the header row is complete yet
+    if end < start:
+        return [], offset
+
+    text = data[start:end].decode(encoding)
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    lines = [line for line in map(str.strip, text.split("\n")) if line]
+
+    return lines, offset + end
+
+
+def incremental_analysis(filename, snapshot_file=SNAPSHOT_FILE, region=None,
+                         min_amount=None, max_amount=None, quick_check=False,
+                         distinct="exact", rollup=False):
+    """
+    Updates the persisted analytics with only the lines appended to
+    `filename` since the last run.
+
+    The snapshot stores the SalesAggregator state, the byte offset that
+    has been processed and a fingerprint of that prefix. If the prefix
+    changed (or the filters differ) everything is rebuilt from scratch.
+
+    The updated snapshot is returned but not written, so the caller can
+    add to it (e.g. enrichment totals) before calling save_snapshot().
+
+    rollup=True keeps date-range rollups in the aggregates (see
+    SalesAggregator); turning it on or off also rebuilds.
+
+    Returns: (analytics, new_transactions, filter_summary, snapshot)
+    snapshot["rebuilt"] tells whether a full rebuild happened.
+    """
+
+    filters = {"region": region, "min_amount": min_amount, "max_amount": max_amount}
+    encoding = file_encoding(filename)
+    snapshot = load_snapshot(snapshot_file)
+    reason, digest = snapshot_mismatch(snapshot, filename, filters, quick_check, rollup, encoding)
+
+    if reason is None:
+        analytics = SalesAggregator.from_state(snapshot["state"])
+        offset = snapshot["offset"]
+        previous_summary = snapshot["filter_summary"]
+        enrichment = snapshot.get("enrichment")
+    else:
+        print(f"Full rebuild ({reason})")
+        analytics = SalesAggregator(distinct=distinct, rollup=rollup)
+        offset = 0
+        previous_summary = None
+        enrichment = None
+
+    lines, new_offset = read_complete_lines(filename, offset, encoding)
+
+    # Extend the verified prefix hash with the new bytes instead of
+    # re-reading the whole file
+    if quick_check or digest is None:
+        fingerprint = prefix_digest(filename, new_offset, quick_check).hexdigest()
+    else:
+        with open(filename, "rb") as file:
+            file.seek(offset)
+            _hash_bytes(digest, file, new_offset - offset)
+        fingerprint = digest.hexdigest()
+
+    transactions = parse_transactions(lines, as_table=True)
+    new_transactions, invalid_count, filter_summary = validate_and_filter(
+        transactions, region, min_amount, max_amount
+    )
+    analytics.update(new_transactions)
+
+    # Counts add up across runs
+    if previous_summary is not None:
+        filter_summary = add_filter_summaries(previous_summary, filter_summary)
+
+    snapshot = {
+        "version": SNAPSHOT_VERSION,
+        "source": os.path.abspath(filename),
+        "offset": new_offset,
+        "fingerprint": fingerprint,
+        "filters": filters,
+        "encoding": encoding,
+        "filter_summary": filter_summary,
+        "state": analytics.to_state(),
+        "enrichment": enrichment,
+        "rebuilt": reason is not None
+    }
+
+    return analytics, new_transactions, filter_summary, snapshot
@@ -0,0 +1,237 @@
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+def peak_rss_bytes():
+    """
+    Peak resident set size of this process so far (None if unknown).
+    """
+
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Linux reports KB, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class StageStats:
+    """
+    Measurements of one pipeline stage. rows_in / rows_out may be set
+    by the caller inside RunRecorder.stage().
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.start = None
+        self.end = None
+        self.cpu_seconds = None
+        self.rows_in = None
+        self.rows_out = None
+        self.peak_rss_bytes = None
+        self.tracemalloc_peak_bytes = None
+        self.profile_file = None
+        self.error = None
+
+    @property
+    def wall_seconds(self):
+        return self.end - self.start
+
+    @property
+    def rows_per_second(self):
+        rows = self.rows_in if self.rows_in is not None else self.rows_out
+        if rows is None or self.wall_seconds <= 0:
+            return None
+
+        return rows / self.wall_seconds
+
+    def to_dict(self, run_start):
+        return {
+            "stage": self.name,
+            "start_seconds": round(self.start - run_start, 6),
+            "wall_seconds": round(self.wall_seconds, 6),
+            "cpu_seconds": round(self.cpu_seconds, 6),
+            "rows_in": self.rows_in,
+            "rows_out": self.rows_out,
+            "rows_per_second": None if self.rows_per_second is None else round(self.rows_per_second, 1),
+            "peak_rss_bytes": self.peak_rss_bytes,
+            "tracemalloc_peak_bytes": self.tracemalloc_peak_bytes,
+            "profile_file": self.profile_file,
+            "error": self.error
+        }
+
+
+class RunRecorder:
+    """
+    Records per-stage wall time, CPU time, memory and row throughput for
+    one run, and writes them as a JSON run record.
+
+    - CPU time is the stage thread's own (time.thread_time), so a stage
+      running in a background thread is measured on its own. Work done
+      in child processes is not included.
+    - peak_rss_bytes is the process high-water mark at the end of the
+      stage.
+    - trace_memory=True also records the tracemalloc peak of each stage:
+      the most Python memory it allocated on top of what was already
+      allocated when it started (slows the run down; overlapping stages
+      count each other's allocations).
+    - profile_stage: name of a stage to run under cProfile; the stats
+      are dumped to <profile_dir>/profile_<stage>.prof (read with pstats).
+
+    Safe to use from several threads.
+    """
+
+    def __init__(self, trace_memory=False, profile_stage=None, profile_dir="output"):
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        self.run_start = time.perf_counter()
+        self.trace_memory = trace_memory
+        self.profile_stage = profile_stage
+        self.profile_dir = profile_dir
+        self.stages = []
+        self.metadata = {}
+        self._lock = threading.Lock()
+
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        """
+        Context manager measuring the code in its block as stage `name`.
+        Yields the StageStats, so rows_out can be set once known.
+        """
+
+        stats = StageStats(name)
+        stats.rows_in = rows_in
+
+        profiler = cProfile.Profile() if name == self.profile_stage else None
+
+        if self.trace_memory:
+            tracemalloc.reset_peak()
+            traced_start = tracemalloc.get_traced_memory()[0]
+
+        cpu_start = time.thread_time()
+        stats.start = time.perf_counter()
+        if profiler:
+            profiler.enable()
+
+        try:
+            yield stats
+        except BaseException as e:
+            stats.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            if profiler:
+                profiler.disable()
+
+            stats.end = time.perf_counter()
+            stats.cpu_seconds = time.thread_time() - cpu_start
+            stats.peak_rss_bytes = peak_rss_bytes()
+
+            if self.trace_memory:
+                stats.tracemalloc_peak_bytes = max(0, tracemalloc.get_traced_memory()[1] - traced_start)
+
+            if profiler:
+                os.makedirs(self.profile_dir, exist_ok=True)
+                stats.profile_file = os.path.join(self.profile_dir, f"profile_{name}.prof")
+                profiler.dump_stats(stats.profile_file)
+
+            with self._lock:
+                self.stages.append(stats)
+
+    def call(self, name, func, *args, rows_in=None, rows_out=None, **kwargs):
+        """
+        Calls func(*args, **kwargs) as stage `name` and returns its result.
+        rows_out: a number, or a function of the result (e.g. len).
+        """
+
+        with self.stage(name, rows_in) as stats:
+            result = func(*args, **kwargs)
+            stats.rows_out = rows_out(result) if callable(rows_out) else rows_out
+
+        return result
+
+    def to_record(self, status="ok"):
+        """
+        Returns the run record (JSON-serializable dictionary).
+        """
+
+        with self._lock:
+            stages = sorted(self.stages, key=lambda stats: stats.start)
+
+        return {
+            "started_at": self.started_at,
+            "status": status,
+            "total_seconds": round(time.perf_counter() - self.run_start, 6),
+            "cpu_seconds": round(time.process_time(), 6),
+            "peak_rss_bytes": peak_rss_bytes(),
+            "tracemalloc_peak_bytes": tracemalloc.get_traced_memory()[1] if self.trace_memory else None,
+            "metadata": self.metadata,
+            "stages": [stats.to_dict(self.run_start) for stats in stages]
+        }
+
+    def write(self, filename, status="ok", history_file=None):
+        """
+        Writes the run record to filename (atomically) and, if given,
+        appends it as one line to history_file (JSON lines), so runs can
+        be compared over time.
+
+        Returns: the record
+        """
+
+        record = self.to_record(status)
+
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        temp_file = f"{filename}.tmp.{os.getpid()}"
+        with open(temp_file, "w", encoding="utf-8") as file:
+            json.dump(record, file, indent=2)
+        os.replace(temp_file, filename)
+
+        if history_file:
+            with open(history_file, "a", encoding="utf-8") as file:
+                file.write(json.dumps(record) + "\n")
+
+        return record
+
+    def print_summary(self):
+        """
+        Prints one line per stage: when it ran (relative to the start of
+        the run, so overlapping background stages are visible), CPU time
+        and throughput.
+        """
+
+        with self._lock:
+            stages = sorted(self.stages, key=lambda stats: stats.start)
+
+        print("Stage timings (seconds from start):")
+        for stats in stages:
+            line = (f"  {stats.name:<16} {stats.start - self.run_start:>7.3f} -> "
+                    f"{stats.end - self.run_start:>7.3f}  ({stats.wall_seconds:.3f}s, "
+                    f"cpu {stats.cpu_seconds:.3f}s")
+
+            if stats.rows_per_second is not None:
+                line += f", {stats.rows_per_second:,.0f} rows/s"
+            if stats.tracemalloc_peak_bytes is not None:
+                line += f", peak {stats.tracemalloc_peak_bytes / 1e6:.1f} MB"
+
+            print(line + ")")
+
+        peak = peak_rss_bytes()
+        if peak is not None:
+            print(f"  Peak RSS: {peak / 1e6:.1f} MB")
@@ -0,0 +1,191 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+
+from utils.file_handler import tokenize_sales_file
+from utils.transaction_table import (CATEGORICAL_FIELDS, PackedStrings,
+                                     SymbolTable, TransactionTable, typecode)
+
+# File layout:
+#   MAGIC | uint64 metadata length | metadata (JSON) | column data ...
+# Every column starts on an 8-byte boundary so it can be viewed in place.
+MAGIC = b"SALESPC1"
+CACHE_VERSION = 1
+
+# Bytes hashed at each end of the source file for the cache key
+SAMPLE_BYTES = 1 << 20
+
+
+def cache_filename(filename):
+    """
+    Returns the parsed-cache path kept next to a sales file.
+    """
+
+    return f"{filename}.parsed"
+
+
+def source_key(filename):
+    """
+    Identifies the current contents of a sales file: size, mtime and a
+    sha256 of its first and last MB. Any rewrite changes the size or
+    mtime, so hashing the whole file (too slow for a sub-second warm
+    start on multi-GB inputs) is not needed.
+    """
+
+    stat = os.stat(filename)
+    digest = hashlib.sha256()
+
+    with open(filename, "rb") as file:
+        digest.update(file.read(SAMPLE_BYTES))
+        if stat.st_size > SAMPLE_BYTES:
+            file.seek(max(SAMPLE_BYTES, stat.st_size - SAMPLE_BYTES))
+            digest.update(file.read(SAMPLE_BYTES))
+
+    return {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256_sample": digest.hexdigest()
+    }
+
+
+def write_parsed_cache(table, cache_file, key, line_count):
+    """
+    Writes a TransactionTable to a columnar cache file (atomically).
+    """
+
+    tid_blob, tid_offsets = PackedStrings.pack(table.transaction_ids)
+
+    buffers = [
+        ("quantity", table.quantity),
+        ("unit_price", table.unit_price),
+        ("amount", table.amount),
+        ("transaction_id_offsets", tid_offsets),
+        ("transaction_id_blob", tid_blob)
+    ]
+    for field in CATEGORICAL_FIELDS:
+        buffers.append((f"codes.{field}", table.codes[field]))
+
+    # Column positions are relative to the start of the data section
+    columns = {}
+    position = 0
+    for name, column in buffers:
+        data = column if isinstance(column, bytes) else column.tobytes()
+        fmt = "B" if isinstance(column, bytes) else typecode(column)
+        columns[name] = [position, len(data), fmt]
+        position += len(data) + (-len(data) % 8)
+
+    metadata = json.dumps({
+        "version": CACHE_VERSION,
+        "source": key,
+        "rows": len(table),
+        "lines": line_count,
+        "columns": columns,
+        "symbols": {field: table.symbols[field].values for field in CATEGORICAL_FIELDS}
+    }).encode("utf-8")
+    metadata += b" " * (-(len(MAGIC) + 8 + len(metadata)) % 8)
+
+    temp_file = f"{cache_file}.tmp.{os.getpid()}"
+
+    try:
+        with open(temp_file, "wb") as file:
+            file.write(MAGIC)
+            file.write(struct.pack("<Q", len(metadata)))
+            file.write(metadata)
+
+            for name, column in buffers:
+                data = column if isinstance(column, bytes) else column.tobytes()
+                file.write(data)
+                file.write(b"\0" * (-len(data) % 8))
+
+        os.replace(temp_file, cache_file)
+
+    finally:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+
+
+def load_parsed_cache(cache_file, key=None):
+    """
+    Memory-maps a cache file and returns a read-only TransactionTable
+    whose columns are zero-copy views into the mapping.
+
+    Returns: (table, line_count), or None if the file is missing,
+    corrupt or does not match `key`
+    """
+
+    try:
+        with open(cache_file, "rb") as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    view = memoryview(mapped)
+
+    try:
+        if bytes(view[:len(MAGIC)]) != MAGIC:
+            return None
+
+        (metadata_length,) = struct.unpack("<Q", view[len(MAGIC):len(MAGIC) + 8])
+        data_start = len(MAGIC) + 8 + metadata_length
+        metadata = json.loads(bytes(view[len(MAGIC) + 8:data_start]))
+
+        if metadata.get("version") != CACHE_VERSION or (key is not None and metadata["source"] != key):
+            return None
+
+        def column(name):
+            offset, length, fmt = metadata["columns"][name]
+            start = data_start + offset
+            return view[start:start + length].cast(fmt)
+
+        table = TransactionTable({
+            field: SymbolTable(values) for field, values in metadata["symbols"].items()
+        })
+        table.quantity = column("quantity")
+        table.unit_price = column("unit_price")
+        table.amount = column("amount")
+        table.transaction_ids = PackedStrings(column("transaction_id_blob"),
+                                              column("transaction_id_offsets"))
+        table.codes = {field: column(f"codes.{field}") for field in CATEGORICAL_FIELDS}
+
+    except (ValueError, KeyError, TypeError, struct.error):
+        return None
+
+    return table, metadata["lines"]
+
+
+def parse_sales_file(filename, cache_file=None, use_cache=True, backend="python"):
+    """
+    tokenize_sales_file with a parsed cache next to the source file.
+
+    If the cache matches the source (size, mtime, sampled hash) the
+    table is memory-mapped instead of re-parsed; otherwise the file is
+    parsed (tokenize_sales_file with the given backend) and the cache
+    rewritten.
+
+    Returns: (table, status) where status has 'cache' ('hit', 'miss' or
+    'disabled') and 'lines' (raw data lines read)
+    """
+
+    cache_file = cache_file or cache_filename(filename)
+
+    if use_cache and os.path.exists(filename):
+        key = source_key(filename)
+        cached = load_parsed_cache(cache_file, key)
+
+        if cached is not None:
+            table, line_count = cached
+            return table, {"cache": "hit", "lines": line_count}
+
+    table, line_count = tokenize_sales_file(filename, backend=backend)
+
+    if not use_cache or not os.path.exists(filename):
+        return table, {"cache": "disabled", "lines": line_count}
+
+    try:
+        write_parsed_cache(table, cache_file, key, line_count)
+    except OSError as e:
+        print(f"Warning: Could not write parsed cache ({e})")
+
+    return table, {"cache": "miss", "lines": line_count}
@@ -0,0 +1,175 @@
+from array import array
+from bisect import bisect_left, bisect_right
+
+from utils.file_handler import rejection_counts, validate_table
+from utils.transaction_table import TransactionTable
+
+
+class SalesIndex:
+    """
+    Indexes over the valid rows of a dataset, built once, for answering
+    many filter combinations (the region / amount filters of
+    validate_and_filter plus date, product and customer predicates).
+
+    Built:
+    - the validation result (row positions that pass, invalid counts
+      per rule)
+    - per region (and for all regions): the valid rows sorted by Amount,
+      with the sorted amounts alongside for bisect
+
+    A region + amount query is then two bisects (O(log n)) for the counts;
+    row positions and the filtered table are only built when asked for.
+    """
+
+    def __init__(self, transactions):
+        if not isinstance(transactions, TransactionTable):
+            transactions = TransactionTable.from_transactions(transactions)
+
+        self.table = transactions
+        self.total_input = len(transactions)
+
+        positions, rejected = validate_table(transactions)
+        self.invalid_by_rule = rejection_counts(rejected)
+        self.invalid_count = sum(rejected)
+
+        # Stable sort: rows with equal amounts stay in row order
+        amount = transactions.amount
+        order = sorted(positions, key=amount.__getitem__)
+
+        region_codes = transactions.codes["Region"]
+        by_region = {}
+        for i in order:
+            by_region.setdefault(region_codes[i], []).append(i)
+
+        self.by_amount = self._amount_index(order)
+        self.by_region_amount = {
+            code: self._amount_index(region_order) for code, region_order in by_region.items()
+        }
+
+    def _amount_index(self, order):
+        """
+        Returns (sorted amounts, row positions in that order).
+        """
+
+        amount = self.table.amount
+        return array("d", [amount[i] for i in order]), array("q", order)
+
+    @property
+    def valid_count(self):
+        return len(self.by_amount[1])
+
+    def query(self, region=None, min_amount=None, max_amount=None,
+              start_date=None, end_date=None, product_ids=None, customer_ids=None):
+        """
+        Filters the valid rows. Filters are applied in this order, like
+        validate_and_filter: region, amount, then date range (inclusive,
+        'YYYY-MM-DD'), ProductID and CustomerID (iterables of IDs).
+
+        Returns: QueryResult
+        """
+
+        summary = {
+            "total_input": self.total_input,
+            "invalid": self.invalid_count,
+            "invalid_by_rule": dict(self.invalid_by_rule),
+            "filtered_by_region": 0,
+            "filtered_by_amount": 0,
+            "filtered_by_date": 0,
+            "filtered_by_product": 0,
+            "filtered_by_customer": 0
+        }
+
+        # --- Region: pick the per-region index ---
+        amounts, order = self.by_amount
+        if region:
+            code = self.table.symbols["Region"].codes.get(region)
+            amounts, order = self.by_region_amount.get(code, (array("d"), array("q")))
+            summary["filtered_by_region"] = self.valid_count - len(order)
+
+        # --- Amount: bisect the sorted amounts ---
+        low = 0 if min_amount is None else bisect_left(amounts, min_amount)
+        high = len(amounts) if max_amount is None else bisect_right(amounts, max_amount)
+        high = max(low, high)
+        summary["filtered_by_amount"] = len(order) - (high - low)
+
+        candidates = memoryview(order)[low:high]
+
+        # --- Date / product / customer predicates: scan the candidates ---
+        symbols = self.table.symbols
+        codes = self.table.codes
+
+        if start_date is not None or end_date is not None:
+            dates = symbols["Date"].values
+            keep = [
+                (start_date is None or date >= start_date) and (end_date is None or date <= end_date)
+                for date in dates
+            ]
+            candidates, summary["filtered_by_date"] = _select(candidates, codes["Date"], keep)
+
+        for field, ids, key in (("ProductID", product_ids, "filtered_by_product"),
+                                ("CustomerID", customer_ids, "filtered_by_customer")):
+            if ids is None:
+                continue
+
+            ids = set(ids)
+            keep = [value in ids for value in symbols[field].values]
+            candidates, summary[key] = _select(candidates, codes[field], keep)
+
+        summary["final_count"] = len(candidates)
+
+        return QueryResult(self, candidates, summary)
+
+
+def _select(candidates, codes, keep):
+    """
+    Keeps the candidate positions whose code is flagged in `keep`.
+    Returns: (kept positions, number dropped)
+    """
+
+    kept = array("q", [i for i in candidates if keep[codes[i]]])
+    return kept, len(candidates) - len(kept)
+
+
+class QueryResult:
+    """
+    Result of SalesIndex.query: the filter summary right away, the
+    matching rows on demand.
+    """
+
+    def __init__(self, index, candidates, summary):
+        self.index = index
+        self.candidates = candidates
+        self.summary = summary
+        self._positions = None
+
+    def __len__(self):
+        return len(self.candidates)
+
+    @property
+    def positions(self):
+        """
+        Matching row positions, in file order.
+        """
+
+        if self._positions is None:
+            self._positions = sorted(self.candidates)
+
+        return self._positions
+
+    def to_table(self):
+        """
+        Returns the matching rows as a validated TransactionTable.
+        """
+
+        table = self.index.table.take(self.positions)
+        table.validated = True
+
+        return table
+
+    def result(self):
+        """
+        Returns (valid_table, invalid_count, filter_summary), the same
+        as validate_and_filter with the same filters.
+        """
+
+        return self.to_table(), self.summary["invalid"], self.summary
@@ -0,0 +1,421 @@
+import calendar
+from datetime import date, timedelta
+
+from utils.sketches import HyperLogLog, stable_hash64
+from utils.transaction_table import TransactionTable
+
+GRANULARITIES = ("day", "week", "month")
+
+ROLLUP_VERSION = 1
+
+
+def bucket_keys(day):
+    """
+    Returns (week, month) bucket keys of a 'YYYY-MM-DD' date: ISO week
+    'YYYY-Www' and 'YYYY-MM'. Both sort in date order as strings.
+    Returns None for dates that do not parse (those rows are only in
+    the day buckets).
+    """
+
+    try:
+        parsed = date.fromisoformat(day)
+    except (TypeError, ValueError):
+        return None
+
+    year, week, _ = parsed.isocalendar()
+
+    return f"{year}-W{week:02d}", day[:7]
+
+
+def bucket_range(key, granularity):
+    """
+    Returns the (first day, last day) of a bucket as 'YYYY-MM-DD'.
+    """
+
+    if granularity == "day":
+        return key, key
+
+    if granularity == "week":
+        year, week = key.split("-W")
+        first = date.fromisocalendar(int(year), int(week), 1)
+        return first.isoformat(), (first + timedelta(days=6)).isoformat()
+
+    year, month = map(int, key.split("-"))
+    last = calendar.monthrange(year, month)[1]
+
+    return f"{key}-01", f"{key}-{last:02d}"
+
+
+def _check_granularity(granularity):
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity '{granularity}', expected one of {GRANULARITIES}")
+
+
+class SalesRollup:
+    """
+    Precomputed time buckets for date-range questions without rescanning
+    transactions.
+
+    For every day, ISO week and month the rollup keeps revenue,
+    transaction count and unique customers (a HyperLogLog sketch, so
+    buckets merge) - for all sales, per Region and per ProductName.
+    Per-product unique customers are only kept with
+    product_customers=True: with many products that is one sketch per
+    product per bucket, far bigger than the data itself. Without them
+    product queries return unique_customers as None.
+    Questions are answered from the buckets:
+
+        rollup = SalesRollup(valid_transactions)
+        rollup.total(start="2024-12-25", end="2024-12-31")      # a date range
+        rollup.last_days(7, region="North")
+        rollup.peak("day", start="2024-10-01", end="2024-12-31")   # peak day in Q4
+        rollup.period_over_period("month", region="North")      # month over month
+
+    Dates are compared as 'YYYY-MM-DD' strings, like the Date field.
+    Dates that do not parse only appear in day buckets.
+
+    Rollups are mergeable (merge, to_state / from_state). With
+    precision p each sketch is 2^p bytes (default 1 KB, ~3% error).
+    """
+
+    def __init__(self, transactions=None, precision=10, product_customers=False):
+        self.precision = precision
+        self.product_customers = product_customers
+
+        # granularity -> (dimension, value) -> bucket key -> [revenue, count, HyperLogLog]
+        # dimensions: ("all", None), ("region", name), ("product", name)
+        # (product buckets hold None instead of a sketch unless product_customers)
+        self.buckets = {granularity: {} for granularity in GRANULARITIES}
+
+        if transactions is not None:
+            self.update(transactions)
+
+    # ---------- Building ----------
+    def update(self, transactions):
+        """
+        Adds transactions (an iterable of dictionaries or a
+        TransactionTable, already validated). Returns self.
+        """
+
+        if not isinstance(transactions, TransactionTable):
+            transactions = TransactionTable.from_transactions(transactions)
+
+        table = transactions
+        symbols = table.symbols
+        codes = table.codes
+
+        # One pass: sums per (date, region, product) cell, customer code
+        # sets per date and dimension
+        cells = {}
+        all_customers = {}
+        region_customers = {}
+        product_customers = {}
+        track_products = self.product_customers
+
+        for amount, date_code, region_code, product_code, customer_code in zip(
+            table.amount, codes["Date"], codes["Region"], codes["ProductName"], codes["CustomerID"]
+        ):
+            key = (date_code, region_code, product_code)
+            cell = cells.get(key)
+            if cell is None:
+                cell = cells[key] = [0.0, 0]
+            cell[0] += amount
+            cell[1] += 1
+
+            customers = all_customers.get(date_code)
+            if customers is None:
+                customers = all_customers[date_code] = set()
+            customers.add(customer_code)
+
+            customers = region_customers.get((date_code, region_code))
+            if customers is None:
+                customers = region_customers[(date_code, region_code)] = set()
+            customers.add(customer_code)
+
+            if track_products:
+                customers = product_customers.get((date_code, product_code))
+                if customers is None:
+                    customers = product_customers[(date_code, product_code)] = set()
+                customers.add(customer_code)
+
+        # Sketch register updates of each customer, computed once
+        sketch = HyperLogLog(self.precision)
+        positions = [sketch.position(stable_hash64(customer)) for customer in symbols["CustomerID"].values]
+
+        dates = symbols["Date"].values
+        regions = symbols["Region"].values
+        products = symbols["ProductName"].values
+        date_buckets = {}
+        for code in {key[0] for key in cells}:
+            weeks_months = bucket_keys(dates[code])
+            date_buckets[code] = {
+                "day": dates[code],
+                "week": weeks_months and weeks_months[0],
+                "month": weeks_months and weeks_months[1]
+            }
+
+        for granularity in GRANULARITIES:
+            sums = {}
+            customer_sets = {}
+
+            for (date_code, region_code, product_code), (revenue, count) in cells.items():
+                bucket = date_buckets[date_code][granularity]
+                if bucket is None:
+                    continue
+
+                for dimension in (("all", None), ("region", regions[region_code]),
+                                  ("product", products[product_code])):
+                    acc = sums.get((dimension, bucket))
+                    if acc is None:
+                        acc = sums[(dimension, bucket)] = [0.0, 0]
+                    acc[0] += revenue
+                    acc[1] += count
+
+            for dimension_name, sets, values in (("all", all_customers, None),
+                                                 ("region", region_customers, regions),
+                                                 ("product", product_customers, products)):
+                for key, customers in sets.items():
+                    date_code = key if values is None else key[0]
+                    bucket = date_buckets[date_code][granularity]
+                    if bucket is None:
+                        continue
+
+                    dimension = (dimension_name, None if values is None else values[key[1]])
+                    customer_sets.setdefault((dimension, bucket), set()).update(customers)
+
+            series_by_dimension = self.buckets[granularity]
+            for (dimension, bucket), (revenue, count) in sums.items():
+                series = series_by_dimension.setdefault(dimension, {})
+                acc = series.get(bucket)
+                if acc is None:
+                    acc = series[bucket] = [0.0, 0, self._new_sketch(dimension[0])]
+                acc[0] += revenue
+                acc[1] += count
+
+                if acc[2] is None:
+                    continue
+                registers = acc[2].registers
+                for customer_code in customer_sets[(dimension, bucket)]:
+                    index, rank = positions[customer_code]
+                    if rank > registers[index]:
+                        registers[index] = rank
+
+        return self
+
+    def merge(self, other):
+        """
+        Merges another rollup into this one. Returns self.
+        """
+
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge rollups with different precision")
+        if other.product_customers != self.product_customers:
+            raise ValueError("Cannot merge rollups with and without per-product customers")
+
+        for granularity, series_by_dimension in other.buckets.items():
+            own = self.buckets[granularity]
+
+            for dimension, series in series_by_dimension.items():
+                own_series = own.setdefault(dimension, {})
+
+                for bucket, (revenue, count, customers) in series.items():
+                    acc = own_series.get(bucket)
+                    if acc is None:
+                        acc = own_series[bucket] = [0.0, 0, self._new_sketch(dimension[0])]
+                    acc[0] += revenue
+                    acc[1] += count
+                    if customers is not None:
+                        acc[2] |= customers
+
+        return self
+
+    def _new_sketch(self, dimension_name):
+        """
+        Returns an empty unique-customer sketch for a new bucket of a
+        dimension, or None if that dimension keeps none.
+        """
+
+        if dimension_name == "product" and not self.product_customers:
+            return None
+
+        return HyperLogLog(self.precision)
+
+    # ---------- Queries ----------
+    def _series(self, granularity, region, product):
+        _check_granularity(granularity)
+
+        if region is not None and product is not None:
+            raise ValueError("Filter by region or by product, not both")
+
+        if region is not None:
+            dimension = ("region", region)
+        elif product is not None:
+            dimension = ("product", product)
+        else:
+            dimension = ("all", None)
+
+        return self.buckets[granularity].get(dimension, {})
+
+    def _in_range(self, series, granularity, start, end):
+        """
+        Yields (bucket, acc) for the buckets that lie within [start, end]
+        (whole buckets only for weeks and months), in date order.
+        """
+
+        for bucket in sorted(series):
+            first, last = bucket_range(bucket, granularity)
+            if (start is None or first >= start) and (end is None or last <= end):
+                yield bucket, series[bucket]
+
+    def series(self, granularity="day", start=None, end=None, region=None, product=None):
+        """
+        Returns {bucket: {'revenue', 'transaction_count', 'unique_customers'}}
+        in date order (the daily_sales_trend format; unique_customers are
+        estimates, None per product without product_customers). Optional
+        date range and a region or product filter.
+        """
+
+        return {
+            bucket: {
+                "revenue": revenue,
+                "transaction_count": count,
+                "unique_customers": None if customers is None else len(customers)
+            }
+            for bucket, (revenue, count, customers) in
+            self._in_range(self._series(granularity, region, product), granularity, start, end)
+        }
+
+    def total(self, start=None, end=None, region=None, product=None):
+        """
+        Totals over the days in [start, end] ('YYYY-MM-DD', inclusive).
+
+        Returns: {'revenue', 'transaction_count', 'unique_customers'}
+        """
+
+        revenue = 0.0
+        count = 0
+        customers = self._new_sketch("product" if product is not None else "all")
+
+        for _, (day_revenue, day_count, day_customers) in self._in_range(
+            self._series("day", region, product), "day", start, end
+        ):
+            revenue += day_revenue
+            count += day_count
+            if customers is not None:
+                customers |= day_customers
+
+        return {
+            "revenue": revenue,
+            "transaction_count": count,
+            "unique_customers": None if customers is None else len(customers)
+        }
+
+    def last_days(self, days, end=None, region=None, product=None):
+        """
+        total() over the `days` days ending at `end` (default: the latest
+        date in the rollup).
+        """
+
+        if end is None:
+            known = [day for day in self._series("day", region, product) if bucket_keys(day)]
+            if not known:
+                unique = 0 if product is None or self.product_customers else None
+                return {"revenue": 0.0, "transaction_count": 0, "unique_customers": unique}
+            end = max(known)
+
+        start = (date.fromisoformat(end) - timedelta(days=days - 1)).isoformat()
+
+        return self.total(start, end, region, product)
+
+    def peak(self, granularity="day", start=None, end=None, region=None, product=None):
+        """
+        Bucket with the highest revenue in the range.
+
+        Returns tuple: (bucket, revenue, transaction_count), or None if
+        there are no sales in the range
+        """
+
+        best = None
+
+        for bucket, (revenue, count, _) in self._in_range(
+            self._series(granularity, region, product), granularity, start, end
+        ):
+            if best is None or revenue > best[1]:
+                best = (bucket, revenue, count)
+
+        return best
+
+    def period_over_period(self, granularity="month", start=None, end=None, region=None, product=None):
+        """
+        Revenue change from each bucket to the one before it.
+
+        Returns: {bucket: {'revenue', 'previous_revenue', 'change_pct'}} in
+        date order; change_pct is None for the first bucket or when the
+        previous revenue is 0
+        """
+
+        result = {}
+        previous = None
+
+        for bucket, (revenue, _, _) in self._in_range(
+            self._series(granularity, region, product), granularity, start, end
+        ):
+            change = None
+            if previous:
+                change = round((revenue - previous) / previous * 100, 2)
+
+            result[bucket] = {
+                "revenue": revenue,
+                "previous_revenue": previous,
+                "change_pct": change
+            }
+            previous = revenue
+
+        return result
+
+    # ---------- Serialization ----------
+    def to_state(self):
+        """
+        Returns the rollup as a JSON-serializable dictionary.
+        """
+
+        return {
+            "version": ROLLUP_VERSION,
+            "precision": self.precision,
+            "product_customers": self.product_customers,
+            "buckets": {
+                granularity: [
+                    [dimension[0], dimension[1], {
+                        bucket: [revenue, count, None if customers is None else customers.to_state()["registers"]]
+                        for bucket, (revenue, count, customers) in series.items()
+                    }]
+                    for dimension, series in series_by_dimension.items()
+                ]
+                for granularity, series_by_dimension in self.buckets.items()
+            }
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """
+        Rebuilds a rollup from to_state() output.
+        """
+
+        if state.get("version") != ROLLUP_VERSION:
+            raise ValueError(f"Unsupported rollup state version: {state.get('version')}")
+
+        # States written before the option always have product sketches
+        rollup = cls(precision=state["precision"], product_customers=state.get("product_customers", True))
+        sketch_state = {"precision": rollup.precision}
+
+        for granularity, dimensions in state["buckets"].items():
+            rollup.buckets[granularity] = {
+                (name, value): {
+                    bucket: [revenue, count, None if registers is None else
+                             HyperLogLog.from_state({**sketch_state, "registers": registers})]
+                    for bucket, (revenue, count, registers) in series.items()
+                }
+                for name, value, series in dimensions
+            }
+
+        return rollup
@@ -0,0 +1,302 @@
+import base64
+import hashlib
+import heapq
+import math
+from array import array
+from operator import add
+
+
+def stable_hash64(value):
+    """
+    64-bit hash of a string that is the same in every process
+    (the built-in hash() is randomised per interpreter).
+    """
+
+    digest = hashlib.blake2b(str(value).encode("utf-8"), digest_size=8).digest()
+
+    return int.from_bytes(digest, "big")
+
+
+class HyperLogLog:
+    """
+    Approximate distinct counter with a fixed-size, mergeable state.
+
+    Behaves like the set it replaces where the aggregator needs it:
+    add(value), len() (the estimate) and |= (merge). With the default
+    precision of 12 the state is 4 KB and the typical error is ~1.6%.
+    """
+
+    def __init__(self, precision=12):
+        if not 4 <= precision <= 16:
+            raise ValueError("HyperLogLog precision must be between 4 and 16")
+
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, value):
+        index, rank = self.position(stable_hash64(value))
+
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def position(self, hashed):
+        """
+        Returns (register index, rank) for a 64-bit hash, so callers
+        adding the same values to many sketches can compute it once.
+        """
+
+        index = hashed >> (64 - self.precision)
+        remaining = hashed & ((1 << (64 - self.precision)) - 1)
+
+        # Position of the leftmost 1-bit in the remaining bits
+        rank = (64 - self.precision) - remaining.bit_length() + 1
+
+        return index, rank
+
+    def merge(self, other):
+        """
+        Merges another sketch into this one (register-wise max).
+        """
+
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches with different precision")
+
+        # Register-wise max on the registers packed into one integer each.
+        # Ranks are below 128, so in every byte of (a | 0x80) - b the top
+        # bit survives (no borrow crosses bytes) exactly when a >= b.
+        size = len(self.registers)
+        high = int.from_bytes(b"\x80" * size, "little")
+        a = int.from_bytes(self.registers, "little")
+        b = int.from_bytes(other.registers, "little")
+
+        keep = ((((a | high) - b) & high) >> 7) * 0xFF
+        self.registers = bytearray(((a & keep) | (b & ~keep)).to_bytes(size, "little"))
+
+        return self
+
+    def __ior__(self, other):
+        return self.merge(other)
+
+    def count(self):
+        """
+        Returns the estimated number of distinct values added.
+        """
+
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+
+        # Small-range correction (linear counting)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+
+        return int(round(estimate))
+
+    def __len__(self):
+        return self.count()
+
+    def copy(self):
+        sketch = HyperLogLog(self.precision)
+        sketch.registers = bytearray(self.registers)
+
+        return sketch
+
+    # ---------- Serialization ----------
+    def to_state(self):
+        return {
+            "precision": self.precision,
+            "registers": base64.b64encode(bytes(self.registers)).decode("ascii")
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        sketch = cls(state["precision"])
+        sketch.registers = bytearray(base64.b64decode(state["registers"]))
+
+        return sketch
+
+
+class SpaceSaving:
+    """
+    Approximate heavy hitters (Space-Saving): keeps at most `capacity`
+    counters, so the largest weighted totals (e.g. spend per customer)
+    can be tracked over a stream with any number of distinct keys.
+
+    Each tracked key has an estimate and an error bound: its true total
+    is between estimate - error and estimate. Any key whose true total
+    is above (sum of all weights) / capacity is guaranteed to be
+    tracked. Weights must not be negative.
+    """
+
+    def __init__(self, capacity=1000):
+        if capacity < 1:
+            raise ValueError("SpaceSaving capacity must be at least 1")
+
+        self.capacity = capacity
+        # key -> [estimate, error]
+        self.counters = {}
+        # (estimate, key) entries; entries of keys that were incremented
+        # or evicted since are stale and skipped
+        self._heap = []
+
+    def add(self, key, weight=1):
+        counters = self.counters
+        counter = counters.get(key)
+
+        if counter is None:
+            if len(counters) < self.capacity:
+                counter = counters[key] = [0, 0]
+            else:
+                # Take over the smallest counter
+                smallest, evicted = self._pop_min()
+                del counters[evicted]
+                counter = counters[key] = [smallest, smallest]
+
+        counter[0] += weight
+        heapq.heappush(self._heap, (counter[0], key))
+
+        if len(self._heap) > 4 * self.capacity + 64:
+            self._rebuild_heap()
+
+    def _pop_min(self):
+        heap = self._heap
+        counters = self.counters
+
+        while True:
+            estimate, key = heapq.heappop(heap)
+            counter = counters.get(key)
+            if counter is not None and counter[0] == estimate:
+                return estimate, key
+
+    def _rebuild_heap(self):
+        self._heap = [(counter[0], key) for key, counter in self.counters.items()]
+        heapq.heapify(self._heap)
+
+    def min_estimate(self):
+        """
+        Smallest tracked estimate once all counters are in use (0 before):
+        the most an untracked key can have been undercounted by.
+        """
+
+        if len(self.counters) < self.capacity:
+            return 0
+
+        return min(counter[0] for counter in self.counters.values())
+
+    def top(self, n):
+        """
+        Returns the n keys with the largest estimates as
+        (key, estimate, error) tuples, largest first.
+        """
+
+        ranked = heapq.nlargest(n, self.counters.items(), key=lambda item: item[1][0])
+
+        return [(key, estimate, error) for key, (estimate, error) in ranked]
+
+    def __len__(self):
+        return len(self.counters)
+
+    def merge(self, other):
+        """
+        Merges another summary into this one. A key missing from a full
+        summary is counted with that summary's smallest estimate (its
+        upper bound); the `capacity` largest results are kept.
+        """
+
+        if other.capacity != self.capacity:
+            raise ValueError("Cannot merge SpaceSaving summaries with different capacities")
+
+        own_missing = self.min_estimate()
+        other_missing = other.min_estimate()
+
+        combined = {}
+        for key in self.counters.keys() | other.counters.keys():
+            own = self.counters.get(key, (own_missing, own_missing))
+            theirs = other.counters.get(key, (other_missing, other_missing))
+            combined[key] = [own[0] + theirs[0], own[1] + theirs[1]]
+
+        kept = heapq.nlargest(self.capacity, combined.items(), key=lambda item: item[1][0])
+        self.counters = dict(kept)
+        self._rebuild_heap()
+
+        return self
+
+    def __ior__(self, other):
+        return self.merge(other)
+
+    # ---------- Serialization ----------
+    def to_state(self):
+        return {
+            "capacity": self.capacity,
+            "counters": [[key, estimate, error] for key, (estimate, error) in self.counters.items()]
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        summary = cls(state["capacity"])
+        summary.counters = {key: [estimate, error] for key, estimate, error in state["counters"]}
+        summary._rebuild_heap()
+
+        return summary
+
+
+class CountMinSketch:
+    """
+    Approximate per-key totals in fixed memory (width x depth counters).
+    estimate(key) never undercounts; it overcounts by at most
+    e / width x (sum of all weights) with probability 1 - e^-depth.
+    Weights must not be negative.
+    """
+
+    def __init__(self, width=2048, depth=4):
+        if width < 1 or depth < 1:
+            raise ValueError("CountMinSketch width and depth must be at least 1")
+
+        self.width = width
+        self.depth = depth
+        self.rows = [array("d", bytes(8 * width)) for _ in range(depth)]
+
+    def _indexes(self, key):
+        hashed = stable_hash64(key)
+        first = hashed & 0xFFFFFFFF
+        step = (hashed >> 32) | 1
+
+        return [(first + i * step) % self.width for i in range(self.depth)]
+
+    def add(self, key, weight=1):
+        for row, index in zip(self.rows, self._indexes(key)):
+            row[index] += weight
+
+    def estimate(self, key):
+        return min(row[index] for row, index in zip(self.rows, self._indexes(key)))
+
+    def merge(self, other):
+        """
+        Merges another sketch of the same size into this one.
+        """
+
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError("Cannot merge CountMinSketches of different sizes")
+
+        self.rows = [array("d", map(add, own, theirs)) for own, theirs in zip(self.rows, other.rows)]
+
+        return self
+
+    def __ior__(self, other):
+        return self.merge(other)
+
+    # ---------- Serialization ----------
+    def to_state(self):
+        return {
+            "width": self.width,
+            "depth": self.depth,
+            "rows": [base64.b64encode(row.tobytes()).decode("ascii") for row in self.rows]
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        sketch = cls(state["width"], state["depth"])
+        sketch.rows = [array("d", base64.b64decode(row)) for row in state["rows"]]
+
+        return sketch
@@ -0,0 +1,395 @@
+import sys
+from array import array
+from operator import attrgetter, itemgetter
+
+# Fields of a parsed transaction, in file order
+TRANSACTION_FIELDS = ("TransactionID", "Date", "ProductID", "ProductName",
+                      "Quantity", "UnitPrice", "CustomerID", "Region")
+
+# Categorical columns stored as small integer codes
+CATEGORICAL_FIELDS = ("Date", "ProductID", "ProductName", "CustomerID", "Region")
+
+
+class Transaction:
+    """
+    Compact record of a validated transaction: the parsed fields plus the
+    precomputed Amount, stored in __slots__ (about a third of the memory
+    of the same row as a dictionary).
+
+    Attributes are named like the dictionary keys (tx.Amount), and the
+    record can be read like the dictionaries validate_and_filter used to
+    return: tx["Amount"], tx.get(...), dict(tx), "Amount" in tx, and ==
+    with such a dictionary.
+    """
+
+    __slots__ = TRANSACTION_FIELDS + ("Amount",)
+
+    def __init__(self, transaction_id, date, product_id, product_name,
+                 quantity, unit_price, customer_id, region, amount=None):
+        self.TransactionID = transaction_id
+        self.Date = date
+        self.ProductID = product_id
+        self.ProductName = product_name
+        self.Quantity = quantity
+        self.UnitPrice = unit_price
+        self.CustomerID = customer_id
+        self.Region = region
+        self.Amount = quantity * unit_price if amount is None else amount
+
+    @classmethod
+    def from_dict(cls, tx):
+        """
+        Builds a record from a transaction dictionary (Amount is computed
+        if missing).
+        """
+
+        return cls(tx["TransactionID"], tx["Date"], tx["ProductID"], tx["ProductName"],
+                   tx["Quantity"], tx["UnitPrice"], tx["CustomerID"], tx["Region"], tx.get("Amount"))
+
+    # ---------- Dictionary view ----------
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key) from None
+
+    def get(self, key, default=None):
+        return getattr(self, key, default) if key in self.__slots__ else default
+
+    def keys(self):
+        return self.__slots__
+
+    def values(self):
+        return [getattr(self, key) for key in self.__slots__]
+
+    def items(self):
+        return [(key, getattr(self, key)) for key in self.__slots__]
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def __contains__(self, key):
+        return key in self.__slots__
+
+    def to_dict(self):
+        """
+        Returns the record as a transaction dictionary (faster than
+        dict(tx)).
+        """
+
+        return {
+            "TransactionID": self.TransactionID,
+            "Date": self.Date,
+            "ProductID": self.ProductID,
+            "ProductName": self.ProductName,
+            "Quantity": self.Quantity,
+            "UnitPrice": self.UnitPrice,
+            "CustomerID": self.CustomerID,
+            "Region": self.Region,
+            "Amount": self.Amount
+        }
+
+    def __eq__(self, other):
+        if isinstance(other, (Transaction, dict)):
+            return self.to_dict() == (other if isinstance(other, dict) else other.to_dict())
+
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Transaction({self.to_dict()!r})"
+
+
+class SymbolTable:
+    """
+    Dictionary encoding for one categorical column.
+    Maps each distinct string to a small integer code (in first-seen order)
+    and back.
+    """
+
+    def __init__(self, values=()):
+        self.values = []
+        self.codes = {}
+
+        for value in values:
+            self.encode(value)
+
+    def encode(self, value):
+        """
+        Returns the code for value, adding it if not seen before.
+        """
+
+        code = self.codes.get(value)
+
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+
+        return code
+
+    def decode(self, code):
+        return self.values[code]
+
+    def __len__(self):
+        return len(self.values)
+
+    def __contains__(self, value):
+        return value in self.codes
+
+
+def new_symbols():
+    """
+    Returns a fresh set of symbol tables, one per categorical field.
+    Passing the same set to several parse calls / tables shares their
+    codes and string objects.
+    """
+
+    return {field: SymbolTable() for field in CATEGORICAL_FIELDS}
+
+
+class PackedStrings:
+    """
+    Read-only sequence of strings stored as one utf-8 blob plus an
+    offsets array (len + 1 entries). Strings are decoded on access, so
+    a memory-mapped column costs nothing until it is used.
+    """
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+    @staticmethod
+    def pack(strings):
+        """
+        Returns (blob bytes, offsets array) for a sequence of strings.
+        """
+
+        encoded = [value.encode("utf-8") for value in strings]
+        offsets = array("q", [0])
+        position = 0
+
+        for value in encoded:
+            position += len(value)
+            offsets.append(position)
+
+        return b"".join(encoded), offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+
+        return bytes(self.blob[self.offsets[i]:self.offsets[i + 1]]).decode("utf-8")
+
+    def __iter__(self):
+        blob = self.blob
+        offsets = self.offsets
+
+        for i in range(len(self)):
+            yield bytes(blob[offsets[i]:offsets[i + 1]]).decode("utf-8")
+
+
+def typecode(column):
+    """
+    Returns the element type of an array.array or memoryview column.
+    """
+
+    return getattr(column, "typecode", None) or column.format
+
+
+# All fields of a Transaction record / a transaction dictionary as a tuple
+record_fields = attrgetter(*TRANSACTION_FIELDS)
+dict_fields = itemgetter(*TRANSACTION_FIELDS)
+
+
+class TransactionTable:
+    """
+    Columnar, array-backed store for parsed transactions.
+
+    Columns:
+    - transaction_ids: list of TransactionID strings (unique per row)
+    - quantity / unit_price / amount: typed arrays (int64 / float64 / float64)
+    - codes[field]: int32 array of dictionary codes for each categorical
+      field, decoded through symbols[field]
+
+    Iterating (or indexing) the table yields the same row dictionaries
+    parse_transactions / validate_and_filter produce, so existing code
+    keeps working. Tables built from one another (take / filtered results)
+    share their symbol tables, so codes stay comparable.
+
+    Columns may also be read-only buffers (memoryviews over a memory-mapped
+    parsed cache, see utils/parsed_cache.py). Such tables can be read,
+    filtered and aggregated but not appended to.
+    """
+
+    def __init__(self, symbols=None):
+        self.transaction_ids = []
+        self.quantity = array("q")
+        self.unit_price = array("d")
+        self.amount = array("d")
+
+        if symbols is None:
+            symbols = new_symbols()
+
+        self.symbols = symbols
+        self.codes = {field: array("i") for field in CATEGORICAL_FIELDS}
+
+        # Validated tables expose "Amount" in their row view, like the
+        # records returned by validate_and_filter
+        self.validated = False
+
+    @classmethod
+    def from_transactions(cls, transactions, symbols=None):
+        """
+        Builds a table from an iterable of transaction dictionaries or
+        Transaction records.
+        """
+
+        table = cls(symbols)
+
+        for tx in transactions:
+            table.append(tx)
+
+        return table
+
+    # ---------- Building ----------
+    def append_values(self, transaction_id, date, product_id, product_name,
+                      quantity, unit_price, customer_id, region):
+        """
+        Appends one row from already-converted field values.
+        """
+
+        symbols = self.symbols
+        codes = self.codes
+
+        self.transaction_ids.append(transaction_id)
+        self.quantity.append(quantity)
+        self.unit_price.append(unit_price)
+        self.amount.append(quantity * unit_price)
+
+        codes["Date"].append(symbols["Date"].encode(date))
+        codes["ProductID"].append(symbols["ProductID"].encode(product_id))
+        codes["ProductName"].append(symbols["ProductName"].encode(product_name))
+        codes["CustomerID"].append(symbols["CustomerID"].encode(customer_id))
+        codes["Region"].append(symbols["Region"].encode(region))
+
+    def append(self, tx):
+        """
+        Appends one transaction dictionary or Transaction record.
+        """
+
+        self.append_values(*(record_fields if isinstance(tx, Transaction) else dict_fields)(tx))
+
+    def take(self, positions):
+        """
+        Returns a new table with only the given row positions (in order).
+        The new table shares this table's symbol tables.
+        """
+
+        table = TransactionTable(self.symbols)
+        table.validated = self.validated
+
+        transaction_ids = self.transaction_ids
+        table.transaction_ids = [transaction_ids[i] for i in positions]
+
+        for name in ("quantity", "unit_price", "amount"):
+            column = getattr(self, name)
+            setattr(table, name, array(typecode(column), [column[i] for i in positions]))
+
+        for field in CATEGORICAL_FIELDS:
+            column = self.codes[field]
+            table.codes[field] = array("i", [column[i] for i in positions])
+
+        return table
+
+    def extend(self, other):
+        """
+        Appends all rows of another table, re-encoding its categorical
+        codes into this table's symbol tables if they differ.
+        """
+
+        self.transaction_ids.extend(other.transaction_ids)
+        self.quantity.extend(other.quantity)
+        self.unit_price.extend(other.unit_price)
+        self.amount.extend(other.amount)
+
+        for field in CATEGORICAL_FIELDS:
+            if other.symbols[field] is self.symbols[field]:
+                self.codes[field].extend(other.codes[field])
+                continue
+
+            # Map each of the other table's codes to ours once
+            encode = self.symbols[field].encode
+            remap = [encode(value) for value in other.symbols[field].values]
+            self.codes[field].extend(array("i", [remap[code] for code in other.codes[field]]))
+
+    # ---------- Row view ----------
+    def value(self, field, i):
+        """
+        Returns the decoded value of a categorical field for row i.
+        """
+
+        return self.symbols[field].values[self.codes[field][i]]
+
+    def row(self, i):
+        """
+        Returns row i as a transaction dictionary.
+        """
+
+        codes = self.codes
+        symbols = self.symbols
+
+        tx = {
+            "TransactionID": self.transaction_ids[i],
+            "Date": symbols["Date"].values[codes["Date"][i]],
+            "ProductID": symbols["ProductID"].values[codes["ProductID"][i]],
+            "ProductName": symbols["ProductName"].values[codes["ProductName"][i]],
+            "Quantity": self.quantity[i],
+            "UnitPrice": self.unit_price[i],
+            "CustomerID": symbols["CustomerID"].values[codes["CustomerID"][i]],
+            "Region": symbols["Region"].values[codes["Region"][i]]
+        }
+
+        if self.validated:
+            tx["Amount"] = self.amount[i]
+
+        return tx
+
+    def __len__(self):
+        return len(self.transaction_ids)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.row(j) for j in range(*i.indices(len(self)))]
+
+        if i < 0:
+            i += len(self)
+
+        return self.row(i)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.row(i)
+
+    def nbytes(self):
+        """
+        Approximate memory held by the columns (excluding symbol tables).
+        """
+
+        size = sys.getsizeof(self.transaction_ids)
+        size += sum(sys.getsizeof(tid) for tid in self.transaction_ids)
+
+        for column in (self.quantity, self.unit_price, self.amount):
+            size += column.itemsize * len(column)
+
+        for column in self.codes.values():
+            size += column.itemsize * len(column)
+
+        return size
@@ -0,0 +1,430 @@
+"""
+NumPy backend for the utils/data_processor analytics.
+
+Every function takes a TransactionTable and returns exactly what the
+pure-Python function of the same name returns. Group-by is done with
+np.bincount over the dictionary codes (bincount adds weights in row
+order, so float sums are bit-for-bit the same as the Python loops) and
+groups are reported in first-seen order to keep tie-breaking identical.
+
+The Tokenizer section is the backend="numpy" version of
+file_handler.tokenize_block.
+
+NumPy is optional; this module is only imported when backend="numpy"
+is requested.
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def _column(column, dtype):
+    """
+    Zero-copy NumPy view over an array.array column.
+    """
+
+    return np.frombuffer(column, dtype=dtype) if len(column) else np.zeros(0, dtype=dtype)
+
+
+def _codes(table, field):
+    return _column(table.codes[field], np.intc)
+
+
+def _amounts(table):
+    return _column(table.amount, np.float64)
+
+
+def _quantities(table):
+    return _column(table.quantity, np.longlong)
+
+
+def _first_seen(codes):
+    """
+    Returns the distinct codes present, ordered by first appearance.
+    """
+
+    present, first_index = np.unique(codes, return_index=True)
+
+    return present[np.argsort(first_index, kind="stable")]
+
+
+def _sequential_sum(values):
+    """
+    Left-to-right float sum (np.sum is pairwise, which can differ in
+    the last bits from the Python loop).
+    """
+
+    if not len(values):
+        return 0.0
+
+    return float(np.bincount(np.zeros(len(values), dtype=np.intp), weights=values)[0])
+
+
+def _product_groups(table):
+    """
+    Returns (product codes in first-seen order, quantities, revenues).
+    """
+
+    codes = _codes(table, "ProductName")
+    size = len(table.symbols["ProductName"])
+    order = _first_seen(codes)
+
+    quantities = np.bincount(codes, weights=_quantities(table), minlength=size)
+    revenues = np.bincount(codes, weights=_amounts(table), minlength=size)
+
+    return order, quantities[order].astype(np.int64), revenues[order]
+
+
+def _product_tuples(table, order, quantities, revenues, positions):
+    names = table.symbols["ProductName"].values
+
+    return [
+        (names[order[i]], int(quantities[i]), float(revenues[i]))
+        for i in positions
+    ]
+
+
+#--------------2.1--------------#
+def calculate_total_revenue(table):
+    return _sequential_sum(_amounts(table))
+
+
+def region_wise_sales(table):
+    codes = _codes(table, "Region")
+    size = len(table.symbols["Region"])
+    names = table.symbols["Region"].values
+    amounts = _amounts(table)
+
+    order = _first_seen(codes)
+    sales = np.bincount(codes, weights=amounts, minlength=size)
+    counts = np.bincount(codes, minlength=size)
+    total_revenue = _sequential_sum(amounts)
+
+    region_data = {}
+
+    for code in order:
+        total_sales = float(sales[code])
+        percentage = (total_sales / total_revenue) * 100 if total_revenue > 0 else 0
+        region_data[names[code]] = {
+            "total_sales": total_sales,
+            "transaction_count": int(counts[code]),
+            "percentage": round(percentage, 2)
+        }
+
+    return dict(
+        sorted(region_data.items(), key=lambda item: item[1]["total_sales"], reverse=True)
+    )
+
+
+def top_selling_products(table, n=5):
+    order, quantities, revenues = _product_groups(table)
+
+    if n <= 0 or not len(order):
+        return []
+
+    candidates = np.arange(len(order))
+
+    # Narrow down to the n largest (plus ties) before sorting
+    if n < len(order):
+        kth = np.argpartition(-quantities, n - 1)[n - 1]
+        candidates = np.flatnonzero(quantities >= quantities[kth])
+
+    # Stable sort keeps first-seen order among equal quantities
+    ranked = candidates[np.argsort(-quantities[candidates], kind="stable")][:n]
+
+    return _product_tuples(table, order, quantities, revenues, ranked)
+
+
+def customer_analysis(table):
+    customer_codes = _codes(table, "CustomerID")
+    product_codes = _codes(table, "ProductName")
+    customer_names = table.symbols["CustomerID"].values
+    product_names = table.symbols["ProductName"].values
+    size = len(customer_names)
+    amounts = _amounts(table)
+
+    order = _first_seen(customer_codes)
+    spent = np.bincount(customer_codes, weights=amounts, minlength=size)
+    counts = np.bincount(customer_codes, minlength=size)
+
+    # Distinct (customer, product) pairs, grouped by customer
+    pairs = customer_codes.astype(np.int64) * len(product_names) + product_codes
+    unique_pairs = np.unique(pairs)
+
+    products_by_customer = {}
+    for pair in unique_pairs.tolist():
+        customer, product = divmod(pair, len(product_names))
+        products_by_customer.setdefault(customer, []).append(product_names[product])
+
+    customer_data = {}
+
+    for code in order.tolist():
+        total_spent = float(spent[code])
+        count = int(counts[code])
+        avg_order = total_spent / count if count > 0 else 0
+        customer_data[customer_names[code]] = {
+            "total_spent": total_spent,
+            "purchase_count": count,
+            "products_bought": sorted(products_by_customer[code]),
+            "avg_order_value": round(avg_order, 2)
+        }
+
+    return dict(
+        sorted(customer_data.items(), key=lambda item: item[1]["total_spent"], reverse=True)
+    )
+
+
+#--------------2.2--------------#
+def daily_sales_trend(table):
+    date_codes = _codes(table, "Date")
+    customer_codes = _codes(table, "CustomerID")
+    dates = table.symbols["Date"].values
+    size = len(dates)
+    customers = max(len(table.symbols["CustomerID"]), 1)
+
+    revenue = np.bincount(date_codes, weights=_amounts(table), minlength=size)
+    counts = np.bincount(date_codes, minlength=size)
+
+    unique_pairs = np.unique(date_codes.astype(np.int64) * customers + customer_codes)
+    unique_customers = np.bincount(unique_pairs // customers, minlength=size)
+
+    present = np.flatnonzero(counts)
+
+    return {
+        dates[code]: {
+            "revenue": float(revenue[code]),
+            "transaction_count": int(counts[code]),
+            "unique_customers": int(unique_customers[code])
+        }
+        for code in sorted(present.tolist(), key=lambda code: dates[code])
+    }
+
+
+def find_peak_sales_day(table):
+    date_codes = _codes(table, "Date")
+    size = len(table.symbols["Date"])
+
+    order = _first_seen(date_codes)
+    if not len(order):
+        raise ValueError("find_peak_sales_day() arg is an empty sequence")
+
+    revenue = np.bincount(date_codes, weights=_amounts(table), minlength=size)
+    counts = np.bincount(date_codes, minlength=size)
+
+    # argmax returns the first maximum, like max() over the dict
+    peak = order[np.argmax(revenue[order])]
+
+    return (table.symbols["Date"].values[peak], float(revenue[peak]), int(counts[peak]))
+
+
+#--------------2.3--------------#
+def low_performing_products(table, threshold=10, n=None):
+    order, quantities, revenues = _product_groups(table)
+
+    low = np.flatnonzero(quantities < threshold)
+    ranked = low[np.argsort(quantities[low], kind="stable")][:n]
+
+    return _product_tuples(table, order, quantities, revenues, ranked)
+
+
+#--------------Tokenizer--------------#
+# Widest field copied into the fixed-width matrices; blocks with wider
+# fields take the Python path
+MAX_FIELD_WIDTH = 64
+
+# Digit counts that convert exactly (int64 / float64 mantissa)
+MAX_INT_DIGITS = 18
+MAX_FLOAT_DIGITS = 15
+
+PIPE, NEWLINE, COMMA, MINUS, DOT, ZERO, NINE = b"|\n,-.09"
+
+# Bytes that may not start or end a line on the vectorized path: ASCII
+# whitespace str.strip() removes, and anything non-ASCII
+STRIPPED = np.zeros(256, dtype=bool)
+STRIPPED[list(b" \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f")] = True
+STRIPPED[128:] = True
+
+
+def _field_matrix(buf, starts, lengths):
+    """
+    Copies one field of every row into a zero-padded (rows, width) uint8
+    matrix. buf must extend MAX_FIELD_WIDTH bytes past the last field.
+    Returns None if the field is wider than MAX_FIELD_WIDTH.
+    """
+
+    width = int(lengths.max())
+    if width > MAX_FIELD_WIDTH:
+        return None
+
+    # Rows of a sliding-window view: copies only the bytes needed
+    offsets = np.arange(max(width, 1))
+    matrix = sliding_window_view(buf, len(offsets))[starts]
+    matrix *= offsets < lengths[:, None]
+
+    return matrix
+
+
+def _row_keys(matrix):
+    """
+    Returns one integer per row that is equal for equal rows, and the
+    rows that represent them (np.unique with return_index / inverse).
+    Rows are packed into a uint64 when they fit, otherwise hashed; hash
+    collisions are detected and fall back to comparing the bytes.
+    """
+
+    rows, width = matrix.shape
+
+    if width <= 8:
+        packed = np.zeros((rows, 8), dtype=np.uint8)
+        packed[:, :width] = matrix
+        keys = packed.view(np.uint64).ravel()
+        return np.unique(keys, return_index=True, return_inverse=True)[1:]
+
+    keys = np.zeros(rows, dtype=np.uint64)
+    for j in range(width):
+        keys *= np.uint64(1099511628211)
+        keys ^= matrix[:, j]
+
+    _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    inverse = inverse.ravel()
+
+    if not (matrix == matrix[first[inverse]]).all():
+        keys = np.ascontiguousarray(matrix).view(f"S{width}").ravel()
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+
+    return first, inverse
+
+
+def _parse_number(matrix, allow_dot):
+    """
+    Converts a field matrix of [-]digits[,digits][.digits] values, like
+    int() / float() after the commas are removed.
+
+    Returns: (values, digit_count, fraction_digits), or None if any value
+    has other characters or no digits (the Python path handles those)
+    """
+
+    digits = (matrix >= ZERO) & (matrix <= NINE)
+    dots = matrix == DOT
+    allowed = digits | (matrix == COMMA) | (matrix == 0)
+    allowed[:, 0] |= matrix[:, 0] == MINUS
+    if allow_dot:
+        allowed |= dots
+
+    digit_count = digits.sum(axis=1)
+    if not allowed.all() or not digit_count.all() or (dots.sum(axis=1) > 1).any():
+        return None
+
+    # Place value of each digit = number of digits after it
+    places = digit_count[:, None] - np.cumsum(digits, axis=1)
+    scale = np.power(10, np.where(digits, places, 0), dtype=np.int64)
+    values = (np.where(digits, matrix - ZERO, 0).astype(np.int64) * scale).sum(axis=1)
+
+    fraction_digits = (digits & (np.cumsum(dots, axis=1) > 0)).sum(axis=1)
+
+    return values, digit_count, fraction_digits
+
+
+def _encode_field(data, matrix, starts, lengths, symbols, encoding, strip_commas=False):
+    """
+    Dictionary-encodes one field into a SymbolTable. Distinct values are
+    found with np.unique and decoded once each, in first-seen order.
+    """
+
+    first, inverse = _row_keys(matrix)
+
+    remap = np.empty(len(first), dtype=np.intc)
+
+    for j in np.argsort(first).tolist():
+        start = int(starts[first[j]])
+        value = data[start:start + int(lengths[first[j]])]
+        if strip_commas:
+            value = value.replace(b",", b"")
+        remap[j] = symbols.encode(value.decode(encoding))
+
+    return remap[inverse.ravel()]
+
+
+def tokenize_block(data, table, encoding="utf-8"):
+    """
+    NumPy version of file_handler.tokenize_block (same result).
+
+    Field boundaries are found with one vectorized scan of the block;
+    numbers are converted digit-wise and string fields dictionary-encoded
+    with np.unique, so only TransactionIDs and the distinct values of the
+    other fields are turned into Python objects. Blocks outside the
+    common shape (irregular lines, wide fields, unusual numbers) are
+    handed to the Python tokenizer.
+
+    Returns: number of non-empty lines in the block
+    """
+
+    from utils import file_handler
+
+    if b"\r" in data:
+        data = data.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+
+    if b"\0" in data:
+        return file_handler.tokenize_block(data, table, encoding)
+
+    # Padded so every field can be read MAX_FIELD_WIDTH bytes wide
+    buf = np.frombuffer(data + b"\n" + bytes(MAX_FIELD_WIDTH), dtype=np.uint8)
+    size = len(data) + 1
+
+    # Lines: a newline ends a non-blank line unless it follows another
+    # newline (or starts the block)
+    newline = buf[:size] == NEWLINE
+    line_end = newline.copy()
+    line_end[1:] &= ~newline[:-1]
+    line_end[0] = False
+
+    ends = np.flatnonzero(line_end)
+    rows = len(ends)
+    if not rows:
+        return 0
+
+    line_starts = np.flatnonzero(~newline & np.concatenate(([True], newline[:-1])))
+
+    # Lines that str.strip() would change (or that start / end outside
+    # ASCII, which could be non-ASCII whitespace) take the Python path
+    if STRIPPED[buf[line_starts]].any() or STRIPPED[buf[ends - 1]].any():
+        return file_handler.tokenize_block(data, table, encoding)
+
+    # Every line must have exactly 8 fields: 7 "|" then its newline
+    delimiters = np.flatnonzero(line_end | (buf[:size] == PIPE))
+    if len(delimiters) != 8 * rows or not line_end[delimiters[7::8]].all():
+        return file_handler.tokenize_block(data, table, encoding)
+
+    field_ends = delimiters.reshape(rows, 8)
+    starts = np.empty_like(field_ends)
+    starts[:, 0] = line_starts
+    starts[:, 1:] = field_ends[:, :7] + 1
+    lengths = field_ends - starts
+
+    matrices = [_field_matrix(buf, starts[:, k], lengths[:, k]) for k in range(8)]
+    quantities = matrices[4] is not None and _parse_number(matrices[4], allow_dot=False)
+    unit_prices = matrices[5] is not None and _parse_number(matrices[5], allow_dot=True)
+
+    if (any(matrix is None for matrix in matrices) or not quantities or not unit_prices
+            or quantities[1].max() > MAX_INT_DIGITS or unit_prices[1].max() > MAX_FLOAT_DIGITS):
+        return file_handler.tokenize_block(data, table, encoding)
+
+    quantity = np.where(matrices[4][:, 0] == MINUS, -quantities[0], quantities[0])
+    unit_price = unit_prices[0].astype(np.float64) / np.power(10.0, unit_prices[2])
+    unit_price = np.where(matrices[5][:, 0] == MINUS, -unit_price, unit_price)
+
+    transaction_ids = b"|".join(np.ascontiguousarray(matrices[0]).view(
+        f"S{matrices[0].shape[1]}").ravel().tolist())
+
+    table.transaction_ids.extend(transaction_ids.decode(encoding).split("|"))
+    table.quantity.frombytes(quantity.astype(np.longlong).tobytes())
+    table.unit_price.frombytes(unit_price.tobytes())
+    table.amount.frombytes((quantity * unit_price).tobytes())
+
+    for k, field in ((1, "Date"), (2, "ProductID"), (3, "ProductName"),
+                     (6, "CustomerID"), (7, "Region")):
+        codes = _encode_field(data, matrices[k], starts[:, k], lengths[:, k],
+                              table.symbols[field], encoding, strip_commas=(field == "ProductName"))
+        table.codes[field].frombytes(codes.tobytes())
+
+    return rows